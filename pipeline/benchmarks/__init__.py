@@ -0,0 +1 @@
+# TECHNOSHIELD Pipeline Benchmarks Module
\ No newline at end of file
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Benchmark event storage throughput.
+
+Compares storing events row by row, with a lookup, an insert and a commit
+per event (how storage used to work), with the chunked multi-row inserts
+used by ``DatabaseConnector.store_events``. Runs against a temporary
+SQLite file unless a database URL is given; the events table of that
+database is emptied before each run.
+
+Usage:
+    python -m pipeline.benchmarks.db_benchmark [--events N] [--chunk-size N] [--db-url URL]
+"""
+
+import os
+import argparse
+import tempfile
+import time
+from datetime import datetime
+from typing import List, Dict, Any
+
+from pipeline.utils.db_connector import DatabaseConnector, DEFAULT_INSERT_CHUNK_SIZE, _event_row
+
+
+def generate_events(count: int) -> List[Dict[str, Any]]:
+    """Generate processed events shaped like the output of the event processor.
+
+    Args:
+        count: Number of events
+
+    Returns:
+        List of processed events
+    """
+    now = datetime.now().isoformat()
+    return [{
+        'event_id': f"evt-{i}",
+        'timestamp': now,
+        'source': {'name': 'benchmark', 'type': 'file'},
+        'event_type': 'network',
+        'severity': 'low',
+        'description': f"connection to port {i % 65535}",
+        'source_ip': f"10.0.{i % 250}.{i % 200 + 1}",
+        'user': f"user{i % 100}",
+        'processed_at': now,
+        'raw_data': {'message': f"connection to port {i % 65535}", 'bytes_out': i},
+    } for i in range(count)]
+
+
+def row_by_row(db: DatabaseConnector, events: List[Dict[str, Any]]) -> int:
+    """Store events with a lookup, an insert and a commit per event."""
+    count = 0
+    for event in events:
+        with db.engine.begin() as connection:
+            count += db._insert_rows_individually(connection, db.events_table, 'event_id', [_event_row(event)])
+    return count
+
+
+def batched(db: DatabaseConnector, events: List[Dict[str, Any]]) -> int:
+    """Store events with chunked multi-row inserts."""
+    return db.store_events(events)
+
+
+def rows_per_second(db: DatabaseConnector, func, events: List[Dict[str, Any]]) -> float:
+    """Empty the events table, store the events with ``func`` and return its throughput."""
+    with db.engine.begin() as connection:
+        connection.execute(db.events_table.delete())
+    started = time.perf_counter()
+    stored = func(db, events)
+    elapsed = time.perf_counter() - started
+    assert stored == len(events), f"stored {stored} of {len(events)} events"
+    return len(events) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=20000, help="Number of synthetic events")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_INSERT_CHUNK_SIZE, help="Rows per statement")
+    parser.add_argument('--db-url', help="Database to benchmark, a temporary SQLite file by default")
+    args = parser.parse_args()
+
+    events = generate_events(args.events)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_url = args.db_url or f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}"
+        db = DatabaseConnector(db_url, insert_chunk_size=args.chunk_size)
+        try:
+            before = rows_per_second(db, row_by_row, events)
+            after = rows_per_second(db, batched, events)
+            # Storing the same events again inserts nothing
+            assert db.store_events(events[:args.chunk_size]) == 0
+        finally:
+            db.engine.dispose()
+
+    print(f"events:     {args.events}")
+    print(f"row-by-row: {before:,.0f} rows/s")
+    print(f"batched:    {after:,.0f} rows/s ({after / before:.1f}x, {args.chunk_size} rows per chunk)")
+
+
+if __name__ == '__main__':
+    main()
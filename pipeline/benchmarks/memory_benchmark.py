@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Benchmark the memory held by processed events.
+
+Measures, with tracemalloc, the memory still allocated once a synthetic
+batch is processed and the collected batch list is released: the raw
+records plus their normalized events. Compares the dictionaries the event
+processor used to return with ``NormalizedEvent``, keeping the raw record
+as a dictionary or, with compact_raw_events, as JSON.
+
+Usage:
+    python -m pipeline.benchmarks.memory_benchmark [--events N]
+"""
+
+import gc
+import argparse
+import random
+import tracemalloc
+from datetime import datetime
+from typing import List, Dict, Any, Callable
+
+from pipeline.process import event_processor
+
+
+def generate_raw_events(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Generate raw events shaped like collected firewall and auth log records.
+
+    Args:
+        count: Number of events
+        seed: Random seed, so runs are comparable
+
+    Returns:
+        List of raw events
+    """
+    rng = random.Random(seed)
+    collection_time = datetime.now().isoformat()
+    events = []
+    for i in range(count):
+        events.append({
+            'timestamp': f"2023-10-16T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{i % 60:02d}",
+            'source_ip': f"10.0.{rng.randint(0, 20)}.{rng.randint(1, 254)}",
+            'destination_ip': f"203.0.113.{rng.randint(1, 254)}",
+            'destination_port': rng.choice([22, 80, 443, 3389]),
+            'bytes_out': rng.randint(100, 1000000),
+            'message': rng.choice(["connection allowed", "connection blocked by firewall",
+                                   "Failed password for admin"]) + f" #{i}",
+            'source_name': rng.choice(['firewall_logs', 'auth_logs']),
+            'source_type': 'file',
+            'collection_time': collection_time,
+        })
+    return events
+
+
+def as_dicts(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Rebuild processed events as the nested dictionaries previously returned."""
+    return [{
+        'event_id': event['event_id'],
+        'timestamp': event['timestamp'],
+        'source': {'name': event['source']['name'], 'type': event['source']['type']},
+        'event_type': event['event_type'],
+        'severity': event['severity'],
+        'description': event['description'],
+        'raw_data': event.raw_data,
+        'processed_at': datetime.now().isoformat(),
+    } for event in events]
+
+
+def retained_bytes(count: int, compact_raw: bool, convert: Callable = None) -> int:
+    """Process a fresh batch and return the memory still held by its events.
+
+    Args:
+        count: Number of events
+        compact_raw: Whether raw records are stored as JSON
+        convert: Optional conversion applied to the processed events
+
+    Returns:
+        Bytes allocated by the retained events
+    """
+    event_processor.configure_event_processing([], {'dedup_cache_size': 0, 'compact_raw_events': compact_raw})
+    gc.collect()
+    tracemalloc.start()
+    raw_events = generate_raw_events(count)
+    processed = event_processor.process_events(raw_events)
+    if convert is not None:
+        processed = convert(processed)
+    del raw_events
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(processed) == count
+    del processed
+    return current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=100000, help="Number of synthetic events")
+    args = parser.parse_args()
+
+    variants = [
+        ("dict events", False, as_dicts),
+        ("NormalizedEvent", False, None),
+        ("NormalizedEvent, compact raw", True, None),
+    ]
+    baseline = None
+    print(f"events: {args.events}")
+    for label, compact_raw, convert in variants:
+        per_event = retained_bytes(args.events, compact_raw, convert) / args.events
+        baseline = baseline or per_event
+        print(f"{label + ':':<30} {per_event:7.0f} bytes/event ({per_event / baseline:.0%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import bz2
+import glob
+import gzip
+import lzma
+import hashlib
+from typing import List, Optional, IO
+
+# Openers for compressed files, keyed by extension
+COMPRESSED_OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+# Rotation suffixes left by logrotate: auth.log.1, auth.log.2.gz, auth.log-20231016
+_ROTATION_SUFFIX = re.compile(r'(?:\.(\d+)|-(\d{8,10}))$')
+
+# Leading (decompressed) bytes hashed to fingerprint a file; a prefix of
+# complete lines is hashed while the file is shorter
+IDENTITY_MAX_BYTES = 4096
+
+
+def is_compressed(file_path: str) -> bool:
+    """Check whether a file is a supported compressed archive.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        True for .gz, .bz2 and .xz files
+    """
+    return os.path.splitext(file_path)[1].lower() in COMPRESSED_OPENERS
+
+
+def is_archive(file_path: str) -> bool:
+    """Check whether a file is a rotated or compressed archive rather than a live log.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        True if the file is compressed or carries a rotation suffix
+    """
+    return is_compressed(file_path) or bool(_ROTATION_SUFFIX.search(file_path))
+
+
+def open_binary(file_path: str) -> IO[bytes]:
+    """Open a file for binary reading, decompressing it transparently.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Binary file object yielding decompressed bytes
+    """
+    opener = COMPRESSED_OPENERS.get(os.path.splitext(file_path)[1].lower())
+    if opener:
+        return opener(file_path, 'rb')
+    return open(file_path, 'rb')
+
+
+def open_text(file_path: str, newline: Optional[str] = None) -> IO[str]:
+    """Open a file for text reading, decompressing it transparently.
+
+    Args:
+        file_path: Path to the file
+        newline: Newline handling passed to the text wrapper
+
+    Returns:
+        Text file object
+    """
+    opener = COMPRESSED_OPENERS.get(os.path.splitext(file_path)[1].lower())
+    if opener:
+        return opener(file_path, 'rt', errors='replace', newline=newline)
+    return open(file_path, 'r', errors='replace', newline=newline)
+
+
+def is_path_pattern(path: str) -> bool:
+    """Check whether a source path names several files.
+
+    Args:
+        path: Configured source path
+
+    Returns:
+        True for directories and glob patterns
+    """
+    return os.path.isdir(path) or glob.has_magic(path)
+
+
+def expand_source_paths(path: str) -> List[str]:
+    """Expand a directory or glob source path into files, oldest first.
+
+    Files are ordered by modification time; ties are broken by rotation
+    number, where a higher number means an older archive.
+
+    Args:
+        path: Directory or glob pattern
+
+    Returns:
+        List of regular file paths in processing order
+    """
+    if os.path.isdir(path):
+        candidates = [os.path.join(path, name) for name in os.listdir(path)]
+    else:
+        candidates = glob.glob(path)
+
+    files = [p for p in candidates if os.path.isfile(p)]
+    return sorted(files, key=lambda p: (os.path.getmtime(p), -_rotation_number(p), p))
+
+
+def file_identity(file_path: str, max_bytes: int = IDENTITY_MAX_BYTES) -> Optional[str]:
+    """Fingerprint a file by the hash of its leading (decompressed) content.
+
+    The first ``max_bytes`` bytes are hashed, or only the complete lines of
+    a shorter file, so files sharing a header line (CSV column names, W3C
+    ``#Version``, Zeek ``#separator``) are still told apart by the records
+    that follow it. The identity survives renames and compression by
+    logrotate, so an archive can be matched with the live file it used to
+    be; since that file may have been shorter then, the number of bytes
+    hashed is part of the identity (see ``identity_length``).
+
+    Args:
+        file_path: Path to the file
+        max_bytes: Maximum number of bytes hashed
+
+    Returns:
+        "<bytes hashed>:<hex digest>", or None if the file does not contain
+        a complete line yet
+    """
+    with open_binary(file_path) as f:
+        head = f.read(max_bytes)
+    if len(head) < max_bytes:
+        # The last line may still be being written
+        head = head[:head.rfind(b'\n') + 1]
+        if not head:
+            return None
+    return f"{len(head)}:{hashlib.sha1(head).hexdigest()}"
+
+
+def identity_length(identity: str) -> Optional[int]:
+    """Return the number of bytes hashed for an identity, None if it is not one.
+
+    Args:
+        identity: Identity returned by ``file_identity``
+
+    Returns:
+        Number of leading bytes hashed
+    """
+    length, separator, _ = identity.partition(':')
+    return int(length) if separator and length.isdigit() else None
+
+
+def _rotation_number(file_path: str) -> int:
+    """Return the numeric rotation suffix of a file, 0 if it has none."""
+    base = file_path
+    if is_compressed(base):
+        base = os.path.splitext(base)[0]
+    match = _ROTATION_SUFFIX.search(base)
+    if match and match.group(1):
+        return int(match.group(1))
+    return 0
@@ -4,20 +4,64 @@ import os
 import json
 import csv
 import re
+import lzma
+import time
+import threading
 import requests
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Callable, Iterator, Tuple
 from datetime import datetime
 
 from pipeline.utils.logging_config import get_logger, log_collection_event, log_error
-from pipeline.utils.metrics import record_data_collection, OperationTimer, start_metrics_server
+from pipeline.utils.metrics import record_data_collection, OperationTimer
+from pipeline.ingest.file_tailer import read_lines, checkpoint_key
+from pipeline.ingest.http_client import get_http_client_pool
+from pipeline.ingest.archives import (
+    is_archive, is_compressed, is_path_pattern, expand_source_paths, file_identity, identity_length, open_text
+)
+from pipeline.ingest.json_stream import iter_json_events, iter_ndjson_events, DEFAULT_NDJSON_CHUNK_BYTES
+from pipeline.ingest.syslog_listener import get_syslog_listener, apply_syslog_priority
+from pipeline.ingest.pagination import iter_api_pages, later_mark
+from pipeline.utils.checkpoints import get_checkpoint_store
 
 logger = get_logger("pipeline.ingest")
 
-# Start metrics server on port 8000
-try:
-    start_metrics_server(port=8000)
-except Exception as e:
-    logger.error(f"Failed to start metrics server: {str(e)}")
+# Concurrent collection defaults
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_SOURCE_TIMEOUT_SECONDS = 45
+
+# Number of completed archives remembered per glob/directory source
+MAX_TRACKED_ARCHIVES = 1000
+
+# JSON files above this size are parsed incrementally instead of with json.load
+DEFAULT_JSON_STREAMING_THRESHOLD_BYTES = 64 * 1024 * 1024
+
+# Field recording where in its file an event was read: the byte offset just past
+# its line, or its 1-based index in a JSON document. Part of the event ID, so
+# identical lines of a file are kept apart while re-reads still match
+SOURCE_OFFSET_FIELD = 'source_offset'
+
+# Events returned per cycle from a streamed JSON or NDJSON file; the rest of
+# the file is collected on the following cycles
+DEFAULT_MAX_STREAMED_EVENTS = 100000
+
+# Sources whose collection is still running (by id of their configuration, since
+# names are optional and need not be unique), and events from sources that finished late
+_inflight_sources = set()
+_late_results: List[Dict[str, Any]] = []
+_inflight_lock = threading.Lock()
+
+
+def source_label(source_config: Dict[str, Any]) -> str:
+    """Get the metrics label of a source: its name, or its type if it has none.
+    
+    Args:
+        source_config: Dictionary containing source configuration
+        
+    Returns:
+        Label string
+    """
+    return source_config.get('name') or source_config.get('type', 'unknown').lower()
 
 
 def collect_from_source(source_config: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -31,11 +75,12 @@ def collect_from_source(source_config: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     source_type = source_config.get('type', '').lower()
     source_name = source_config.get('name', 'unnamed')
+    label = source_label(source_config)
     
     logger.info(f"Collecting data from {source_name} ({source_type})")
     
-    # Use the OperationTimer context manager for timing and metrics
-    with OperationTimer("data_collection", {"source": source_type}):
+    # Use the OperationTimer context manager for timing and metrics, labeled per source
+    with OperationTimer("data_collection", {"source": label}):
         try:
             if source_type == 'api':
                 events = collect_from_api(source_config)
@@ -43,14 +88,17 @@ def collect_from_source(source_config: Dict[str, Any]) -> List[Dict[str, Any]]:
                 events = collect_from_file(source_config)
             elif source_type == 'syslog':
                 events = collect_from_syslog(source_config)
+            elif source_type == 'syslog_listener':
+                events = collect_from_syslog_listener(source_config)
             else:
                 logger.warning(f"Unknown source type: {source_type}")
                 # Record metric for failed collection
-                record_data_collection(source=source_type, status="error", data_points=0)
+                record_data_collection(source=label, status="error", data_points=0)
                 return []
             
             # Record successful data collection metrics
-            record_data_collection(source=source_type, status="success", data_points=len(events))
+            record_data_collection(source=label, status="success", data_points=len(events),
+                                   data_type=source_type)
             
             # Log collection metrics
             log_collection_event(source_type, {
@@ -62,7 +110,7 @@ def collect_from_source(source_config: Dict[str, Any]) -> List[Dict[str, Any]]:
             return events
         except Exception as e:
             # Record failed data collection metrics
-            record_data_collection(source=source_type, status="error", data_points=0)
+            record_data_collection(source=label, status="error", data_points=0)
             
             log_error("collection_error", str(e), {
                 "source_name": source_name,
@@ -72,35 +120,145 @@ def collect_from_source(source_config: Dict[str, Any]) -> List[Dict[str, Any]]:
             return []
 
 
-def collect_from_all_sources(sources_config: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Collect data from all configured sources.
+def collect_from_all_sources(sources_config: List[Dict[str, Any]], max_workers: int = DEFAULT_MAX_WORKERS,
+                             source_timeout: float = DEFAULT_SOURCE_TIMEOUT_SECONDS) -> List[Dict[str, Any]]:
+    """Collect data from all configured sources concurrently.
+    
+    Each source is collected on a worker thread and results are merged as
+    they complete. A source still running when its deadline (``timeout_seconds``
+    in the source config, else ``source_timeout``) expires is recorded as a
+    timeout and skipped for this cycle; its events are merged into the next
+    cycle when it eventually finishes, and it is not started again until then.
     
     Args:
         sources_config: List of source configurations
+        max_workers: Maximum number of sources collected at the same time
+        source_timeout: Default per-source deadline in seconds
         
     Returns:
         Combined list of all collected raw events
     """
-    all_events = []
+    all_events = _drain_late_results()
+    
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="collector")
+    pending = {}
+    now = time.monotonic()
     
     for source_config in sources_config:
-        events = collect_from_source(source_config)
-        if events:
-            # Add source metadata to each event
-            for event in events:
-                event['source_name'] = source_config.get('name', 'unnamed')
-                event['source_type'] = source_config.get('type', 'unknown')
-                event['collection_time'] = datetime.now().isoformat()
+        with _inflight_lock:
+            if id(source_config) in _inflight_sources:
+                logger.warning(f"Skipping {source_config.get('name', 'unnamed')}: "
+                               f"collection from a previous cycle is still running")
+                continue
+            _inflight_sources.add(id(source_config))
+        
+        future = executor.submit(collect_from_source, source_config)
+        deadline = now + float(source_config.get('timeout_seconds', source_timeout))
+        pending[future] = (source_config, deadline)
+    
+    try:
+        while pending:
+            next_deadline = min(deadline for _, deadline in pending.values())
+            done, _ = wait(pending, timeout=max(0.0, next_deadline - time.monotonic()),
+                           return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                source_config, _ = pending.pop(future)
+                _release_source(source_config)
+                events = tag_events(future.result(), source_config)
+                if events:
+                    all_events.extend(events)
+                    logger.info(f"Collected {len(events)} events from {source_config.get('name', 'unnamed')}")
             
-            all_events.extend(events)
-            logger.info(f"Collected {len(events)} events from {source_config.get('name', 'unnamed')}")
+            now = time.monotonic()
+            for future, (source_config, deadline) in list(pending.items()):
+                if deadline <= now:
+                    del pending[future]
+                    _handle_source_timeout(future, source_config)
+    finally:
+        # Never block the cycle on sources that overran their deadline
+        executor.shutdown(wait=False)
     
     return all_events
 
 
+def tag_events(events: List[Dict[str, Any]], source_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Add source metadata to collected events.
+    
+    Args:
+        events: Events collected from a source
+        source_config: Configuration of the source
+        
+    Returns:
+        The same events, tagged in place
+    """
+    collection_time = datetime.now().isoformat()
+    for event in events:
+        event['source_name'] = source_config.get('name', 'unnamed')
+        event['source_type'] = source_config.get('type', 'unknown')
+        event['collection_time'] = collection_time
+    return events
+
+
+def _release_source(source_config: Dict[str, Any]) -> None:
+    """Mark a source as no longer being collected."""
+    with _inflight_lock:
+        _inflight_sources.discard(id(source_config))
+
+
+def _handle_source_timeout(future: Future, source_config: Dict[str, Any]) -> None:
+    """Record a source that missed its deadline and keep its eventual result.
+    
+    Args:
+        future: Future of the overrunning collection
+        source_config: Configuration of the source
+    """
+    source_name = source_config.get('name', 'unnamed')
+    source_type = source_config.get('type', 'unknown').lower()
+    
+    record_data_collection(source=source_label(source_config), status="timeout", data_points=0)
+    log_error("collection_timeout", f"Source {source_name} exceeded its collection deadline", {
+        "source_name": source_name,
+        "source_type": source_type
+    })
+    
+    def _keep_late_result(done_future: Future) -> None:
+        _release_source(source_config)
+        try:
+            events = tag_events(done_future.result(), source_config)
+        except Exception:
+            return
+        if events:
+            with _inflight_lock:
+                _late_results.extend(events)
+    
+    future.add_done_callback(_keep_late_result)
+
+
+def _drain_late_results() -> List[Dict[str, Any]]:
+    """Take the events of sources that finished after their deadline.
+    
+    Returns:
+        List of late events
+    """
+    with _inflight_lock:
+        events = list(_late_results)
+        _late_results.clear()
+    return events
+
+
 def collect_from_api(config: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Collect data from an API source.
     
+    Requests go through the source's persistent session from the shared
+    HTTP client pool, so connections are kept alive across cycles. Large
+    feeds are fetched page by page (see ``iter_api_pages``). With a ``since``
+    section (``param`` to send, ``field`` to read from events) the latest
+    value seen is persisted as a high-water mark, so each cycle only asks for
+    newer events. At most ``max_pages`` pages (``DEFAULT_MAX_PAGES`` unless
+    configured) are held per cycle; a backlog cut short resumes from its
+    next page on the following cycle.
+    
     Args:
         config: API source configuration
         
@@ -112,51 +270,33 @@ def collect_from_api(config: Dict[str, Any]) -> List[Dict[str, Any]]:
         logger.error("API URL not provided in configuration")
         return []
     
-    headers = config.get('headers', {})
-    params = config.get('params', {})
-    auth = None
+    params = dict(config.get('params', {}))
     
-    # Configure authentication if provided
-    if 'auth' in config:
-        auth_config = config['auth']
-        auth_type = auth_config.get('type', '').lower()
-        
-        if auth_type == 'basic':
-            auth = (auth_config.get('username', ''), auth_config.get('password', ''))
-        elif auth_type == 'bearer':
-            headers['Authorization'] = f"Bearer {auth_config.get('token', '')}" 
+    # Headers and authentication live on the source's pooled keep-alive session
+    session = get_http_client_pool().session_for(config)
+    
+    store = get_checkpoint_store(config.get('checkpoint_file'))
+    key = f"api:{config.get('name', 'unnamed')}"
+    state = store.get(key) or {}
+    
+    since_config = config.get('since') or {}
+    query_since = state.get('since')
+    if since_config and query_since is not None:
+        params[since_config.get('param', 'since')] = query_since
+    high_water_mark = state.get('high_water_mark', query_since)
+    
+    events = []
+    next_position, has_more = state.get('position'), False
     
     try:
-        response = requests.get(url, headers=headers, params=params, auth=auth, timeout=30)
-        response.raise_for_status()
-        
-        data = response.json()
-        events = []
-        
-        # Extract events based on the path in the response
-        events_path = config.get('events_path', '')
-        if events_path:
-            current_data = data
-            for key in events_path.split('.'):
-                if key in current_data:
-                    current_data = current_data[key]
-                else:
-                    logger.warning(f"Could not find {key} in API response")
-                    return []
-            
-            if isinstance(current_data, list):
-                events = current_data
-            else:
-                logger.warning("Events path did not resolve to a list")
-                return []
-        else:
-            # If no events_path is specified, assume the response is already a list of events
-            if isinstance(data, list):
-                events = data
-            else:
-                events = [data]  # Wrap single object in a list
-        
-        return events
+        for page_events, next_position, has_more in iter_api_pages(session, url, config, params,
+                                                                   state.get('position')):
+            events.extend(page_events)
+            if since_config:
+                field = since_config.get('field', 'timestamp')
+                for event in page_events:
+                    if isinstance(event, dict):
+                        high_water_mark = later_mark(high_water_mark, event.get(field))
     
     except requests.exceptions.RequestException as e:
         logger.error(f"API request failed: {str(e)}")
@@ -164,11 +304,52 @@ def collect_from_api(config: Dict[str, Any]) -> List[Dict[str, Any]]:
     except ValueError as e:
         logger.error(f"Failed to parse API response as JSON: {str(e)}")
         return []
+    
+    if since_config or config.get('pagination'):
+        store.set(key, _api_checkpoint(config, query_since, high_water_mark, next_position, has_more))
+    
+    return events
+
+
+def _api_checkpoint(config: Dict[str, Any], query_since: Any, high_water_mark: Any,
+                    next_position: Any, has_more: bool) -> Dict[str, Any]:
+    """Build the checkpoint stored for an API source after a cycle.
+    
+    Args:
+        config: API source configuration
+        query_since: High-water mark the cycle's requests were made with
+        high_water_mark: Latest high-water mark seen so far
+        next_position: Position of the next unfetched page
+        has_more: Whether the backlog was cut short by max_pages
+        
+    Returns:
+        Checkpoint dictionary
+    """
+    checkpoint = {}
+    pagination_type = (config.get('pagination') or {}).get('type', 'none').lower()
+    
+    if has_more:
+        # Keep querying with the same mark until the backlog is drained
+        checkpoint['since'] = query_since
+        checkpoint['high_water_mark'] = high_water_mark
+        checkpoint['position'] = next_position
+    else:
+        checkpoint['since'] = high_water_mark
+        if pagination_type == 'cursor' and next_position:
+            # Cursor feeds continue from the last token handed out
+            checkpoint['position'] = next_position
+    
+    return checkpoint
 
 
 def collect_from_file(config: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Collect data from a file source.
     
+    Line-oriented formats (log, csv, ndjson/jsonl) support ``follow: true``, which
+    only returns lines appended since the previous cycle. ``path`` may also be
+    a directory or glob pattern such as ``/var/log/auth.log*``; see
+    ``collect_from_paths``. Compressed files are decompressed transparently.
+    
     Args:
         config: File source configuration
         
@@ -180,10 +361,26 @@ def collect_from_file(config: Dict[str, Any]) -> List[Dict[str, Any]]:
         logger.error("File path not provided in configuration")
         return []
     
+    if is_path_pattern(file_path):
+        return collect_from_paths(file_path, config, _collect_single_file)
+    
     if not os.path.exists(file_path):
         logger.error(f"File not found: {file_path}")
         return []
     
+    return _collect_single_file(file_path, config)
+
+
+def _collect_single_file(file_path: str, config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Collect data from one file of a file source.
+    
+    Args:
+        file_path: Path to the file
+        config: File source configuration
+        
+    Returns:
+        List of collected events
+    """
     file_format = config.get('format', '').lower()
     events = []
     
@@ -192,6 +389,8 @@ def collect_from_file(config: Dict[str, Any]) -> List[Dict[str, Any]]:
             events = collect_from_json_file(file_path, config)
         elif file_format == 'csv':
             events = collect_from_csv_file(file_path, config)
+        elif file_format in ('ndjson', 'jsonl'):
+            events = collect_from_ndjson_file(file_path, config)
         elif file_format == 'log':
             events = collect_from_log_file(file_path, config)
         else:
@@ -206,9 +405,182 @@ def collect_from_file(config: Dict[str, Any]) -> List[Dict[str, Any]]:
         return []
 
 
+def collect_from_paths(path_pattern: str, config: Dict[str, Any],
+                       collector: Callable[[str, Dict[str, Any]], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Collect data from every file matched by a directory or glob source path.
+    
+    Matched files are handled oldest first. Rotated and compressed archives
+    (``auth.log.1``, ``auth.log.2.gz``) are collected once each; they are
+    recognised by the hash of their leading content (see ``file_identity``),
+    which survives renames and compression, and recorded in the checkpoint store as soon as they are
+    done. An archive that used to be the followed live file is resumed
+    from the offset the live file had reached instead of being re-read, and
+    one read in capped batches is only done once its last batch is read.
+    Live files are collected on every cycle (tailed when ``follow`` is set).
+    
+    Args:
+        path_pattern: Directory or glob pattern
+        config: Source configuration
+        collector: Function collecting a single file
+        
+    Returns:
+        List of collected events
+    """
+    store = get_checkpoint_store(config.get('checkpoint_file'))
+    key = f"archives:{config.get('name', 'unnamed')}:{path_pattern}"
+    state = store.get(key) or {}
+    done = state.get('done', [])
+    followed = state.get('followed', {})
+    
+    paths = expand_source_paths(path_pattern)
+    live_paths = [p for p in paths if not is_archive(p)]
+    
+    # Remember how far each followed live file has been read before it rotates away
+    if config.get('follow'):
+        for live_path in live_paths:
+            checkpoint = store.get(checkpoint_key(live_path, config)) or {}
+            if checkpoint.get('identity'):
+                followed[checkpoint['identity']] = checkpoint.get('offset', 0)
+    
+    events = []
+    for archive_path in (p for p in paths if is_archive(p)):
+        try:
+            identity = file_identity(archive_path)
+        except (OSError, EOFError, lzma.LZMAError) as e:
+            logger.error(f"Error reading archive {archive_path}: {str(e)}")
+            continue
+        if identity is None or identity in done:
+            continue
+        
+        archive_config = dict(config, follow=False, start_offset=_pop_followed_offset(archive_path, followed))
+        archive_events = collector(archive_path, archive_config)
+        logger.info(f"Collected {len(archive_events)} events from archive {archive_path}")
+        events.extend(archive_events)
+        if stream_pending(archive_path, archive_config):
+            # Only a capped batch was read, the archive is resumed next cycle
+            continue
+        
+        done = (done + [identity])[-MAX_TRACKED_ARCHIVES:]
+        store.set(key, {'done': done, 'followed': followed})
+    
+    store.set(key, {'done': done, 'followed': dict(list(followed.items())[-MAX_TRACKED_ARCHIVES:])})
+    
+    live_config = dict(config, drain_rotated=False)
+    for live_path in live_paths:
+        events.extend(collector(live_path, live_config))
+    
+    return events
+
+
+def _pop_followed_offset(archive_path: str, followed: Dict[str, int]) -> int:
+    """Take the offset an archive had reached while it was the followed live file.
+    
+    The live file's identity was taken when it may have been shorter, so the
+    archive is fingerprinted over the same number of bytes as each recorded
+    identity. A file checkpointed on several cycles while short has several
+    identities; all of them are removed and the furthest offset is used.
+    
+    Args:
+        archive_path: Path to the archive
+        followed: Offsets reached by followed live files, by identity
+        
+    Returns:
+        Byte offset to resume the archive from, 0 if it was never followed
+    """
+    prefix_identities = {}
+    offset = 0
+    for identity in list(followed):
+        length = identity_length(identity)
+        if length is None:
+            continue
+        if length not in prefix_identities:
+            prefix_identities[length] = file_identity(archive_path, length)
+        if prefix_identities[length] == identity:
+            offset = max(offset, followed.pop(identity))
+    return offset
+
+
+def stream_checkpoint_key(file_path: str, config: Dict[str, Any]) -> str:
+    """Build the checkpoint key recording how far a streamed file has been read.
+    
+    Args:
+        file_path: Path to the file
+        config: File source configuration
+        
+    Returns:
+        Checkpoint key string
+    """
+    return f"stream:{config.get('name', 'unnamed')}:{os.path.abspath(file_path)}"
+
+
+def stream_pending(file_path: str, config: Dict[str, Any]) -> bool:
+    """Check whether a streamed file still has events left for later cycles.
+    
+    Args:
+        file_path: Path to the file
+        config: File source configuration
+        
+    Returns:
+        True if the last batch was cut short by ``max_events``
+    """
+    store = get_checkpoint_store(config.get('checkpoint_file'))
+    return store.get(stream_checkpoint_key(file_path, config)) is not None
+
+
+def collect_stream_batch(file_path: str, config: Dict[str, Any],
+                         read: Callable[[int], Iterator[Tuple[Dict[str, Any], int]]]) -> List[Dict[str, Any]]:
+    """Collect the next batch of at most ``max_events`` events from a streamed file.
+    
+    A batch cut short by the cap records the position it reached in the
+    checkpoint store, and the next cycle resumes from there as long as the
+    file's size and modification time are unchanged. Once the end of the
+    file is reached the checkpoint is dropped, so the file is read from the
+    start again like any other non-followed file.
+    
+    Args:
+        file_path: Path to the file
+        config: File source configuration
+        read: Function taking the resume position and yielding (event,
+            position just past the event) tuples
+        
+    Returns:
+        List of collected events
+    """
+    store = get_checkpoint_store(config.get('checkpoint_file'))
+    key = stream_checkpoint_key(file_path, config)
+    stat = os.stat(file_path)
+    version = [stat.st_size, stat.st_mtime_ns]
+    checkpoint = store.get(key) or {}
+    position = checkpoint.get('position', 0) if checkpoint.get('version') == version else 0
+    max_events = config.get('max_events', DEFAULT_MAX_STREAMED_EVENTS)
+    
+    events = []
+    stream = read(position)
+    try:
+        for event, position in stream:
+            event[SOURCE_OFFSET_FIELD] = position
+            events.append(event)
+            if max_events and len(events) >= max_events:
+                store.set(key, {'version': version, 'position': position})
+                logger.info(f"Read {len(events)} events from {file_path}, resuming next cycle")
+                return events
+    finally:
+        stream.close()
+    
+    if checkpoint:
+        store.delete(key)
+    return events
+
+
 def collect_from_json_file(file_path: str, config: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Collect data from a JSON file.
     
+    Files larger than ``streaming_threshold_bytes``, or any file when
+    ``streaming: true`` is set, are parsed incrementally: events are decoded
+    one at a time from the ``events_path`` array instead of loading the
+    whole document first, at most ``max_events`` per cycle (see
+    ``collect_stream_batch``).
+    
     Args:
         file_path: Path to the JSON file
         config: File source configuration
@@ -216,11 +588,21 @@ def collect_from_json_file(file_path: str, config: Dict[str, Any]) -> List[Dict[
     Returns:
         List of collected events
     """
-    with open(file_path, 'r') as f:
+    if config.get('follow'):
+        logger.warning(f"Follow mode is not supported for JSON documents, reading all of {file_path}")
+    
+    events_path = config.get('events_path', '')
+    
+    threshold = config.get('streaming_threshold_bytes', DEFAULT_JSON_STREAMING_THRESHOLD_BYTES)
+    if config.get('streaming') or os.path.getsize(file_path) > threshold:
+        return collect_stream_batch(file_path, config, lambda start: (
+            (event, index) for index, event in enumerate(iter_json_events(file_path, events_path, start), start + 1)
+        ))
+    
+    with open_text(file_path) as f:
         data = json.load(f)
     
     # Extract events based on the path in the file
-    events_path = config.get('events_path', '')
     if events_path:
         current_data = data
         for key in events_path.split('.'):
@@ -231,18 +613,69 @@ def collect_from_json_file(file_path: str, config: Dict[str, Any]) -> List[Dict[
                 return []
         
         if isinstance(current_data, list):
-            return current_data
+            return _number_events(current_data)
         else:
             logger.warning("Events path did not resolve to a list")
             return []
     else:
         # If no events_path is specified, assume the file contains a list of events
         if isinstance(data, list):
-            return data
+            return _number_events(data)
         else:
             return [data]  # Wrap single object in a list
 
 
+def _number_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Record the 1-based index of each event of a JSON document as its position."""
+    for index, event in enumerate(events, 1):
+        if isinstance(event, dict):
+            event[SOURCE_OFFSET_FIELD] = index
+    return events
+
+
+def collect_from_ndjson_file(file_path: str, config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Collect data from an NDJSON (JSON-lines) file, one JSON object per line.
+    
+    In follow mode only appended lines are read. Otherwise plain files are
+    split into ``chunk_size_bytes`` ranges parsed by ``parallel_workers``
+    processes, at most ``max_events`` per cycle (see ``collect_stream_batch``);
+    compressed files are decompressed and parsed as a stream.
+    
+    Args:
+        file_path: Path to the NDJSON file
+        config: File source configuration
+        
+    Returns:
+        List of collected events
+    """
+    if not config.get('follow') and not config.get('start_offset') and not is_compressed(file_path):
+        return collect_stream_batch(file_path, config, lambda start: iter_ndjson_events(
+            file_path,
+            workers=config.get('parallel_workers', 1),
+            chunk_bytes=config.get('chunk_size_bytes', DEFAULT_NDJSON_CHUNK_BYTES),
+            start=start
+        ))
+    
+    events = []
+    
+    for line, position in read_lines(file_path, config):
+        line = line.strip()
+        if not line:
+            continue
+        
+        try:
+            event = json.loads(line)
+        except ValueError as e:
+            logger.warning(f"Skipping invalid JSON line in {file_path}: {str(e)}")
+            continue
+        
+        event = event if isinstance(event, dict) else {'value': event}
+        event[SOURCE_OFFSET_FIELD] = position
+        events.append(event)
+    
+    return events
+
+
 def collect_from_csv_file(file_path: str, config: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Collect data from a CSV file.
     
@@ -254,14 +687,22 @@ def collect_from_csv_file(file_path: str, config: Dict[str, Any]) -> List[Dict[s
         List of collected events
     """
     events = []
+    position = None
     
-    with open(file_path, 'r', newline='') as f:
-        # Use DictReader to automatically map columns to keys
-        reader = csv.DictReader(f)
-        for row in reader:
-            # Convert empty strings to None
-            event = {k: (v if v != '' else None) for k, v in row.items()}
-            events.append(event)
+    def lines() -> Iterator[str]:
+        nonlocal position
+        for line, position in read_lines(file_path, config, has_header=True):
+            yield line
+    
+    # Use DictReader to automatically map columns to keys; the header line is
+    # always yielded first, even when following from a mid-file offset. Rows
+    # are read lazily, so the last position read is that of the row's last line
+    reader = csv.DictReader(lines())
+    for row in reader:
+        # Convert empty strings to None
+        event = {k: (v if v != '' else None) for k, v in row.items()}
+        event[SOURCE_OFFSET_FIELD] = position
+        events.append(event)
     
     return events
 
@@ -287,23 +728,23 @@ def collect_from_log_file(file_path: str, config: Dict[str, Any]) -> List[Dict[s
         regex = re.compile(pattern)
         field_names = config.get('field_names', [])
         
-        with open(file_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                match = regex.search(line)
-                if match:
-                    if field_names:
-                        # Use provided field names
-                        event = {field_names[i]: group for i, group in enumerate(match.groups()) if i < len(field_names)}
-                    else:
-                        # Use group indices as field names
-                        event = {f"field_{i}": group for i, group in enumerate(match.groups())}
-                    
-                    event['raw_message'] = line
-                    events.append(event)
+        for line, position in read_lines(file_path, config):
+            line = line.strip()
+            if not line:
+                continue
+                
+            match = regex.search(line)
+            if match:
+                if field_names:
+                    # Use provided field names
+                    event = {field_names[i]: group for i, group in enumerate(match.groups()) if i < len(field_names)}
+                else:
+                    # Use group indices as field names
+                    event = {f"field_{i}": group for i, group in enumerate(match.groups())}
+                
+                event['raw_message'] = line
+                event[SOURCE_OFFSET_FIELD] = position
+                events.append(event)
         
         return events
         
@@ -329,7 +770,7 @@ def collect_from_syslog(config: Dict[str, Any]) -> List[Dict[str, Any]]:
         logger.error("Syslog path not provided in configuration")
         return []
     
-    if not os.path.exists(syslog_path):
+    if not is_path_pattern(syslog_path) and not os.path.exists(syslog_path):
         logger.error(f"Syslog file not found: {syslog_path}")
         return []
     
@@ -339,21 +780,37 @@ def collect_from_syslog(config: Dict[str, Any]) -> List[Dict[str, Any]]:
     
     # Use the log file collector with syslog-specific pattern
     syslog_config = {
+        'name': config.get('name', 'unnamed'),
         'pattern': syslog_pattern,
-        'field_names': field_names
+        'field_names': field_names,
+        'follow': config.get('follow', False),
+        'checkpoint_file': config.get('checkpoint_file')
     }
     
-    events = collect_from_log_file(syslog_path, syslog_config)
+    if is_path_pattern(syslog_path):
+        events = collect_from_paths(syslog_path, syslog_config, collect_from_log_file)
+    else:
+        events = collect_from_log_file(syslog_path, syslog_config)
     
     # Add syslog-specific processing if needed
     for event in events:
-        if 'priority' in event:
-            try:
-                # Extract facility and severity from priority
-                priority = int(event['priority'])
-                event['facility'] = priority >> 3
-                event['severity'] = priority & 0x7
-            except (ValueError, TypeError):
-                pass
-    
-    return events
\ No newline at end of file
+        apply_syslog_priority(event)
+    
+    return events
+
+
+def collect_from_syslog_listener(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Collect data from a syslog listener source.
+    
+    The first call binds a UDP and/or TCP socket (``host``, ``port``,
+    ``protocol``) that parses RFC 3164/5424 messages into a bounded buffer
+    of ``buffer_size`` events; each call drains up to ``max_events`` of them.
+    
+    Args:
+        config: Syslog listener source configuration
+        
+    Returns:
+        List of collected events
+    """
+    listener = get_syslog_listener(config)
+    return listener.drain(config.get('max_events'))
\ No newline at end of file
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+import os
+import glob
+import hashlib
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+from pipeline.utils.logging_config import get_logger
+from pipeline.utils.checkpoints import CheckpointStore, get_checkpoint_store
+from pipeline.ingest.archives import is_compressed, open_binary, file_identity
+
+logger = get_logger("pipeline.ingest")
+
+# Number of leading bytes fingerprinted to recognise a file rewritten in place
+HEAD_FINGERPRINT_BYTES = 256
+
+
+def checkpoint_key(file_path: str, config: Dict[str, Any]) -> str:
+    """Build the checkpoint key for a followed file.
+
+    The source name is part of the key so two sources reading the same file
+    with different parsers keep independent offsets.
+
+    Args:
+        file_path: Path to the followed file
+        config: File source configuration
+
+    Returns:
+        Checkpoint key string
+    """
+    return f"file:{config.get('name', 'unnamed')}:{os.path.abspath(file_path)}"
+
+
+def read_lines(file_path: str, config: Dict[str, Any], has_header: bool = False) -> Iterator[Tuple[str, Optional[int]]]:
+    """Read the lines of a file source, honouring tail-follow mode.
+
+    Without ``follow`` the whole file is read, decompressing .gz/.bz2/.xz
+    archives on the fly; ``start_offset`` skips that many (decompressed)
+    bytes, keeping the header line when there is one. With ``follow: true``
+    only the lines appended since the last checkpoint are yielded.
+
+    Each line comes with its position: the (decompressed) byte offset just
+    past it, which tells identical lines of a file apart and is the same
+    however the file is read again.
+
+    Args:
+        file_path: Path to the file
+        config: File source configuration
+        has_header: Whether the first line of the file is a header that must
+            always be yielded first (e.g. CSV column names)
+
+    Yields:
+        Tuples of (decoded line without trailing newline, byte offset just
+        past the line); the offset is None for a header repeated ahead of
+        lines from the middle of the file
+    """
+    if config.get('follow') and not is_compressed(file_path):
+        store = get_checkpoint_store(config.get('checkpoint_file'))
+        yield from follow_lines(file_path, store, checkpoint_key(file_path, config), has_header,
+                                drain_rotated=config.get('drain_rotated', True))
+        return
+
+    start_offset = config.get('start_offset', 0)
+    with open_binary(file_path) as f:
+        if start_offset:
+            if has_header:
+                yield f.readline().rstrip(b'\r\n').decode('utf-8', errors='replace'), None
+            # Compressed readers emulate the seek by decompressing and discarding
+            f.seek(start_offset)
+        offset = start_offset
+        for raw_line in f:
+            offset += len(raw_line)
+            yield raw_line.rstrip(b'\r\n').decode('utf-8', errors='replace'), offset
+
+
+def follow_lines(file_path: str, store: CheckpointStore, key: str,
+                 has_header: bool = False, drain_rotated: bool = True) -> Iterator[Tuple[str, Optional[int]]]:
+    """Yield lines appended to a file since its last checkpoint.
+
+    The checkpoint records the file's device, inode and byte offset. A changed
+    inode means the file was rotated: whatever was appended to the old file
+    before rotation is drained from its renamed copy (if it can still be
+    found) and the new file is read from the start. A file smaller than the
+    stored offset, or whose leading bytes no longer match the fingerprint
+    taken at the last checkpoint, was truncated or rewritten and is also read
+    from the start. A trailing
+    line without a newline is left for the next cycle. The checkpoint is
+    only advanced once the caller has consumed every line.
+
+    Args:
+        file_path: Path to the followed file
+        store: Checkpoint store holding the offsets
+        key: Checkpoint key for this file
+        has_header: Whether the first line of the file is a header
+        drain_rotated: Whether to drain the renamed copy of a rotated file;
+            disabled when the archives are collected separately
+
+    Yields:
+        Tuples of (decoded line without trailing newline, byte offset just
+        past the line, None for a repeated header)
+    """
+    stat = os.stat(file_path)
+    checkpoint = store.get(key) or {}
+    offset = checkpoint.get('offset', 0)
+    header = checkpoint.get('header')
+    header_yielded = False
+
+    if checkpoint and (checkpoint.get('inode'), checkpoint.get('device')) != (stat.st_ino, stat.st_dev):
+        logger.info(f"Detected rotation of {file_path}, reading new file from the start")
+        rotated_path = _find_rotated_file(file_path, checkpoint) if drain_rotated else None
+        if rotated_path:
+            for line, end_offset in _read_from(rotated_path, offset):
+                if has_header and header is not None and not header_yielded:
+                    yield header, None
+                    header_yielded = True
+                yield line, end_offset
+        offset = 0
+    elif offset > stat.st_size or not _head_matches(file_path, checkpoint):
+        logger.info(f"Detected truncation of {file_path}, reading from the start")
+        offset = 0
+
+    if has_header and offset > 0 and header is not None:
+        yield header, None
+        header_yielded = True
+
+    at_start = offset == 0
+    for line, end_offset in _read_from(file_path, offset):
+        offset = end_offset
+        if has_header and at_start:
+            at_start = False
+            if header_yielded:
+                # Header already emitted ahead of the rotated file's remaining rows
+                if line != header:
+                    logger.warning(f"Header of {file_path} changed after rotation")
+                header = line
+                continue
+            header = line
+        yield line, end_offset
+
+    new_checkpoint = {'device': stat.st_dev, 'inode': stat.st_ino, 'offset': offset}
+    new_checkpoint['head_length'], new_checkpoint['head_hash'] = _head_fingerprint(file_path, offset)
+    new_checkpoint['identity'] = file_identity(file_path)
+    if header is not None:
+        new_checkpoint['header'] = header
+    store.set(key, new_checkpoint)
+
+
+def _read_from(file_path: str, offset: int) -> Iterator:
+    """Read complete lines from a byte offset.
+
+    Args:
+        file_path: Path to the file
+        offset: Byte offset to start reading from
+
+    Yields:
+        Tuples of (decoded line, byte offset just past the line)
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        for raw_line in f:
+            if not raw_line.endswith(b'\n'):
+                # Incomplete line still being written, pick it up next cycle
+                break
+            offset += len(raw_line)
+            yield raw_line.rstrip(b'\r\n').decode('utf-8', errors='replace'), offset
+
+
+def _head_fingerprint(file_path: str, length: int):
+    """Hash the leading bytes of a file.
+
+    Args:
+        file_path: Path to the file
+        length: Maximum number of bytes to hash
+
+    Returns:
+        Tuple of (number of bytes hashed, hex digest)
+    """
+    with open(file_path, 'rb') as f:
+        head = f.read(min(length, HEAD_FINGERPRINT_BYTES))
+    return len(head), hashlib.sha1(head).hexdigest()
+
+
+def _head_matches(file_path: str, checkpoint: Dict[str, Any]) -> bool:
+    """Check that a file still starts with the bytes seen at the last checkpoint.
+
+    Args:
+        file_path: Path to the file
+        checkpoint: Checkpoint recorded for the file
+
+    Returns:
+        True if the fingerprint matches or none was recorded
+    """
+    head_length = checkpoint.get('head_length')
+    if not head_length:
+        return True
+    return _head_fingerprint(file_path, head_length) == (head_length, checkpoint.get('head_hash'))
+
+
+def _find_rotated_file(file_path: str, checkpoint: Dict[str, Any]) -> Optional[str]:
+    """Find the renamed copy of a rotated file by its checkpointed inode.
+
+    Args:
+        file_path: Path of the live file
+        checkpoint: Checkpoint recorded for the previous file
+
+    Returns:
+        Path of the rotated file or None if it is gone
+    """
+    for candidate in sorted(glob.glob(f"{glob.escape(file_path)}.*")):
+        try:
+            stat = os.stat(candidate)
+        except OSError:
+            continue
+        if (stat.st_ino, stat.st_dev) == (checkpoint.get('inode'), checkpoint.get('device')):
+            return candidate
+    return None
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+import json
+import threading
+from typing import Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from pipeline.utils.logging_config import get_logger
+
+logger = get_logger("pipeline.ingest")
+
+# Connection pool defaults for API sources
+DEFAULT_POOL_SIZE = 4
+DEFAULT_MAX_RETRIES = 0
+
+
+class HTTPClientPool:
+    """Owns one persistent, keep-alive requests.Session per API source.
+
+    Sessions are reused across collection cycles so DNS resolution, TCP and
+    TLS setup are paid once per connection instead of once per request. A
+    session is rebuilt when its source's connection settings change.
+    """
+
+    def __init__(self):
+        """Initialize an empty pool."""
+        self._sessions: Dict[str, requests.Session] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def session_for(self, config: Dict[str, Any]) -> requests.Session:
+        """Get the session for an API source, creating it on first use.
+
+        Args:
+            config: API source configuration
+
+        Returns:
+            Configured requests.Session for the source
+        """
+        source_name = config.get('name', 'unnamed')
+        fingerprint = _session_fingerprint(config)
+
+        with self._lock:
+            session = self._sessions.get(source_name)
+            if session is not None and self._fingerprints.get(source_name) == fingerprint:
+                return session
+
+            if session is not None:
+                logger.info(f"Connection settings of {source_name} changed, rebuilding HTTP session")
+                session.close()
+
+            session = _build_session(config)
+            self._sessions[source_name] = session
+            self._fingerprints[source_name] = fingerprint
+            return session
+
+    def close(self) -> None:
+        """Close every pooled session and its connections."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._fingerprints.clear()
+
+
+def _build_session(config: Dict[str, Any]) -> requests.Session:
+    """Create a session with the source's headers, auth and pool settings.
+
+    Args:
+        config: API source configuration
+
+    Returns:
+        Configured requests.Session
+    """
+    session = requests.Session()
+    session.headers.update(config.get('headers', {}))
+
+    # Configure authentication if provided
+    if 'auth' in config:
+        auth_config = config['auth']
+        auth_type = auth_config.get('type', '').lower()
+
+        if auth_type == 'basic':
+            session.auth = (auth_config.get('username', ''), auth_config.get('password', ''))
+        elif auth_type == 'bearer':
+            session.headers['Authorization'] = f"Bearer {auth_config.get('token', '')}"
+
+    pool_size = config.get('pool_size', DEFAULT_POOL_SIZE)
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        max_retries=config.get('max_retries', DEFAULT_MAX_RETRIES)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    if config.get('verify_ssl') is not None:
+        session.verify = config['verify_ssl']
+
+    return session
+
+
+def _session_fingerprint(config: Dict[str, Any]) -> str:
+    """Summarise the settings baked into a source's session.
+
+    Args:
+        config: API source configuration
+
+    Returns:
+        Stable string that changes when the session must be rebuilt
+    """
+    settings = {key: config.get(key) for key in ('headers', 'auth', 'pool_size', 'max_retries', 'verify_ssl')}
+    return json.dumps(settings, sort_keys=True, default=str)
+
+
+# Singleton pool shared by all API sources
+_pool: Optional[HTTPClientPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_http_client_pool() -> HTTPClientPool:
+    """Get the shared HTTP client pool, creating it on first use."""
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = HTTPClientPool()
+        return _pool
+
+
+def close_http_client_pool() -> None:
+    """Close the shared HTTP client pool if it exists."""
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator, TextIO, Tuple, Optional
+
+from pipeline.utils.logging_config import get_logger
+from pipeline.ingest.archives import open_text
+
+logger = get_logger("pipeline.ingest")
+
+# Characters read from the file per refill of the streaming parser's buffer
+READ_CHUNK_CHARS = 1 << 16
+
+# Default byte size of the NDJSON chunks handed to worker processes
+DEFAULT_NDJSON_CHUNK_BYTES = 16 * 1024 * 1024
+
+_WHITESPACE = ' \t\n\r'
+# Characters that may follow a complete scalar
+_SCALAR_TERMINATORS = ',:]}' + _WHITESPACE
+_decoder = json.JSONDecoder()
+
+# Worker processes parsing NDJSON chunks, shared by every source and cycle
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+class _JSONStreamReader:
+    """Minimal incremental JSON reader over a text file.
+
+    Only the values that are yielded are ever decoded; everything else is
+    skipped character by character, so memory use is bounded by the largest
+    single event rather than the size of the document.
+    """
+
+    def __init__(self, f: TextIO):
+        """Initialize the reader.
+
+        Args:
+            f: Text file object positioned at the start of the document
+        """
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk of the file to the buffer.
+
+        Returns:
+            False if the end of the file was reached
+        """
+        if self.eof:
+            return False
+        # Drop the consumed prefix so the buffer never holds the whole file
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        chunk = self.f.read(READ_CHUNK_CHARS)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it.
+
+        Returns:
+            The next character, or an empty string at the end of the file
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        """Consume the next non-whitespace character, which must be ``char``.
+
+        Raises:
+            ValueError: If a different character is found
+        """
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found!r}")
+        self.pos += 1
+
+    def decode_value(self) -> Any:
+        """Decode and consume the next complete JSON value.
+
+        Returns:
+            The decoded value
+        """
+        first = self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # Objects, arrays and strings end at their closing character, but a
+                # scalar cut at the buffer edge still decodes ("12." before "5",
+                # "1e" before "3"), so it is only complete once a delimiter follows
+                if (first in '{["' or self.eof
+                        or (end < len(self.buf) and self.buf[end] in _SCALAR_TERMINATORS)):
+                    self.pos = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def skip_value(self) -> None:
+        """Consume the next JSON value without decoding it."""
+        first = self.peek()
+        if first not in '{["':
+            # Scalars are short, decode and discard them
+            self.decode_value()
+            return
+
+        depth = 0
+        in_string = False
+        escaped = False
+        while True:
+            if self.pos >= len(self.buf) and not self._fill():
+                raise ValueError("Unexpected end of JSON stream")
+            char = self.buf[self.pos]
+            self.pos += 1
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+                    if depth == 0:
+                        return
+            elif char == '"':
+                in_string = True
+            elif char in '{[':
+                depth += 1
+            elif char in '}]':
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def iter_array(self, skip: int = 0) -> Iterator[Any]:
+        """Yield the elements of the array starting at the current position.
+
+        Args:
+            skip: Number of leading elements to pass over without decoding
+        """
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            if index < skip:
+                self.skip_value()
+            else:
+                yield self.decode_value()
+            index += 1
+            separator = self.peek()
+            self.pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or ']' in JSON array, found {separator!r}")
+
+    def find_key(self, key: str) -> bool:
+        """Advance inside the object at the current position to the value of ``key``.
+
+        Returns:
+            True if the key was found, False if the object ended without it
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return False
+        while True:
+            name = self.decode_value()
+            self.expect(':')
+            if name == key:
+                return True
+            self.skip_value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == '}':
+                return False
+            if separator != ',':
+                raise ValueError(f"Expected ',' or '}}' in JSON object, found {separator!r}")
+
+
+def iter_json_events(file_path: str, events_path: str = '', start_index: int = 0) -> Iterator[Dict[str, Any]]:
+    """Stream events out of a JSON document without loading it whole.
+
+    Follows ``events_path`` (dot-separated object keys) down to an array and
+    yields its elements one at a time. Without a path the document itself
+    must be an array, or is yielded as a single event if it is an object.
+
+    Args:
+        file_path: Path to the JSON file
+        events_path: Dot-separated path to the events array
+        start_index: Number of leading events to skip, to resume a read
+
+    Yields:
+        Decoded events
+    """
+    with open_text(file_path) as f:
+        reader = _JSONStreamReader(f)
+
+        for key in events_path.split('.') if events_path else []:
+            if reader.peek() != '{' or not reader.find_key(key):
+                logger.warning(f"Could not find {key} in JSON file")
+                return
+
+        if reader.peek() == '[':
+            yield from reader.iter_array(start_index)
+        elif events_path:
+            logger.warning("Events path did not resolve to a list")
+        elif not start_index:
+            # If no events_path is specified, a single object is a single event
+            yield reader.decode_value()
+
+
+def ndjson_chunks(file_path: str, chunk_bytes: int = DEFAULT_NDJSON_CHUNK_BYTES,
+                  start: int = 0) -> List[Tuple[int, int]]:
+    """Split an NDJSON file into byte ranges that end on line boundaries.
+
+    Args:
+        file_path: Path to the NDJSON file
+        chunk_bytes: Target size of each range
+        start: Offset of the first byte to cover, at the start of a line
+
+    Returns:
+        List of (start, end) byte offsets covering the file from ``start``
+    """
+    size = os.path.getsize(file_path)
+    chunks = []
+
+    with open(file_path, 'rb') as f:
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()  # Move to the end of the line the boundary falls in
+            end = min(f.tell(), size)
+            chunks.append((start, end))
+            start = end
+
+    return chunks
+
+
+def parse_ndjson_chunk(file_path: str, start: int, end: int) -> Tuple[List[Dict[str, Any]], List[int], int]:
+    """Parse the NDJSON lines in a byte range of a file.
+
+    Runs in worker processes, so it only takes picklable arguments.
+
+    Args:
+        file_path: Path to the NDJSON file
+        start: Offset of the first byte of the range
+        end: Offset just past the last byte of the range
+
+    Returns:
+        Tuple of (parsed events, offset just past the line of each event,
+        number of invalid lines skipped)
+    """
+    events = []
+    offsets = []
+    invalid = 0
+
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                invalid += 1
+                continue
+            events.append(event if isinstance(event, dict) else {'value': event})
+            offsets.append(f.tell())
+
+    return events, offsets, invalid
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Get the NDJSON worker pool, starting it or resizing it to ``workers`` processes."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None and _pool_workers != workers:
+            _pool.shutdown(wait=False)
+            _pool = None
+        if _pool is None:
+            # Collector threads may hold locks at fork time, so workers are spawned
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_ndjson_workers() -> None:
+    """Stop the NDJSON worker processes, if any were started."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def iter_ndjson_events(file_path: str, workers: int = 1, chunk_bytes: int = DEFAULT_NDJSON_CHUNK_BYTES,
+                       start: int = 0) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """Yield the events of an NDJSON file, parsing chunks in parallel.
+
+    At most ``workers`` chunks are in flight at a time and results are
+    yielded in file order, so memory stays bounded by the chunk size.
+
+    Args:
+        file_path: Path to the NDJSON file
+        workers: Number of worker processes, 1 parses in-process
+        chunk_bytes: Target size of each chunk
+        start: Byte offset to start reading from, at the start of a line
+
+    Yields:
+        Tuples of (decoded event, byte offset just past its line), so a
+        caller that stops early can resume from the last offset
+    """
+    chunks = ndjson_chunks(file_path, chunk_bytes, start)
+    invalid = 0
+
+    if workers <= 1 or len(chunks) <= 1:
+        results = (parse_ndjson_chunk(file_path, chunk_start, chunk_end) for chunk_start, chunk_end in chunks)
+    else:
+        results = _iter_parallel_chunks(file_path, chunks, workers)
+
+    try:
+        for events, offsets, chunk_invalid in results:
+            invalid += chunk_invalid
+            yield from zip(events, offsets)
+    finally:
+        results.close()
+        if invalid:
+            logger.warning(f"Skipped {invalid} invalid JSON lines in {file_path}")
+
+
+def _iter_parallel_chunks(file_path: str, chunks: List[Tuple[int, int]], workers: int) -> Iterator:
+    """Parse chunks in the worker pool, yielding the results in file order."""
+    executor = _get_pool(workers)
+    in_flight = []
+    try:
+        for chunk_start, chunk_end in chunks:
+            in_flight.append(executor.submit(parse_ndjson_chunk, file_path, chunk_start, chunk_end))
+            if len(in_flight) >= workers:
+                yield in_flight.pop(0).result()
+        while in_flight:
+            yield in_flight.pop(0).result()
+    finally:
+        # A reader that stopped early does not need the chunks still being parsed
+        for future in in_flight:
+            future.cancel()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+import requests
+
+from pipeline.utils.logging_config import get_logger
+
+logger = get_logger("pipeline.ingest")
+
+# Supported pagination strategies
+PAGINATION_STRATEGIES = ('none', 'page', 'offset', 'cursor', 'link')
+
+# Pages fetched per call unless max_pages is set; 0 fetches every page
+DEFAULT_MAX_PAGES = 100
+
+
+def extract_events(data: Any, events_path: str) -> List[Dict[str, Any]]:
+    """Extract the list of events from a decoded API response.
+
+    Args:
+        data: Decoded JSON response
+        events_path: Dot-separated path to the events list, empty for the root
+
+    Returns:
+        List of events, empty if the path does not resolve to a list
+    """
+    if events_path:
+        current_data = data
+        for key in events_path.split('.'):
+            if isinstance(current_data, dict) and key in current_data:
+                current_data = current_data[key]
+            else:
+                logger.warning(f"Could not find {key} in API response")
+                return []
+
+        if isinstance(current_data, list):
+            return current_data
+        else:
+            logger.warning("Events path did not resolve to a list")
+            return []
+    else:
+        # If no events_path is specified, assume the response is already a list of events
+        if isinstance(data, list):
+            return data
+        else:
+            return [data]  # Wrap single object in a list
+
+
+def iter_api_pages(session: requests.Session, url: str, config: Dict[str, Any],
+                   params: Dict[str, Any], position: Any = None) -> Iterator[Tuple[List[Dict[str, Any]], Any, bool]]:
+    """Fetch an API source page by page.
+
+    The ``pagination`` section of the source config selects the strategy:
+
+    - ``page``: ``page_param`` (default ``page``) counts up from ``start_page``
+    - ``offset``: ``offset_param``/``limit_param`` advance by the page length
+    - ``cursor``: the token at ``cursor_path`` in each response is sent back
+      as ``cursor_param``
+    - ``link``: the ``rel="next"`` URL of the Link header is followed
+
+    ``page_size`` (sent as ``page_size_param``/``limit_param``) ends page and
+    offset pagination on a short page, and ``max_pages`` (default
+    ``DEFAULT_MAX_PAGES``, 0 for no cap) caps the pages fetched per call so
+    large backlogs are drained over several cycles.
+
+    Args:
+        session: HTTP session used for the requests
+        url: Base URL of the source
+        config: API source configuration
+        params: Query parameters sent with every page
+        position: Position to resume from (page number, offset, cursor or URL)
+
+    Yields:
+        Tuples of (page events, position of the next page, whether more pages remain)
+    """
+    pagination = config.get('pagination') or {}
+    strategy = pagination.get('type', 'none').lower()
+    if strategy not in PAGINATION_STRATEGIES:
+        raise ValueError(f"Unsupported pagination type: {strategy}")
+
+    max_pages = pagination.get('max_pages', DEFAULT_MAX_PAGES)
+    timeout = config.get('request_timeout_seconds', 30)
+    pages = 0
+
+    while True:
+        request_url, request_params = _build_request(url, params, strategy, pagination, position)
+        response = session.get(request_url, params=request_params, timeout=timeout)
+        response.raise_for_status()
+
+        data = response.json()
+        events = extract_events(data, config.get('events_path', ''))
+        pages += 1
+
+        next_position, has_more = _next_position(strategy, pagination, response, data, events, position)
+        yield events, next_position, has_more
+
+        if not has_more or (max_pages and pages >= max_pages):
+            return
+        position = next_position
+
+
+def _build_request(url: str, params: Dict[str, Any], strategy: str, pagination: Dict[str, Any],
+                   position: Any) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """Build the URL and query parameters for one page.
+
+    Args:
+        url: Base URL of the source
+        params: Query parameters sent with every page
+        strategy: Pagination strategy
+        pagination: Pagination configuration
+        position: Position of the page to fetch, None for the first page
+
+    Returns:
+        Tuple of (request URL, query parameters)
+    """
+    request_params = dict(params)
+    page_size = pagination.get('page_size')
+
+    if strategy == 'page':
+        request_params[pagination.get('page_param', 'page')] = position or pagination.get('start_page', 1)
+        if page_size:
+            request_params[pagination.get('page_size_param', 'per_page')] = page_size
+    elif strategy == 'offset':
+        request_params[pagination.get('offset_param', 'offset')] = position or 0
+        if page_size:
+            request_params[pagination.get('limit_param', 'limit')] = page_size
+    elif strategy == 'cursor':
+        if position:
+            request_params[pagination.get('cursor_param', 'cursor')] = position
+        if page_size:
+            request_params[pagination.get('page_size_param', 'limit')] = page_size
+    elif strategy == 'link' and position:
+        # The next link already carries every query parameter
+        return position, None
+
+    return url, request_params
+
+
+def _next_position(strategy: str, pagination: Dict[str, Any], response: requests.Response, data: Any,
+                   events: List[Dict[str, Any]], position: Any) -> Tuple[Any, bool]:
+    """Work out where the next page starts.
+
+    Args:
+        strategy: Pagination strategy
+        pagination: Pagination configuration
+        response: Response of the current page
+        data: Decoded JSON body of the current page
+        events: Events extracted from the current page
+        position: Position of the current page
+
+    Returns:
+        Tuple of (next position, whether another page should be fetched)
+    """
+    page_size = pagination.get('page_size')
+    full_page = bool(events) and (not page_size or len(events) >= page_size)
+
+    if strategy == 'page':
+        current = position or pagination.get('start_page', 1)
+        return current + 1, full_page
+    elif strategy == 'offset':
+        current = position or 0
+        return current + len(events), full_page
+    elif strategy == 'cursor':
+        token = _resolve_path(data, pagination.get('cursor_path', 'next_cursor'))
+        if not token:
+            return position, False
+        # Feeds that hand back the same cursor when idle are drained
+        return token, bool(events) and token != position
+    elif strategy == 'link':
+        next_url = response.links.get('next', {}).get('url')
+        return next_url, bool(next_url)
+
+    return None, False
+
+
+def _resolve_path(data: Any, path: str) -> Any:
+    """Resolve a dot-separated path in a decoded JSON document.
+
+    Args:
+        data: Decoded JSON document
+        path: Dot-separated path
+
+    Returns:
+        The value at the path or None if it does not exist
+    """
+    current_data = data
+    for key in path.split('.'):
+        if isinstance(current_data, dict) and key in current_data:
+            current_data = current_data[key]
+        else:
+            return None
+    return current_data
+
+
+def later_mark(current: Any, candidate: Any) -> Any:
+    """Return the later of two high-water mark values.
+
+    Numbers are compared numerically and everything else as strings, which
+    orders ISO-8601 timestamps correctly.
+
+    Args:
+        current: Current high-water mark, may be None
+        candidate: Candidate value, may be None
+
+    Returns:
+        The later value
+    """
+    if candidate is None:
+        return current
+    if current is None:
+        return candidate
+
+    numeric = (int, float)
+    if isinstance(current, numeric) and isinstance(candidate, numeric):
+        return max(current, candidate)
+    return candidate if str(candidate) > str(current) else current
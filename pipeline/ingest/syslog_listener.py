@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+
+import re
+import threading
+import socketserver
+from collections import deque
+from typing import List, Dict, Any, Optional, Tuple
+
+from pipeline.utils.logging_config import get_logger
+from pipeline.utils.metrics import record_processing_error
+
+logger = get_logger("pipeline.ingest")
+
+# Listener defaults
+DEFAULT_LISTENER_HOST = "0.0.0.0"
+DEFAULT_LISTENER_PORT = 5514
+DEFAULT_BUFFER_SIZE = 100000
+MAX_FRAME_BYTES = 64 * 1024
+
+# Digits accepted in an RFC 6587 octet count; a longer run of digits starts a
+# newline-delimited message instead
+MAX_OCTET_COUNT_DIGITS = 9
+
+# RFC 5424: <PRI>VERSION TIMESTAMP HOSTNAME APP-NAME PROCID MSGID STRUCTURED-DATA [MSG]
+_RFC5424_PATTERN = re.compile(
+    r'^<(\d{1,3})>(\d{1,2}) (\S+) (\S+) (\S+) (\S+) (\S+) (-|(?:\[(?:[^\]\\]|\\.)*\])+)(?: (.*))?$',
+    re.DOTALL
+)
+
+# RFC 3164: <PRI>Mmm dd hh:mm:ss HOSTNAME TAG[PID]: MSG
+_RFC3164_PATTERN = re.compile(
+    r'^<(\d{1,3})>([A-Z][a-z]{2} [ \d]\d \d{2}:\d{2}:\d{2}) (\S+) ([^\s:\[]+)(?:\[(\d+)\])?:? ?(.*)$',
+    re.DOTALL
+)
+
+
+def apply_syslog_priority(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Add facility and severity fields derived from a syslog priority.
+
+    Args:
+        event: Event with a ``priority`` field
+
+    Returns:
+        The same event, updated in place
+    """
+    if 'priority' in event:
+        try:
+            # Extract facility and severity from priority
+            priority = int(event['priority'])
+            event['facility'] = priority >> 3
+            event['severity'] = priority & 0x7
+        except (ValueError, TypeError):
+            pass
+    return event
+
+
+def parse_syslog_frame(frame: str) -> Dict[str, Any]:
+    """Parse an RFC 5424 or RFC 3164 syslog message.
+
+    Args:
+        frame: A single syslog message
+
+    Returns:
+        Event dictionary; frames matching neither format keep only the raw message
+    """
+    match = _RFC5424_PATTERN.match(frame)
+    if match:
+        event = {
+            'priority': match.group(1),
+            'version': match.group(2),
+            'timestamp': _nil(match.group(3)),
+            'hostname': _nil(match.group(4)),
+            'process': _nil(match.group(5)),
+            'pid': _nil(match.group(6)),
+            'msgid': _nil(match.group(7)),
+            'structured_data': _nil(match.group(8)),
+            'message': match.group(9) or '',
+        }
+    else:
+        match = _RFC3164_PATTERN.match(frame)
+        if match:
+            event = {
+                'priority': match.group(1),
+                'timestamp': match.group(2),
+                'hostname': match.group(3),
+                'process': match.group(4),
+                'pid': match.group(5),
+                'message': match.group(6),
+            }
+        else:
+            event = {'message': frame}
+
+    event['raw_message'] = frame
+    return apply_syslog_priority(event)
+
+
+def _nil(value: str) -> Optional[str]:
+    """Map the RFC 5424 NILVALUE ("-") to None."""
+    return None if value == '-' else value
+
+
+class SyslogListener:
+    """Receives syslog messages over UDP and/or TCP into a bounded buffer.
+
+    UDP datagrams are read by a single thread; each TCP connection gets its
+    own. When the buffer is full the oldest events are dropped so a burst
+    can never exhaust memory; drops are logged and counted as processing errors.
+    """
+
+    def __init__(self, host: str = DEFAULT_LISTENER_HOST, port: int = DEFAULT_LISTENER_PORT,
+                 protocol: str = "udp", buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """Initialize the listener.
+
+        Args:
+            host: Address to bind
+            port: Port to bind, 0 picks a free port
+            protocol: udp, tcp or both
+            buffer_size: Maximum number of buffered events
+        """
+        self.host = host
+        self.port = port
+        self.protocol = protocol.lower()
+        self.buffer = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._servers = []
+        self._threads = []
+
+    def start(self) -> None:
+        """Bind the sockets and start serving on background threads."""
+        if self._servers:
+            logger.warning("Syslog listener is already running")
+            return
+
+        listener = self
+
+        class UDPHandler(socketserver.BaseRequestHandler):
+            def handle(self):
+                data = self.request[0]
+                for frame in data.decode('utf-8', errors='replace').splitlines():
+                    listener.receive(frame)
+
+        class TCPHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for frame in _iter_tcp_frames(self.rfile):
+                    listener.receive(frame)
+
+        if self.protocol in ("udp", "both"):
+            self._servers.append(_UDPServer((self.host, self.port), UDPHandler))
+        if self.protocol in ("tcp", "both"):
+            # With both protocols and port 0, reuse the port picked for UDP
+            port = self._servers[0].server_address[1] if self._servers else self.port
+            self._servers.append(_ThreadingTCPServer((self.host, port), TCPHandler))
+        if not self._servers:
+            raise ValueError(f"Unsupported syslog listener protocol: {self.protocol}")
+
+        self.port = self._servers[0].server_address[1]
+        for server in self._servers:
+            thread = threading.Thread(target=server.serve_forever, daemon=True, name="syslog-listener")
+            thread.start()
+            self._threads.append(thread)
+
+        logger.info(f"Syslog listener on {self.host}:{self.port} ({self.protocol})")
+
+    def stop(self) -> None:
+        """Stop serving and close the sockets."""
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        for thread in self._threads:
+            thread.join(timeout=5.0)
+        self._servers = []
+        self._threads = []
+
+    def receive(self, frame: str) -> None:
+        """Parse a frame and add it to the buffer.
+
+        Args:
+            frame: A single syslog message
+        """
+        frame = frame.strip('\r\n\x00')
+        if not frame:
+            return
+
+        event = parse_syslog_frame(frame)
+        with self._lock:
+            if len(self.buffer) == self.buffer.maxlen:
+                self.dropped += 1
+                record_processing_error("syslog_listener", "buffer_overflow")
+            self.buffer.append(event)
+
+    def drain(self, max_events: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Remove and return buffered events, oldest first.
+
+        Args:
+            max_events: Maximum number of events to return, None for all
+
+        Returns:
+            List of events
+        """
+        with self._lock:
+            count = len(self.buffer) if max_events is None else min(max_events, len(self.buffer))
+            events = [self.buffer.popleft() for _ in range(count)]
+            dropped, self.dropped = self.dropped, 0
+
+        if dropped:
+            logger.warning(f"Syslog listener buffer overflowed, dropped {dropped} events")
+        return events
+
+
+class _UDPServer(socketserver.UDPServer):
+    # Datagrams are handled on the serving thread: parsing one is cheaper than
+    # starting a thread for it, and a flood cannot spawn unbounded threads
+    allow_reuse_address = True
+    max_packet_size = MAX_FRAME_BYTES
+
+
+class _ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def _iter_tcp_frames(rfile):
+    """Split a TCP syslog stream into messages.
+
+    Supports RFC 6587 octet counting ("LEN MSG") and newline-delimited framing.
+    Messages longer than MAX_FRAME_BYTES are truncated and the rest of them
+    is discarded, so it is not mistaken for the following messages.
+
+    Args:
+        rfile: Buffered binary stream of the connection
+
+    Yields:
+        Decoded syslog messages
+    """
+    while True:
+        first = rfile.peek(1)[:1]
+        if not first:
+            return
+        if first.isdigit():
+            length = b''
+            while True:
+                char = rfile.read(1)
+                if not char:
+                    return
+                if char == b' ' or not char.isdigit() or len(length) == MAX_OCTET_COUNT_DIGITS:
+                    break
+                length += char
+            if char == b' ' and length:
+                frame = _read_counted_frame(rfile, int(length))
+            else:
+                # Not an octet count, but a newline-delimited message starting with digits
+                frame = _read_line_frame(rfile, length + char)
+        else:
+            frame = _read_line_frame(rfile)
+            if not frame:
+                return
+        yield frame.decode('utf-8', errors='replace')
+
+
+def _read_counted_frame(rfile, length: int) -> bytes:
+    """Read an octet-counted message, discarding what exceeds MAX_FRAME_BYTES."""
+    frame = rfile.read(min(length, MAX_FRAME_BYTES))
+    excess = length - len(frame)
+    if excess > 0 and len(frame) == MAX_FRAME_BYTES:
+        record_processing_error("syslog_listener", "oversized_frame")
+        while excess > 0:
+            skipped = rfile.read(min(excess, MAX_FRAME_BYTES))
+            if not skipped:
+                break
+            excess -= len(skipped)
+    return frame
+
+
+def _read_line_frame(rfile, prefix: bytes = b'') -> bytes:
+    """Read a newline-delimited message, discarding what exceeds MAX_FRAME_BYTES."""
+    if prefix.endswith(b'\n'):
+        return prefix
+    frame = prefix + rfile.readline(MAX_FRAME_BYTES - len(prefix))
+    if len(frame) >= MAX_FRAME_BYTES and not frame.endswith(b'\n'):
+        record_processing_error("syslog_listener", "oversized_frame")
+        while True:
+            skipped = rfile.readline(MAX_FRAME_BYTES)
+            if not skipped or skipped.endswith(b'\n'):
+                break
+    return frame
+
+
+# Running listeners, keyed by bind address and protocol
+_listeners: Dict[Tuple[str, int, str], SyslogListener] = {}
+_listeners_lock = threading.Lock()
+
+
+def get_syslog_listener(config: Dict[str, Any]) -> SyslogListener:
+    """Get the running listener for a source configuration, starting it on first use.
+
+    Args:
+        config: syslog_listener source configuration
+
+    Returns:
+        Running SyslogListener
+    """
+    key = (
+        config.get('host', DEFAULT_LISTENER_HOST),
+        int(config.get('port', DEFAULT_LISTENER_PORT)),
+        config.get('protocol', 'udp').lower()
+    )
+
+    with _listeners_lock:
+        listener = _listeners.get(key)
+        if listener is None:
+            listener = SyslogListener(key[0], key[1], key[2], config.get('buffer_size', DEFAULT_BUFFER_SIZE))
+            listener.start()
+            _listeners[key] = listener
+        return listener
+
+
+def stop_syslog_listeners() -> None:
+    """Stop every running syslog listener."""
+    with _listeners_lock:
+        for listener in _listeners.values():
+            listener.stop()
+        _listeners.clear()
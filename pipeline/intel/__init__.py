@@ -0,0 +1 @@
+# TECHNOSHIELD Pipeline Threat Intelligence Module
\ No newline at end of file
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+
+import socket
+from typing import Any, Optional, Tuple
+
+
+class _Node:
+    """Radix tree node covering the first ``length`` bits of ``key``."""
+
+    __slots__ = ('key', 'length', 'value', 'children')
+
+    def __init__(self, key: int, length: int, value: Any = None):
+        self.key = key
+        self.length = length
+        self.value = value
+        self.children = [None, None]
+
+
+class _RadixTree:
+    """Path-compressed binary radix tree for longest-prefix matching."""
+
+    def __init__(self, width: int):
+        self.width = width
+        self.root = _Node(0, 0)
+        # masks[n] keeps the n most significant bits of an address
+        self.masks = [((1 << n) - 1) << (width - n) for n in range(width + 1)]
+        self.size = 0
+
+    def insert(self, key: int, length: int, value: Any) -> None:
+        """Insert a prefix; re-inserting a prefix replaces its value."""
+        width = self.width
+        key &= self.masks[length]
+        node = self.root
+        while True:
+            if length == node.length:
+                if node.value is None:
+                    self.size += 1
+                node.value = value
+                return
+
+            bit = (key >> (width - 1 - node.length)) & 1
+            child = node.children[bit]
+            if child is None:
+                node.children[bit] = _Node(key, length, value)
+                self.size += 1
+                return
+
+            # Length of the prefix shared by the new key and the child
+            limit = min(child.length, length)
+            diff = (child.key ^ key) & self.masks[limit]
+            common = limit if not diff else width - diff.bit_length()
+            if common == child.length:
+                node = child
+                continue
+
+            # Split the edge to the child at the first differing bit
+            middle = _Node(key & self.masks[common], common)
+            node.children[bit] = middle
+            middle.children[(child.key >> (width - 1 - common)) & 1] = child
+            if common == length:
+                middle.value = value
+            else:
+                middle.children[(key >> (width - 1 - common)) & 1] = _Node(key, length, value)
+            self.size += 1
+            return
+
+    def lookup(self, address: int) -> Any:
+        """Return the value of the longest prefix containing ``address``."""
+        width = self.width
+        masks = self.masks
+        best = None
+        node = self.root
+        while node is not None:
+            if (address ^ node.key) & masks[node.length]:
+                break
+            if node.value is not None:
+                best = node.value
+            if node.length == width:
+                break
+            node = node.children[(address >> (width - 1 - node.length)) & 1]
+        return best
+
+
+def parse_address(address: str) -> Optional[Tuple[int, int]]:
+    """Parse an IPv4 or IPv6 address.
+
+    Args:
+        address: Address string
+
+    Returns:
+        Tuple of (IP version, address as an integer), or None if invalid
+    """
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, address), 'big')
+    except (OSError, TypeError):
+        pass
+    try:
+        return 6, int.from_bytes(socket.inet_pton(socket.AF_INET6, address), 'big')
+    except (OSError, TypeError):
+        return None
+
+
+class CIDRTree:
+    """Longest-prefix matching of IP addresses against IPv4 and IPv6 networks.
+
+    Single addresses are kept in a dictionary keyed by their string form, so
+    the common case of an exact IP indicator is a single hash lookup; only
+    real networks go into the radix trees.
+    """
+
+    def __init__(self):
+        self._exact = {}
+        self._trees = {4: _RadixTree(32), 6: _RadixTree(128)}
+
+    def __len__(self) -> int:
+        return len(self._exact) + self._trees[4].size + self._trees[6].size
+
+    def insert(self, network: str, value: Any) -> bool:
+        """Add an address or CIDR network.
+
+        Args:
+            network: Address or network, e.g. 203.0.113.7 or 198.51.100.0/24
+            value: Value returned by lookups matching the network
+
+        Returns:
+            False if the network could not be parsed
+        """
+        address, _, prefix = network.strip().partition('/')
+        parsed = parse_address(address)
+        if parsed is None:
+            return False
+        version, key = parsed
+        tree = self._trees[version]
+        try:
+            length = int(prefix) if prefix else tree.width
+        except ValueError:
+            return False
+        if not 0 <= length <= tree.width:
+            return False
+
+        if length == tree.width:
+            # Store exact addresses in canonical form so lookups can skip parsing
+            canonical = socket.inet_ntop(socket.AF_INET if version == 4 else socket.AF_INET6,
+                                         key.to_bytes(tree.width // 8, 'big'))
+            self._exact[canonical] = value
+        else:
+            tree.insert(key, length, value)
+        return True
+
+    def lookup(self, address: str) -> Any:
+        """Find the most specific entry containing an address.
+
+        Args:
+            address: IPv4 or IPv6 address string
+
+        Returns:
+            The value of the matching entry, or None
+        """
+        value = self._exact.get(address)
+        if value is not None:
+            return value
+        if not self._trees[4].size and not self._trees[6].size and address.isascii() and ':' not in address:
+            return None
+
+        parsed = parse_address(address)
+        if parsed is None:
+            return None
+        version, key = parsed
+        if version == 6 and self._exact:
+            # Addresses may be written in a non-canonical form
+            canonical = socket.inet_ntop(socket.AF_INET6, key.to_bytes(16, 'big'))
+            value = self._exact.get(canonical)
+            if value is not None:
+                return value
+        return self._trees[version].lookup(key)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+from typing import Any, Optional
+
+# Key holding the value of a node; labels are never empty so it cannot clash
+_VALUE = ''
+
+
+def normalize_domain(domain: str) -> str:
+    """Normalize a domain name for matching.
+
+    Args:
+        domain: Domain name, optionally with a trailing dot or wildcard prefix
+
+    Returns:
+        Lowercase domain without the trailing dot and leading ``*.``
+    """
+    domain = domain.strip().lower().rstrip('.')
+    if domain.startswith('*.'):
+        domain = domain[2:]
+    return domain
+
+
+class DomainSuffixTrie:
+    """Matches domain names against a set of domains and all their subdomains.
+
+    Domains are stored as reversed label paths (``evil.example.com`` becomes
+    com -> example -> evil), so a lookup walks at most one node per label of
+    the queried name, however many domains are loaded.
+    """
+
+    def __init__(self):
+        self._root = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, domain: str, value: Any) -> bool:
+        """Add a domain; it matches itself and any subdomain.
+
+        Args:
+            domain: Domain name
+            value: Value returned by lookups matching the domain
+
+        Returns:
+            False if the domain is empty
+        """
+        domain = normalize_domain(domain)
+        if not domain:
+            return False
+
+        node = self._root
+        for label in reversed(domain.split('.')):
+            if not label:
+                return False
+            node = node.setdefault(label, {})
+        if _VALUE not in node:
+            self._size += 1
+        node[_VALUE] = value
+        return True
+
+    def lookup(self, domain: str) -> Optional[Any]:
+        """Find the most specific entry that a domain equals or is a subdomain of.
+
+        Args:
+            domain: Domain name
+
+        Returns:
+            The value of the matching entry, or None
+        """
+        if not self._size:
+            return None
+
+        best = None
+        node = self._root
+        for label in reversed(domain.lower().rstrip('.').split('.')):
+            node = node.get(label)
+            if node is None:
+                break
+            value = node.get(_VALUE)
+            if value is not None:
+                best = value
+        return best
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import time
+import threading
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+
+from pipeline.utils.logging_config import get_logger, log_error
+from pipeline.utils.metrics import record_ioc_indicators
+from pipeline.intel.cidr_tree import CIDRTree
+from pipeline.intel.domain_trie import DomainSuffixTrie
+from pipeline.intel.hash_index import HashIndex, build_hash_index, parse_hash
+
+logger = get_logger("pipeline.intel")
+
+# Threat intelligence defaults, overridden by the threat_intel configuration
+DEFAULT_INDEX_DIR = "state/intel"
+DEFAULT_RELOAD_INTERVAL_SECONDS = 300
+
+# Indicator types a feed can hold
+FEED_TYPES = ('ip', 'domain', 'hash')
+
+_UNSAFE_NAME_CHARS = re.compile(r'[^A-Za-z0-9_.-]')
+
+
+def read_indicators(path: str) -> Iterator[str]:
+    """Read the indicators of a feed file.
+
+    Feeds hold one indicator per line. Blank lines and ``#`` comments are
+    ignored, as is anything after the first whitespace or comma, so CSV
+    exports with the indicator in the first column can be used as they are.
+
+    Args:
+        path: Path to the feed file
+
+    Yields:
+        Indicator strings
+    """
+    with open(path, 'r', errors='replace') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            indicator = line.replace(',', ' ').split(None, 1)[0]
+            if indicator:
+                yield indicator
+
+
+class IOCSnapshot:
+    """Immutable set of loaded indicators.
+
+    A snapshot is never modified once built; reloading builds a new one and
+    swaps it in, so a batch being analyzed keeps a consistent view.
+    """
+
+    def __init__(self, networks: Optional[CIDRTree] = None, domains: Optional[DomainSuffixTrie] = None,
+                 hashes: Optional[List[Tuple[str, HashIndex]]] = None,
+                 counts: Optional[Dict[Tuple[str, str], int]] = None):
+        """Initialize the snapshot.
+
+        Args:
+            networks: IP addresses and networks, valued by feed name
+            domains: Domains, valued by feed name
+            hashes: (feed name, index) pairs of file hashes
+            counts: Number of indicators, keyed by (feed name, indicator type)
+        """
+        self.networks = networks or CIDRTree()
+        self.domains = domains or DomainSuffixTrie()
+        self.hashes = hashes or []
+        self.counts = counts or {}
+
+    @property
+    def empty(self) -> bool:
+        """Whether no indicators are loaded."""
+        return not (len(self.networks) or len(self.domains) or self.hashes)
+
+    def match_ip(self, address: str) -> Optional[str]:
+        """Get the feed listing an IP address, directly or through a network."""
+        return self.networks.lookup(address)
+
+    def match_domain(self, domain: str) -> Optional[str]:
+        """Get the feed listing a domain or one of its parent domains."""
+        return self.domains.lookup(domain)
+
+    def match_hash(self, value: str) -> Optional[str]:
+        """Get the feed listing a hex MD5, SHA-1 or SHA-256 file hash."""
+        if not self.hashes:
+            return None
+        digest = parse_hash(value)
+        if digest is None:
+            return None
+        for feed, index in self.hashes:
+            if digest in index:
+                return feed
+        return None
+
+
+class ThreatIntel:
+    """Loads threat intelligence feeds and reloads them when they change."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize the feed store; nothing is loaded until ``load`` is called.
+
+        Args:
+            config: The threat_intel configuration section
+        """
+        config = config or {}
+        self.feeds: List[Dict[str, Any]] = config.get('feeds', [])
+        self.index_dir = config.get('index_dir', DEFAULT_INDEX_DIR)
+        self.reload_interval = config.get('reload_interval_seconds', DEFAULT_RELOAD_INTERVAL_SECONDS)
+        self.snapshot = IOCSnapshot()
+        self._signature = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self) -> IOCSnapshot:
+        """Build a snapshot from the feed files and make it current.
+
+        Unreadable feeds are logged and skipped; the rest are still loaded.
+
+        Returns:
+            The new snapshot
+        """
+        with self._lock:
+            signature = self._feed_signature()
+            snapshot = self._build_snapshot()
+            # Swapping the reference is atomic, readers see the old or the new snapshot
+            self.snapshot = snapshot
+            self._signature = signature
+            self._checked_at = time.monotonic()
+
+        record_ioc_indicators(snapshot.counts)
+        logger.info(f"Loaded {sum(snapshot.counts.values())} indicators from {len(self.feeds)} threat intelligence feeds")
+        return snapshot
+
+    def reload_if_changed(self) -> bool:
+        """Reload the feeds if any file changed, at most once per reload interval.
+
+        Returns:
+            True if the feeds were reloaded
+        """
+        if not self.feeds or time.monotonic() - self._checked_at < self.reload_interval:
+            return False
+        self._checked_at = time.monotonic()
+        if self._feed_signature() == self._signature:
+            return False
+        self.load()
+        return True
+
+    def _feed_signature(self) -> Tuple:
+        """Modification time and size of every feed file, None for missing files."""
+        signature = []
+        for feed in self.feeds:
+            try:
+                stat = os.stat(feed['path'])
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except (OSError, KeyError):
+                signature.append(None)
+        return tuple(signature)
+
+    def _build_snapshot(self) -> IOCSnapshot:
+        """Parse every feed into a new snapshot."""
+        networks = CIDRTree()
+        domains = DomainSuffixTrie()
+        hashes = []
+        counts = {}
+
+        for feed in self.feeds:
+            name = feed.get('name') or os.path.basename(feed.get('path', ''))
+            feed_type = feed.get('type', '').lower()
+            if feed_type not in FEED_TYPES:
+                logger.error(f"Unsupported threat intelligence feed type for {name}: {feed_type}")
+                continue
+
+            try:
+                loaded = 0
+                invalid = 0
+                if feed_type == 'hash':
+                    indexes = self._build_hash_indexes(name, feed['path'])
+                    hashes.extend((name, index) for index in indexes)
+                    loaded = sum(len(index) for index in indexes)
+                else:
+                    insert = networks.insert if feed_type == 'ip' else domains.insert
+                    for indicator in read_indicators(feed['path']):
+                        if insert(indicator, name):
+                            loaded += 1
+                        else:
+                            invalid += 1
+            except (OSError, KeyError, ValueError) as e:
+                log_error("threat_intel_feed_error", str(e), {"feed": name})
+                continue
+
+            if invalid:
+                logger.warning(f"Skipped {invalid} invalid indicators in threat intelligence feed {name}")
+            counts[(name, feed_type)] = loaded
+
+        return IOCSnapshot(networks, domains, hashes, counts)
+
+    def _build_hash_indexes(self, name: str, path: str) -> List[HashIndex]:
+        """Write a sorted index file per digest size of a hash feed and map them."""
+        by_size: Dict[int, List[bytes]] = {}
+        invalid = 0
+        for indicator in read_indicators(path):
+            digest = parse_hash(indicator)
+            if digest is None:
+                invalid += 1
+            else:
+                by_size.setdefault(len(digest), []).append(digest)
+        if invalid:
+            logger.warning(f"Skipped {invalid} invalid hashes in threat intelligence feed {name}")
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        indexes = []
+        for digest_size, digests in sorted(by_size.items()):
+            index_path = os.path.join(self.index_dir, f"{_UNSAFE_NAME_CHARS.sub('_', name)}.{digest_size * 8}.idx")
+            build_hash_index(digests, digest_size, index_path)
+            indexes.append(HashIndex(index_path))
+        return indexes
+
+
+_intel = ThreatIntel()
+
+
+def configure_threat_intel(config: Dict[str, Any]) -> ThreatIntel:
+    """Apply the threat_intel configuration and load its feeds.
+
+    Args:
+        config: The threat_intel configuration section
+
+    Returns:
+        The configured ThreatIntel
+    """
+    global _intel
+    intel = ThreatIntel(config)
+    if intel.feeds:
+        intel.load()
+    _intel = intel
+    return intel
+
+
+def get_threat_intel() -> ThreatIntel:
+    """Get the threat intelligence shared by the detectors."""
+    return _intel
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import os
+import struct
+import binascii
+from typing import Iterable, Optional
+
+import numpy as np
+
+# File layout: magic, digest size, entry count, then the sorted digests
+_MAGIC = b'TSIOCH01'
+_HEADER = struct.Struct('<8sII')
+
+# Digest sizes in bytes of the supported hash types
+DIGEST_SIZES = {32: 16, 40: 20, 64: 32}  # MD5, SHA-1, SHA-256 hex lengths
+
+
+def parse_hash(value: str) -> Optional[bytes]:
+    """Decode a hex MD5, SHA-1 or SHA-256 digest.
+
+    Args:
+        value: Hex digest
+
+    Returns:
+        Raw digest bytes, or None if the value is not a supported digest
+    """
+    value = value.strip()
+    if len(value) not in DIGEST_SIZES:
+        return None
+    try:
+        return binascii.unhexlify(value)
+    except (binascii.Error, ValueError):
+        return None
+
+
+def build_hash_index(digests: Iterable[bytes], digest_size: int, path: str) -> int:
+    """Write a sorted, de-duplicated hash index file.
+
+    The file is written next to ``path`` and renamed into place, so readers
+    that have the previous index mapped are never affected.
+
+    Args:
+        digests: Raw digests, all ``digest_size`` bytes long
+        digest_size: Size of each digest in bytes
+        path: Destination file
+
+    Returns:
+        Number of digests written
+    """
+    array = np.unique(np.array(list(digests), dtype=f'S{digest_size}'))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, digest_size, len(array)))
+        f.write(array.tobytes())
+    os.replace(tmp_path, path)
+    return len(array)
+
+
+class HashIndex:
+    """Memory-mapped sorted array of fixed-size digests.
+
+    Lookups are a binary search over the mapped file, so millions of hashes
+    can be checked without loading them onto the Python heap.
+    """
+
+    def __init__(self, path: str):
+        """Map an index file written by ``build_hash_index``.
+
+        Args:
+            path: Index file path
+
+        Raises:
+            ValueError: If the file is not a hash index
+        """
+        with open(path, 'rb') as f:
+            magic, digest_size, count = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError(f"Not a hash index file: {path}")
+
+        self.path = path
+        self.digest_size = digest_size
+        if count:
+            self._digests = np.memmap(path, dtype=f'S{digest_size}', mode='r',
+                                      offset=_HEADER.size, shape=(count,))
+        else:
+            self._digests = np.empty(0, dtype=f'S{digest_size}')
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+    def __contains__(self, digest: bytes) -> bool:
+        if len(digest) != self.digest_size or not len(self._digests):
+            return False
+        position = int(np.searchsorted(self._digests, digest))
+        # Fixed-width byte strings come back from numpy without trailing NULs
+        return position < len(self._digests) and self._digests[position] == digest.rstrip(b'\x00')
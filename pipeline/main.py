@@ -6,41 +6,84 @@ import logging
 from datetime import datetime
 from dotenv import load_dotenv
 
-# Load environment variables first
+# Load environment variables first, some modules read them at import
 load_dotenv()
 
-# Import pipeline components
+# Import pipeline components. Nothing else may run at import time: worker
+# processes are spawned and re-import this module as __mp_main__
 from pipeline.utils.logging_config import setup_logging, get_logger
+from pipeline.utils.metrics import start_metrics_server
 from pipeline.utils.metrics_updater import start_metrics_updater
-
-# Setup logging
-setup_logging()
-logger = get_logger("pipeline")
-
-# Import pipeline components
-from pipeline.ingest import data_collector
 from pipeline.process import event_processor
 from pipeline.models import threat_detector
+from pipeline.intel.feeds import configure_threat_intel
+from pipeline.ingest.http_client import close_http_client_pool
+from pipeline.ingest.json_stream import shutdown_ndjson_workers
+from pipeline.ingest.syslog_listener import stop_syslog_listeners
 from pipeline.utils import db_connector, config
+from pipeline.utils.event_archiver import (
+    EventArchiver, DEFAULT_ARCHIVE_QUEUE_CAPACITY, DEFAULT_ARCHIVE_BATCH_SIZE, DEFAULT_ARCHIVE_FLUSH_SECONDS
+)
+from pipeline.runtime import StagedPipeline, collect_cycle, analyze_cycle, run_overlapped_cycles
+
+logger = get_logger("pipeline")
 
 
 def main():
     """Main entry point for the TECHNOSHIELD data processing pipeline."""
+    setup_logging()
     logger.info("Starting TECHNOSHIELD data processing pipeline")
+    archiver = None
     
     try:
+        # Serve Prometheus metrics for the whole pipeline on port 8000
+        try:
+            start_metrics_server(port=8000)
+        except Exception as e:
+            logger.error(f"Failed to start metrics server: {str(e)}")
+
         # Start metrics updater for periodic metrics updates
         start_metrics_updater(update_interval=60)
         logger.info("Started metrics updater")
         
-        # Initialize database connection
-        db = db_connector.DatabaseConnector()
-        logger.info("Database connection established")
-        
         # Load configuration
         pipeline_config = config.load_config()
         logger.info(f"Loaded configuration with {len(pipeline_config['data_sources'])} data sources")
         
+        # Initialize database connection
+        db = db_connector.DatabaseConnector(
+            insert_chunk_size=pipeline_config.get('database', {}).get(
+                'insert_chunk_size', db_connector.DEFAULT_INSERT_CHUNK_SIZE)
+        )
+        logger.info("Database connection established")
+        
+        # Detection windows are kept in memory across cycles
+        threat_detector.configure_detector(pipeline_config.get('alert_thresholds', {}))
+        configure_threat_intel(pipeline_config.get('threat_intel', {}))
+        event_processor.configure_event_processing(pipeline_config['data_sources'],
+                                                    pipeline_config.get('processing', {}))
+        
+        # Processed events are persisted by a background archiver when enabled
+        archive_config = pipeline_config.get('event_archive', {})
+        if archive_config.get('enabled', False):
+            archiver = EventArchiver(
+                db,
+                capacity=archive_config.get('queue_capacity', DEFAULT_ARCHIVE_QUEUE_CAPACITY),
+                batch_size=archive_config.get('batch_size', DEFAULT_ARCHIVE_BATCH_SIZE),
+                flush_seconds=archive_config.get('flush_interval_seconds', DEFAULT_ARCHIVE_FLUSH_SECONDS)
+            )
+            archiver.start()
+        
+        # The staged runtime runs collection, processing and detection concurrently;
+        # the pipelined mode overlaps each cycle's collection with the previous analysis
+        runtime_mode = pipeline_config.get('runtime', {}).get('mode', 'serial')
+        if runtime_mode == 'staged':
+            StagedPipeline(pipeline_config, db, archiver).run_forever()
+            return 0
+        if runtime_mode == 'pipelined':
+            run_overlapped_cycles(pipeline_config, db, archiver=archiver)
+            return 0
+        
         # Main processing loop
         while True:
             start_time = datetime.now()
@@ -48,21 +91,11 @@ def main():
             
             try:
                 # Step 1: Collect data from sources
-                raw_data = data_collector.collect_from_all_sources(pipeline_config['data_sources'])
-                logger.info(f"Collected {len(raw_data)} raw events from data sources")
-                
-                # Step 2: Process and normalize events
-                processed_events = event_processor.process_events(raw_data)
-                logger.info(f"Processed and normalized {len(processed_events)} events")
-                
-                # Step 3: Analyze events for threats
-                alerts = threat_detector.detect_threats(processed_events)
-                logger.info(f"Generated {len(alerts)} security alerts")
+                raw_data = collect_cycle(pipeline_config)
                 
-                # Step 4: Store results in database
-                if alerts:
-                    db.store_alerts(alerts)
-                    logger.info(f"Stored {len(alerts)} alerts in database")
+                # Steps 2-4: Process and normalize events, analyze them for threats
+                # and store the resulting alerts in the database
+                analyze_cycle(raw_data, db, archiver)
                 
                 # Calculate processing time and sleep if needed
                 processing_time = (datetime.now() - start_time).total_seconds()
@@ -85,6 +118,15 @@ def main():
     except Exception as e:
         logger.critical(f"Critical error in pipeline: {str(e)}")
         return 1
+    finally:
+        # Release connections, sockets and worker processes however the pipeline stopped,
+        # and flush the events still queued for archiving
+        close_http_client_pool()
+        stop_syslog_listeners()
+        shutdown_ndjson_workers()
+        event_processor.shutdown_event_processing()
+        if archiver is not None:
+            archiver.stop()
     
     return 0
 
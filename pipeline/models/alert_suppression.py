@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+import time
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+# Suppression defaults, overridden by the alert_thresholds configuration
+DEFAULT_SUPPRESSION_WINDOW_SECONDS = 3600
+DEFAULT_MAX_SUPPRESSED_ALERTS = 100000
+
+# Related event IDs carried by one occurrence update
+MAX_UPDATE_RELATED_EVENTS = 100
+
+
+def alert_fingerprint(alert: Dict[str, Any], window_seconds: float, timestamp: Optional[float] = None) -> str:
+    """Compute the deterministic fingerprint of an alert.
+
+    The fingerprint covers the rule that fired (event type and title, which
+    names the user, port or indicator where the rule has one), the entity
+    (source IP) and the suppression window the alert falls in, so the same
+    detection repeated within a window always maps to the same fingerprint.
+
+    Args:
+        alert: Alert dictionary
+        window_seconds: Length of the suppression window
+        timestamp: Detection time in epoch seconds, now by default
+
+    Returns:
+        Hex digest
+    """
+    window = int((time.time() if timestamp is None else timestamp) // window_seconds)
+    key = "\x1f".join([
+        str(alert.get('event_type', '')),
+        str(alert.get('title', '')),
+        str(alert.get('source_ip') or ''),
+        str(window),
+    ])
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class _Suppressed:
+    """An alert already reported in its suppression window."""
+
+    __slots__ = ('alert_id', 'expires_at')
+
+    def __init__(self, alert_id: str, expires_at: float):
+        self.alert_id = alert_id
+        self.expires_at = expires_at
+
+
+class AlertSuppressor:
+    """Turns repeats of a recently reported alert into occurrence updates.
+
+    Reported fingerprints are cached until the end of their window. A repeat
+    is not reported again; instead its occurrence is added to a pending
+    update for the original alert, one per fingerprint, which the storage
+    stage applies with ``drain_updates``. Not thread-safe: a suppressor is
+    owned by one detection thread.
+    """
+
+    def __init__(self, window_seconds: float = DEFAULT_SUPPRESSION_WINDOW_SECONDS,
+                 max_entries: int = DEFAULT_MAX_SUPPRESSED_ALERTS):
+        """Initialize the suppressor.
+
+        Args:
+            window_seconds: Length of the suppression window
+            max_entries: Maximum number of cached fingerprints
+        """
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, _Suppressed]' = OrderedDict()
+        self._updates: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def suppress(self, alerts: List[Dict[str, Any]], timestamp: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Fingerprint alerts and drop repeats of alerts reported in the same window.
+
+        Args:
+            alerts: Detected alerts
+            timestamp: Detection time in epoch seconds, now by default
+
+        Returns:
+            The alerts reported for the first time in their window, with
+            ``fingerprint``, ``occurrence_count`` and ``last_seen`` set
+        """
+        now = time.time() if timestamp is None else timestamp
+        last_seen = datetime.fromtimestamp(now).isoformat()
+        self._expire(now)
+
+        reported = []
+        for alert in alerts:
+            fingerprint = alert_fingerprint(alert, self.window_seconds, now)
+            alert['fingerprint'] = fingerprint
+            alert.setdefault('occurrence_count', 1)
+            alert['last_seen'] = last_seen
+
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                # Fingerprints include the window, so they are useless once it ends
+                window_end = (now // self.window_seconds + 1) * self.window_seconds
+                self._entries[fingerprint] = _Suppressed(alert['alert_id'], window_end)
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                reported.append(alert)
+                continue
+
+            update = self._updates.get(fingerprint)
+            if update is None:
+                # The update is the repeat itself, so it can also be written as an upsert row
+                update = self._updates[fingerprint] = dict(alert, alert_id=entry.alert_id,
+                                                           occurrence_count=0, related_events=[])
+            update['occurrence_count'] += alert['occurrence_count']
+            update['last_seen'] = last_seen
+            related = update['related_events']
+            for event_id in alert.get('related_events', []):
+                if len(related) >= MAX_UPDATE_RELATED_EVENTS:
+                    break
+                if event_id not in related:
+                    related.append(event_id)
+
+        return reported
+
+    def drain_updates(self) -> List[Dict[str, Any]]:
+        """Remove and return the pending occurrence updates.
+
+        Returns:
+            One update per repeated fingerprint: its first repeat with the
+            original alert's ``alert_id``, the number of new occurrences as
+            ``occurrence_count`` and the IDs of new ``related_events``
+        """
+        updates = list(self._updates.values())
+        self._updates = {}
+        return updates
+
+    def _expire(self, now: float) -> None:
+        """Drop fingerprints whose window has ended; entries are ordered by expiry."""
+        while self._entries:
+            fingerprint, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now:
+                break
+            del self._entries[fingerprint]
@@ -1,23 +1,743 @@
 #!/usr/bin/env python3
 
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+import numpy as np
+
 from pipeline.utils.logging_config import get_logger, log_threat_event, log_error
-from pipeline.utils.metrics import record_threat_detection, OperationTimer, start_metrics_server
+from pipeline.utils.metrics import record_threat_detection, record_top_talkers, OperationTimer
+from pipeline.utils.keyword_matcher import get_keyword_matcher, keyword_text, KeywordMatches
+from pipeline.utils.windows import SlidingWindowCounter, SlidingDistinctCounter, SlidingVolumeCounter
+from pipeline.intel.domain_trie import DomainSuffixTrie
+from pipeline.intel.feeds import IOCSnapshot, get_threat_intel
+from pipeline.models.alert_suppression import AlertSuppressor, DEFAULT_SUPPRESSION_WINDOW_SECONDS
+from pipeline.process.normalized_event import NormalizedEvent
+from pipeline.process.field_extraction import get_field_extractor
+from pipeline.process.timestamps import source_timezone
 
 logger = get_logger("pipeline.analysis")
 
-# Start metrics server on port 8001 (different from data_collector)
-try:
-    start_metrics_server(port=8001)
-except Exception as e:
-    logger.error(f"Failed to start metrics server: {str(e)}")
+
+# Detection defaults, overridden by the alert_thresholds configuration
+DEFAULT_AUTH_FAILURE_THRESHOLD = 3
+DEFAULT_AUTH_WINDOW_SECONDS = 300
+DEFAULT_PORT_SCAN_THRESHOLD = 5
+DEFAULT_HOST_SCAN_THRESHOLD = 20
+DEFAULT_PORT_SCAN_WINDOW_SECONDS = 300
+DEFAULT_TRANSFER_THRESHOLD_MB = 100
+DEFAULT_TRANSFER_WINDOW_SECONDS = 3600
+DEFAULT_TOP_TALKERS = 10
+DEFAULT_MAX_TRACKED_KEYS = 100000
+
+# Fields checked against threat intelligence, in the event and its raw data
+IOC_IP_FIELDS = ['source_ip', 'src_ip', 'destination_ip', 'dest_ip', 'dst_ip']
+IOC_DOMAIN_FIELDS = ['destination_domain', 'destination_host', 'domain', 'url']
+IOC_HASH_FIELDS = ['file_hash', 'hash', 'md5', 'sha1', 'sha256']
+
+
+class DetectionState:
+    """Detection state kept in memory across processing cycles."""
+
+    def __init__(self, alert_thresholds: Optional[Dict[str, Any]] = None):
+        """Initialize the state.
+
+        Args:
+            alert_thresholds: The alert_thresholds configuration section
+        """
+        thresholds = alert_thresholds or {}
+        max_keys = thresholds.get('max_tracked_keys', DEFAULT_MAX_TRACKED_KEYS)
+
+        self.auth_failure_threshold = thresholds.get('authentication_failures', DEFAULT_AUTH_FAILURE_THRESHOLD)
+        self.auth_window_seconds = thresholds.get('authentication_window_seconds', DEFAULT_AUTH_WINDOW_SECONDS)
+        self.auth_failures_by_ip = SlidingWindowCounter(self.auth_window_seconds, max_keys=max_keys)
+        self.auth_failures_by_user = SlidingWindowCounter(self.auth_window_seconds, max_keys=max_keys)
+
+        self.port_scan_threshold = thresholds.get('port_scan_threshold', DEFAULT_PORT_SCAN_THRESHOLD)
+        self.host_scan_threshold = thresholds.get('host_scan_threshold', DEFAULT_HOST_SCAN_THRESHOLD)
+        self.port_scan_window_seconds = thresholds.get('port_scan_window_seconds', DEFAULT_PORT_SCAN_WINDOW_SECONDS)
+        self.ports_by_source = SlidingDistinctCounter(self.port_scan_window_seconds, max_keys=max_keys)
+        self.hosts_by_source_port = SlidingDistinctCounter(self.port_scan_window_seconds, max_keys=max_keys)
+
+        self.cumulative_transfer_threshold = int(
+            thresholds.get('data_transfer_threshold_mb', DEFAULT_TRANSFER_THRESHOLD_MB) * 1000000)
+        self.transfer_window_seconds = thresholds.get('data_transfer_window_seconds', DEFAULT_TRANSFER_WINDOW_SECONDS)
+        self.top_talkers = thresholds.get('top_talkers', DEFAULT_TOP_TALKERS)
+        self.outbound_bytes_by_source = SlidingVolumeCounter(self.transfer_window_seconds)
+        self.outbound_bytes_by_pair = SlidingVolumeCounter(self.transfer_window_seconds)
+
+        self.suppression_window_seconds = thresholds.get('suppression_window_seconds',
+                                                         DEFAULT_SUPPRESSION_WINDOW_SECONDS)
+        self.suppressor = AlertSuppressor(self.suppression_window_seconds, max_entries=max_keys)
+
+
+_state = DetectionState()
+
+
+def configure_detector(alert_thresholds: Dict[str, Any]) -> None:
+    """Apply the alert thresholds configuration, resetting the detection state.
+
+    Args:
+        alert_thresholds: The alert_thresholds configuration section
+    """
+    global _state
+    _state = DetectionState(alert_thresholds)
+
+
+def get_detection_state() -> DetectionState:
+    """Get the detection state shared across cycles."""
+    return _state
+
+
+def event_time(event: Dict[str, Any]) -> float:
+    """Get the time of an event in epoch seconds.
+
+    Falls back to the current time for missing or unparseable timestamps,
+    and clamps timestamps in the future to the current time.
+
+    Args:
+        event: The processed event
+
+    Returns:
+        Epoch seconds
+    """
+    now = time.time()
+    timestamp = event.get('timestamp')
+    try:
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        if isinstance(timestamp, datetime):
+            return min(timestamp.timestamp(), now)
+    except (ValueError, TypeError, OverflowError, OSError):
+        pass
+    return now
+
+
+def _isoformat(value: Any) -> Any:
+    """Format datetimes as ISO strings for JSON alert details, passing other values through."""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _source_name(event: Dict[str, Any]) -> Optional[str]:
+    """Get the name of the source of a normalized or raw event."""
+    source = event.get('source')
+    return source.get('name') if isinstance(source, dict) else event.get('source_name')
+
+
+def _event_hour(event: Dict[str, Any]) -> int:
+    """Get the hour of day of an event where it happened, -1 if it has no timestamp.
+
+    Normalized timestamps are in UTC; times with an offset are converted to
+    the source's timezone (local time unless configured), so working hours
+    are those of the source. Times without an offset are taken as written.
+    """
+    timestamp = event.get('timestamp', event.get('created_at', ''))
+    try:
+        # Try to parse the timestamp
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        if isinstance(timestamp, datetime):
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.astimezone(source_timezone(_source_name(event)))
+            return timestamp.hour
+    except ValueError:
+        # Skip events with invalid timestamps
+        pass
+    return -1
+
+
+class EventView:
+    """Per-event features shared by all detectors during a detection pass.
+
+    Derived values are computed lazily on first use and cached. Normalized
+    events carry their typed fields and the keywords found at normalization,
+    so they are never stringified here; other events are scanned once
+    however many detectors look at them.
+    """
+
+    __slots__ = ('event', '_text', '_keywords', '_fields')
+
+    def __init__(self, event: Dict[str, Any]):
+        """Initialize the view.
+
+        Args:
+            event: The processed event
+        """
+        self.event = event
+        self._text = None
+        self._keywords = None
+        self._fields = None
+
+    @property
+    def text(self) -> str:
+        """Canonical keyword text of the event (see ``keyword_text``).
+
+        For normalized events this is the text of the original record, the
+        same text classification matched.
+        """
+        if self._text is None:
+            event = self.event
+            self._text = keyword_text(event.raw_data if isinstance(event, NormalizedEvent) else event)
+        return self._text
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        """Typed fields of the event: addresses, ports, bytes, direction, auth outcome and user.
+
+        Normalized events carry them already; other events have them
+        extracted from the event and its raw data on first use.
+        """
+        if self._fields is None:
+            event = self.event
+            if isinstance(event, NormalizedEvent):
+                self._fields = event
+            else:
+                raw = event.get('raw_data')
+                merged = event
+                if isinstance(raw, dict):
+                    merged = dict(raw)
+                    merged.update(event)
+                self._fields = get_field_extractor(_source_name(event)).extract(merged, event.get('event_type'))
+        return self._fields
+
+    @property
+    def keywords(self) -> KeywordMatches:
+        """Keyword matches of the event, shared by all detectors."""
+        if self._keywords is None:
+            found = self.event.keywords if isinstance(self.event, NormalizedEvent) else None
+            if found is not None:
+                self._keywords = get_keyword_matcher().matches(found)
+            else:
+                self._keywords = get_keyword_matcher().scan(self.text)
+        return self._keywords
+
+
+class Detector:
+    """Base class for detection rules run by the single-pass engine.
+
+    The engine calls ``visit`` once per event, in order, then ``finalize``
+    once to collect the alerts.
+    """
+
+    name = "detector"
+
+    def visit(self, event: Dict[str, Any], view: EventView) -> None:
+        """Inspect one event.
+
+        Args:
+            event: The processed event
+            view: Shared cached features of the event
+        """
+        raise NotImplementedError
+
+    def finalize(self) -> List[Dict[str, Any]]:
+        """Return the alerts raised by the events visited so far."""
+        raise NotImplementedError
+
+
+class AuthenticationAttackDetector(Detector):
+    """Detects brute force attempts (multiple failed logins from the same IP or against the same user).
+
+    Failures are counted in sliding windows kept in the detection state, so
+    attempts spread over several cycles add up and detection does not depend
+    on where batch boundaries fall.
+    """
+
+    name = "auth"
+
+    def __init__(self, state: Optional['DetectionState'] = None):
+        self.state = state or get_detection_state()
+        # Failed attempts of this batch per source IP, in order of first appearance of the IP
+        self.failed_attempts: Dict[str, List[Dict[str, Any]]] = {}
+        self.failed_by_user: Dict[str, List[Dict[str, Any]]] = {}
+        # Window counts as of the newest failure of each IP and user
+        self.ip_counts: Dict[str, int] = {}
+        self.user_counts: Dict[str, int] = {}
+
+    def visit(self, event: Dict[str, Any], view: EventView) -> None:
+        fields = view.fields
+        source_ip = fields.get('source_ip')
+        if source_ip:
+            self.failed_attempts.setdefault(source_ip, [])
+
+        # Only failed authentication attempts count
+        if event.get('event_type') != 'authentication' or fields.get('auth_outcome') != 'failure':
+            return
+
+        timestamp = event_time(event)
+        if source_ip:
+            self.failed_attempts[source_ip].append(event)
+            self.ip_counts[source_ip] = self.state.auth_failures_by_ip.add(source_ip, timestamp)
+        user = fields.get('user')
+        if user:
+            self.failed_by_user.setdefault(user, []).append(event)
+            self.user_counts[user] = self.state.auth_failures_by_user.add(user, timestamp)
+
+    def finalize(self) -> List[Dict[str, Any]]:
+        alerts = []
+        threshold = self.state.auth_failure_threshold
+        window = self.state.auth_window_seconds
+
+        for ip, failed_attempts in self.failed_attempts.items():
+            count = self.ip_counts.get(ip, 0)
+            # If multiple failed attempts are detected within the window, create an alert
+            if count >= threshold:
+                alerts.append({
+                    'alert_id': generate_alert_id(),
+                    'title': f"Potential brute force attack from {ip}",
+                    'description': f"Detected {count} failed authentication attempts from {ip} in the last {window} seconds",
+                    'severity': 'high',
+                    'source_ip': ip,
+                    'event_type': 'authentication_attack',
+                    'created_at': datetime.now().isoformat(),
+                    'related_events': [e.get('event_id') for e in failed_attempts],
+                    'status': 'new'
+                })
+
+        for user, failed_attempts in self.failed_by_user.items():
+            count = self.user_counts[user]
+            if count >= threshold:
+                alerts.append({
+                    'alert_id': generate_alert_id(),
+                    'title': f"Potential brute force attack against user {user}",
+                    'description': f"Detected {count} failed authentication attempts for {user} in the last {window} seconds",
+                    'severity': 'high',
+                    'source_ip': failed_attempts[-1].get('source_ip'),
+                    'user': user,
+                    'event_type': 'authentication_attack',
+                    'created_at': datetime.now().isoformat(),
+                    'related_events': [e.get('event_id') for e in failed_attempts],
+                    'status': 'new'
+                })
+        return alerts
+
+
+class MalwareIndicatorDetector(Detector):
+    """Detects indicators of malware activity in individual events."""
+
+    name = "malware"
+
+    def __init__(self):
+        self.alerts: List[Dict[str, Any]] = []
+
+    def visit(self, event: Dict[str, Any], view: EventView) -> None:
+        # Check for malware indicators in event data
+        indicators = view.keywords.get('malware_indicator')
+        if indicators:
+            # Only create one alert per event, named after the first indicator
+            indicator = indicators[0]
+            self.alerts.append({
+                'alert_id': generate_alert_id(),
+                'title': f"Potential malware detected: {indicator}",
+                'description': extract_description(event),
+                'severity': 'critical',
+                'source_ip': event.get('source_ip'),
+                'event_type': 'malware',
+                'created_at': datetime.now().isoformat(),
+                'related_events': [event.get('event_id')],
+                'status': 'new'
+            })
+
+    def finalize(self) -> List[Dict[str, Any]]:
+        return self.alerts
+
+
+class NetworkActivityDetector(Detector):
+    """Detects port scanning.
+
+    Vertical scans are many distinct destination ports from one source IP;
+    horizontal scans (host sweeps) are many distinct destination hosts on one
+    port from one source IP. Both are counted over sliding windows kept in the
+    detection state, with fixed memory per tracked key.
+    """
+
+    name = "network"
+
+    def __init__(self, state: Optional['DetectionState'] = None):
+        self.state = state or get_detection_state()
+        # Distinct port counts as of the newest event of each IP, in order of first appearance of the IP
+        self.port_counts: Dict[str, int] = {}
+        self.host_counts: Dict[tuple, int] = {}
+        self.related_events: Dict[str, List[Any]] = {}
+
+    def visit(self, event: Dict[str, Any], view: EventView) -> None:
+        fields = view.fields
+        source_ip = fields.get('source_ip')
+        if not source_ip:
+            return
+        self.port_counts.setdefault(source_ip, 0)
+
+        port = fields.get('destination_port')
+        if port is None:
+            return
+
+        timestamp = event_time(event)
+        self.related_events.setdefault(source_ip, []).append(event.get('event_id'))
+        self.port_counts[source_ip] = self.state.ports_by_source.add(source_ip, port, timestamp)
+
+        destination = fields.get('destination_ip') or fields.get('destination_domain')
+        if destination:
+            key = (source_ip, port)
+            self.host_counts[key] = self.state.hosts_by_source_port.add(key, destination, timestamp)
+
+    def finalize(self) -> List[Dict[str, Any]]:
+        alerts = []
+        window = self.state.port_scan_window_seconds
+
+        for ip, count in self.port_counts.items():
+            # If connections to multiple ports are detected, create an alert
+            if count >= self.state.port_scan_threshold:
+                alerts.append({
+                    'alert_id': generate_alert_id(),
+                    'title': f"Potential port scanning from {ip}",
+                    'description': f"Detected connections to {count} different ports from {ip} in the last {window} seconds",
+                    'severity': 'medium',
+                    'source_ip': ip,
+                    'event_type': 'network_scan',
+                    'created_at': datetime.now().isoformat(),
+                    'related_events': self.related_events[ip],
+                    'status': 'new'
+                })
+
+        for (ip, port), count in self.host_counts.items():
+            if count >= self.state.host_scan_threshold:
+                alerts.append({
+                    'alert_id': generate_alert_id(),
+                    'title': f"Potential host sweep from {ip} on port {port}",
+                    'description': f"Detected connections to {count} different hosts on port {port} from {ip} in the last {window} seconds",
+                    'severity': 'medium',
+                    'source_ip': ip,
+                    'event_type': 'network_scan',
+                    'created_at': datetime.now().isoformat(),
+                    'related_events': self.related_events[ip],
+                    'status': 'new',
+                    'details': {
+                        'destination_port': port
+                    }
+                })
+        return alerts
+
+
+class DataExfiltrationDetector(Detector):
+    """Detects potential data exfiltration attempts.
+
+    Events are buffered during the pass and evaluated as a batch: the
+    fields the rules need are extracted once into NumPy columns, the rules
+    are evaluated as vectorized masks, and only matching events are turned
+    back into alerts.
+    """
+
+    name = "exfil"
+    # Define thresholds for data exfiltration detection
+    large_transfer_threshold = 10000000  # 10MB in bytes
+    after_hours_transfer_threshold = 1000000  # 1MB in bytes
+    unusual_time_window = [22, 6]  # 10PM to 6AM
+    known_domains = ['company.com', 'partner.org', 'vendor.net']  # Example trusted domains
+
+    def __init__(self, state: Optional['DetectionState'] = None):
+        self.state = state or get_detection_state()
+        self.events: List[Dict[str, Any]] = []
+        self.views: List[EventView] = []
+        # Outbound volume per source IP before and after this batch, and per destination
+        self.volume_before: Dict[str, int] = {}
+        self.volume_after: Dict[str, int] = {}
+        self.volume_events: Dict[str, List[Any]] = {}
+        self.pair_volume: Dict[str, Dict[str, int]] = {}
+        self._unusual_destinations: Dict[str, bool] = {}
+        # Subdomains of a known domain are known too
+        self._known_domains = DomainSuffixTrie()
+        for domain in self.known_domains:
+            self._known_domains.insert(domain, domain)
+
+    def visit(self, event: Dict[str, Any], view: EventView) -> None:
+        self.events.append(event)
+        self.views.append(view)
+
+    def finalize(self) -> List[Dict[str, Any]]:
+        events = self.events
+        if not events:
+            return self._cumulative_transfer_alerts()
+
+        # Build the columns the rules need from the typed fields, once per batch. The
+        # byte count rules only apply to outbound events, so their columns cover those rows
+        fields = [view.fields for view in self.views]
+        outbound_rows = np.fromiter(
+            (i for i, f in enumerate(fields) if f.get('direction') == 'outbound'),
+            dtype=np.int64)
+        transfer_values = [fields[i].get('bytes_out', 0) for i in outbound_rows]
+        transfer = np.array(transfer_values, dtype=np.float64)
+
+        # Large outbound transfers
+        large = np.flatnonzero(transfer > self.large_transfer_threshold)
+
+        # Large outbound transfers during unusual hours; only candidates have their timestamp parsed
+        candidates = np.flatnonzero(transfer > self.after_hours_transfer_threshold)
+        hours = np.fromiter((_event_hour(events[outbound_rows[j]]) for j in candidates),
+                            dtype=np.int8, count=len(candidates))
+        after_hours = candidates[(hours >= 0) & ((hours >= self.unusual_time_window[0]) |
+                                                 (hours <= self.unusual_time_window[1]))]  # 10PM to 6AM
+        hour_of = dict(zip(candidates.tolist(), hours.tolist()))
+
+        # Sensitive data to unusual destinations, for any event with a payload
+        unusual_rows = [i for i, f in enumerate(fields)
+                        if f.get('bytes_out', 0) > 0 and self._is_unusual_destination(f)]
+
+        for j in np.flatnonzero(transfer > 0):
+            i = outbound_rows[j]
+            self._track_volume(events[i], fields[i], transfer_values[j])
+
+        alerts = [self._large_transfer_alert(events[outbound_rows[j]], transfer_values[j]) for j in large]
+        for i in unusual_rows:
+            # Check if the event contains sensitive data keywords
+            sensitive_keywords = self.views[i].keywords.get('sensitive_data')
+            if sensitive_keywords:
+                alerts.append(self._unusual_destination_alert(events[i], sensitive_keywords))
+        alerts.extend(self._after_hours_alert(events[outbound_rows[j]], transfer_values[j], hour_of[j])
+                      for j in after_hours)
+        return alerts + self._cumulative_transfer_alerts()
+
+    def _is_unusual_destination(self, fields: Dict[str, Any]) -> bool:
+        """Check whether an event goes to a destination outside the known domains."""
+        destination = fields.get('destination_domain')
+        if not destination:
+            return False
+        destination = str(destination)
+        unusual = self._unusual_destinations.get(destination)
+        if unusual is None:
+            unusual = self._known_domains.lookup(_host_name(destination)) is None
+            self._unusual_destinations[destination] = unusual
+        return unusual
+
+    def _large_transfer_alert(self, event: Dict[str, Any], bytes_transferred: Any) -> Dict[str, Any]:
+        """Build the alert for a large outbound data transfer."""
+        return {
+            'alert_id': generate_alert_id(),
+            'title': f"Large data transfer detected from {event.get('source_ip', 'unknown')}",
+            'description': f"Outbound transfer of {bytes_transferred} bytes to {event.get('destination_ip', 'unknown')}",
+            'severity': 'high',
+            'source_ip': event.get('source_ip'),
+            'destination_ip': event.get('destination_ip'),
+            'event_type': 'data_exfiltration',
+            'created_at': datetime.now().isoformat(),
+            'related_events': [event.get('event_id')],
+            'status': 'new',
+            'details': {
+                'bytes_transferred': bytes_transferred,
+                'protocol': event.get('protocol'),
+                'destination_port': event.get('destination_port')
+            }
+        }
+
+    def _unusual_destination_alert(self, event: Dict[str, Any], sensitive_keywords: List[str]) -> Dict[str, Any]:
+        """Build the alert for a sensitive data transfer to an unusual destination."""
+        destination = event.get('destination_domain', event.get('destination_host', ''))
+        return {
+            'alert_id': generate_alert_id(),
+            'title': f"Potential data exfiltration to unusual destination",
+            'description': f"Sensitive data transfer detected to unusual destination: {destination}",
+            'severity': 'high',
+            'source_ip': event.get('source_ip'),
+            'destination_ip': event.get('destination_ip'),
+            'event_type': 'data_exfiltration',
+            'created_at': datetime.now().isoformat(),
+            'related_events': [event.get('event_id')],
+            'status': 'new',
+            'details': {
+                'destination': destination,
+                'sensitive_keywords': list(sensitive_keywords)
+            }
+        }
+
+    def _after_hours_alert(self, event: Dict[str, Any], bytes_transferred: Any, hour: int) -> Dict[str, Any]:
+        """Build the alert for an outbound data transfer during unusual hours."""
+        return {
+            'alert_id': generate_alert_id(),
+            'title': f"After-hours data transfer detected",
+            'description': f"Large data transfer of {bytes_transferred} bytes detected during unusual hours ({hour}:00)",
+            'severity': 'medium',
+            'source_ip': event.get('source_ip'),
+            'destination_ip': event.get('destination_ip'),
+            'event_type': 'data_exfiltration',
+            'created_at': datetime.now().isoformat(),
+            'related_events': [event.get('event_id')],
+            'status': 'new',
+            'details': {
+                'transfer_time': _isoformat(event.get('timestamp', event.get('created_at', ''))),
+                'bytes_transferred': bytes_transferred
+            }
+        }
+
+    def _track_volume(self, event: Dict[str, Any], fields: Dict[str, Any], bytes_transferred: int) -> None:
+        """Accumulate outbound bytes per source IP and per (source, destination) pair."""
+        source_ip = fields.get('source_ip')
+        if not source_ip:
+            return
+
+        timestamp = event_time(event)
+        by_source = self.state.outbound_bytes_by_source
+        if source_ip not in self.volume_before:
+            self.volume_before[source_ip] = by_source.estimate(source_ip)
+        self.volume_after[source_ip] = by_source.add(source_ip, int(bytes_transferred), timestamp)
+        self.volume_events.setdefault(source_ip, []).append(event.get('event_id'))
+
+        destination = fields.get('destination_ip') or fields.get('destination_domain')
+        if destination:
+            total = self.state.outbound_bytes_by_pair.add((source_ip, destination), int(bytes_transferred), timestamp)
+            self.pair_volume.setdefault(source_ip, {})[destination] = total
+
+    def _cumulative_transfer_alerts(self) -> List[Dict[str, Any]]:
+        """Alert on source IPs whose outbound volume crossed the threshold during this batch."""
+        alerts = []
+        threshold = self.state.cumulative_transfer_threshold
+        window = self.state.transfer_window_seconds
+
+        for ip, total in self.volume_after.items():
+            if total >= threshold > self.volume_before[ip]:
+                destinations = sorted(self.pair_volume.get(ip, {}).items(), key=lambda item: item[1], reverse=True)
+                alerts.append({
+                    'alert_id': generate_alert_id(),
+                    'title': f"Cumulative outbound transfer threshold exceeded by {ip}",
+                    'description': f"Outbound transfers of about {total} bytes from {ip} in the last {window} seconds",
+                    'severity': 'high',
+                    'source_ip': ip,
+                    'event_type': 'data_exfiltration',
+                    'created_at': datetime.now().isoformat(),
+                    'related_events': self.volume_events[ip],
+                    'status': 'new',
+                    'details': {
+                        'bytes_transferred': total,
+                        'top_destinations': [
+                            {'destination': destination, 'bytes_transferred': volume}
+                            for destination, volume in destinations[:5]
+                        ]
+                    }
+                })
+        return alerts
+
+
+class ThreatIntelDetector(Detector):
+    """Matches the IPs, domains and file hashes of events against threat intelligence feeds.
+
+    The snapshot of the loaded indicators is taken when the detector is
+    created, so a feed reload never changes the indicators mid-batch.
+    """
+
+    name = "intel"
+
+    def __init__(self, snapshot: Optional[IOCSnapshot] = None):
+        self.snapshot = snapshot or get_threat_intel().snapshot
+        self.alerts: List[Dict[str, Any]] = []
+
+    def visit(self, event: Dict[str, Any], view: EventView) -> None:
+        snapshot = self.snapshot
+        if snapshot.empty:
+            return
+
+        matches = []
+        for indicator in _event_values(event, IOC_IP_FIELDS):
+            feed = snapshot.match_ip(indicator)
+            if feed:
+                matches.append({'indicator': indicator, 'type': 'ip', 'feed': feed})
+        for value in _event_values(event, IOC_DOMAIN_FIELDS):
+            indicator = _host_name(value)
+            feed = snapshot.match_domain(indicator)
+            if feed:
+                matches.append({'indicator': indicator, 'type': 'domain', 'feed': feed})
+            else:
+                # Destination hosts are often IP addresses
+                feed = snapshot.match_ip(indicator)
+                if feed:
+                    matches.append({'indicator': indicator, 'type': 'ip', 'feed': feed})
+        for indicator in _event_values(event, IOC_HASH_FIELDS):
+            feed = snapshot.match_hash(indicator)
+            if feed:
+                matches.append({'indicator': indicator, 'type': 'hash', 'feed': feed})
+
+        if matches:
+            # Only create one alert per event, named after the first match
+            listed = ", ".join(f"{m['indicator']} ({m['type']}, feed {m['feed']})" for m in matches)
+            self.alerts.append({
+                'alert_id': generate_alert_id(),
+                'title': f"Threat intelligence match: {matches[0]['indicator']}",
+                'description': f"Event matched known indicators of compromise: {listed}",
+                'severity': 'high',
+                'source_ip': event.get('source_ip'),
+                'event_type': 'threat_intel',
+                'created_at': datetime.now().isoformat(),
+                'related_events': [event.get('event_id')],
+                'status': 'new',
+                'details': {'matches': matches}
+            })
+
+    def finalize(self) -> List[Dict[str, Any]]:
+        return self.alerts
+
+
+def _event_values(event: Dict[str, Any], fields: List[str]) -> List[str]:
+    """Get the distinct non-empty string values of fields in an event and its raw data."""
+    values = []
+    raw_data = event.get('raw_data')
+    for source in (event, raw_data if isinstance(raw_data, dict) else None):
+        if source is None:
+            continue
+        for field in fields:
+            value = source.get(field)
+            if value and isinstance(value, str) and value not in values:
+                values.append(value)
+    return values
+
+
+def _host_name(value: str) -> str:
+    """Reduce a URL or host:port destination to its lowercase host name."""
+    value = value.strip().lower()
+    if '://' in value:
+        value = value.split('://', 1)[1]
+    value = value.split('/', 1)[0].split('?', 1)[0]
+    if value.startswith('['):
+        return value[1:].split(']', 1)[0]  # Bracketed IPv6 address
+    if value.count(':') == 1:
+        value = value.split(':', 1)[0]
+    return value
+
+
+def default_detectors(state: Optional[DetectionState] = None) -> List[Detector]:
+    """Create a fresh instance of every detector, in alert order.
+
+    Args:
+        state: Detection state shared across cycles, the module state by default
+    """
+    return [
+        AuthenticationAttackDetector(state),
+        MalwareIndicatorDetector(),
+        NetworkActivityDetector(state),
+        DataExfiltrationDetector(state),
+        ThreatIntelDetector(),
+    ]
+
+
+def run_detectors(events: List[Dict[str, Any]], detectors: List[Detector]) -> List[List[Dict[str, Any]]]:
+    """Run detectors over events in a single pass.
+
+    Args:
+        events: List of processed and normalized events
+        detectors: Detectors to dispatch each event to
+
+    Returns:
+        The alerts of each detector, in the order of ``detectors``
+    """
+    for event in events:
+        view = EventView(event)
+        for detector in detectors:
+            detector.visit(event, view)
+    return [detector.finalize() for detector in detectors]
 
 
 def detect_threats(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Analyze processed events to detect potential security threats.
     
+    Every detector is applied in one pass over the events (see ``run_detectors``).
+    
     Args:
         events: List of processed and normalized events
         
@@ -29,31 +749,28 @@ def detect_threats(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     # Use the OperationTimer context manager for timing and metrics
     with OperationTimer("threat_detection"):
         try:
-            # Group events by source IP for correlation
-            ip_events = {}
-            for event in events:
-                source_ip = event.get('source_ip')
-                if source_ip:
-                    if source_ip not in ip_events:
-                        ip_events[source_ip] = []
-                    ip_events[source_ip].append(event)
-            
-            # Apply different detection rules
-            auth_alerts = detect_authentication_attacks(events, ip_events)
+            # Apply the detection rules in a single pass over the events
+            get_threat_intel().reload_if_changed()
+            auth_alerts, malware_alerts, network_alerts, exfil_alerts, intel_alerts = run_detectors(
+                events, default_detectors())
             alerts.extend(auth_alerts)
-            
-            malware_alerts = detect_malware_indicators(events)
             alerts.extend(malware_alerts)
-            
-            network_alerts = detect_suspicious_network_activity(events, ip_events)
             alerts.extend(network_alerts)
-            
-            exfil_alerts = detect_data_exfiltration(events)
             alerts.extend(exfil_alerts)
+            alerts.extend(intel_alerts)
             
             # Deduplicate alerts
             unique_alerts = deduplicate_alerts(alerts)
             
+            # Alerts already reported in their suppression window become occurrence updates
+            state = get_detection_state()
+            detected_count = len(unique_alerts)
+            unique_alerts = state.suppressor.suppress(unique_alerts)
+            
+            # Export the current heaviest outbound talkers
+            record_top_talkers(state.outbound_bytes_by_source.top(state.top_talkers),
+                               state.outbound_bytes_by_pair.top(state.top_talkers))
+            
             # Prepare threat metrics by type and severity
             threat_types = {}
             for alert in unique_alerts:
@@ -82,10 +799,12 @@ def detect_threats(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
                 "total_events_analyzed": len(events),
                 "total_alerts_generated": len(alerts),
                 "unique_alerts": len(unique_alerts),
+                "suppressed_alerts": detected_count - len(unique_alerts),
                 "auth_alerts": len(auth_alerts),
                 "malware_alerts": len(malware_alerts),
                 "network_alerts": len(network_alerts),
-                "exfil_alerts": len(exfil_alerts)
+                "exfil_alerts": len(exfil_alerts),
+                "intel_alerts": len(intel_alerts)
             })
             
             return unique_alerts
@@ -102,46 +821,28 @@ def detect_threats(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
             return []
 
 
-def detect_authentication_attacks(events: List[Dict[str, Any]], ip_events: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+def drain_alert_updates() -> List[Dict[str, Any]]:
+    """Get the occurrence updates of suppressed repeat alerts since the last call.
+    
+    Returns:
+        List of updates for ``DatabaseConnector.upsert_alerts``
+    """
+    return get_detection_state().suppressor.drain_updates()
+
+
+def detect_authentication_attacks(events: List[Dict[str, Any]],
+                                  ip_events: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
     """Detect authentication-related attacks like brute force attempts.
     
     Args:
         events: List of all processed events
-        ip_events: Events grouped by source IP
+        ip_events: Events grouped by source IP (no longer needed, the
+            detector groups events itself)
         
     Returns:
         List of detected authentication attack alerts
     """
-    alerts = []
-    
-    # Detect brute force attempts (multiple failed logins from same IP)
-    for ip, ip_event_list in ip_events.items():
-        # Filter for authentication events
-        auth_events = [e for e in ip_event_list if e.get('event_type') == 'authentication']
-        
-        # Count failed authentication attempts
-        failed_attempts = []
-        for event in auth_events:
-            # Look for indicators of failed authentication
-            event_str = str(event).lower()
-            if any(term in event_str for term in ['fail', 'invalid', 'bad password', 'incorrect', 'denied']):
-                failed_attempts.append(event)
-        
-        # If multiple failed attempts are detected, create an alert
-        if len(failed_attempts) >= 3:  # Threshold for brute force detection
-            alerts.append({
-                'alert_id': generate_alert_id(),
-                'title': f"Potential brute force attack from {ip}",
-                'description': f"Detected {len(failed_attempts)} failed authentication attempts from {ip}",
-                'severity': 'high',
-                'source_ip': ip,
-                'event_type': 'authentication_attack',
-                'created_at': datetime.now().isoformat(),
-                'related_events': [e.get('event_id') for e in failed_attempts],
-                'status': 'new'
-            })
-    
-    return alerts
+    return run_detectors(events, [AuthenticationAttackDetector()])[0]
 
 
 def detect_malware_indicators(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -153,73 +854,22 @@ def detect_malware_indicators(events: List[Dict[str, Any]]) -> List[Dict[str, An
     Returns:
         List of detected malware alerts
     """
-    alerts = []
-    
-    # Simple keyword-based detection (in production, use more sophisticated methods)
-    malware_indicators = [
-        'malware', 'virus', 'trojan', 'ransomware', 'backdoor',
-        'suspicious process', 'unauthorized execution', 'known bad file'
-    ]
-    
-    for event in events:
-        event_str = str(event).lower()
-        
-        # Check for malware indicators in event data
-        for indicator in malware_indicators:
-            if indicator in event_str:
-                alerts.append({
-                    'alert_id': generate_alert_id(),
-                    'title': f"Potential malware detected: {indicator}",
-                    'description': extract_description(event),
-                    'severity': 'critical',
-                    'source_ip': event.get('source_ip'),
-                    'event_type': 'malware',
-                    'created_at': datetime.now().isoformat(),
-                    'related_events': [event.get('event_id')],
-                    'status': 'new'
-                })
-                break  # Only create one alert per event
-    
-    return alerts
+    return run_detectors(events, [MalwareIndicatorDetector()])[0]
 
 
-def detect_suspicious_network_activity(events: List[Dict[str, Any]], ip_events: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+def detect_suspicious_network_activity(events: List[Dict[str, Any]],
+                                       ip_events: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
     """Detect suspicious network activity patterns.
     
     Args:
         events: List of processed events
-        ip_events: Events grouped by source IP
+        ip_events: Events grouped by source IP (no longer needed, the
+            detector groups events itself)
         
     Returns:
         List of detected network activity alerts
     """
-    alerts = []
-    
-    # Detect port scanning (multiple connection attempts to different ports)
-    for ip, ip_event_list in ip_events.items():
-        # Extract port information from events
-        ports = set()
-        for event in ip_event_list:
-            event_str = str(event).lower()
-            if 'port' in event_str and event.get('event_type') == 'network':
-                # This is a simplified approach - in production, extract actual port numbers
-                ports.add(event_str)  # Using the event string as a proxy for port info
-        
-        # If connections to multiple ports are detected, create an alert
-        if len(ports) >= 5:  # Threshold for port scan detection
-            alerts.append({
-                'alert_id': generate_alert_id(),
-                'title': f"Potential port scanning from {ip}",
-                'description': f"Detected connections to {len(ports)} different ports from {ip}",
-                'severity': 'medium',
-                'source_ip': ip,
-                'event_type': 'network_scan',
-                'created_at': datetime.now().isoformat(),
-                'related_events': [e.get('event_id') for e in ip_event_list if 'port' in str(e).lower()],
-                'status': 'new'
-            })
-    
-    return alerts
+    return run_detectors(events, [NetworkActivityDetector()])[0]
 
 
 def detect_data_exfiltration(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -231,126 +881,19 @@ def detect_data_exfiltration(events: List[Dict[str, Any]]) -> List[Dict[str, Any
     Returns:
         List of detected data exfiltration alerts
     """
-    alerts = []
-    
-    # Define thresholds for data exfiltration detection
-    large_transfer_threshold = 10000000  # 10MB in bytes
-    unusual_time_window = [22, 6]  # 10PM to 6AM
-    sensitive_data_keywords = [
-        'confidential', 'secret', 'classified', 'restricted', 'personal',
-        'password', 'credit card', 'ssn', 'social security', 'database dump',
-        'export', 'download', 'backup', 'extract'
-    ]
-    
-    # Group events by source IP for correlation
-    ip_events = {}
-    for event in events:
-        source_ip = event.get('source_ip')
-        if source_ip:
-            if source_ip not in ip_events:
-                ip_events[source_ip] = []
-            ip_events[source_ip].append(event)
-    
-    # Check for large outbound data transfers
-    for event in events:
-        if event.get('direction') == 'outbound' or event.get('traffic_direction') == 'outbound':
-            # Check for large data transfers
-            bytes_transferred = event.get('bytes_out', event.get('bytes', event.get('size', 0)))
-            
-            # Convert string values to integers if needed
-            if isinstance(bytes_transferred, str):
-                try:
-                    bytes_transferred = int(bytes_transferred)
-                except (ValueError, TypeError):
-                    bytes_transferred = 0
-            
-            # Check if this is a large transfer
-            if bytes_transferred > large_transfer_threshold:
-                alerts.append({
-                    'alert_id': generate_alert_id(),
-                    'title': f"Large data transfer detected from {event.get('source_ip', 'unknown')}",
-                    'description': f"Outbound transfer of {bytes_transferred} bytes to {event.get('destination_ip', 'unknown')}",
-                    'severity': 'high',
-                    'source_ip': event.get('source_ip'),
-                    'destination_ip': event.get('destination_ip'),
-                    'event_type': 'data_exfiltration',
-                    'created_at': datetime.now().isoformat(),
-                    'related_events': [event.get('event_id')],
-                    'status': 'new',
-                    'details': {
-                        'bytes_transferred': bytes_transferred,
-                        'protocol': event.get('protocol'),
-                        'destination_port': event.get('destination_port')
-                    }
-                })
-    
-    # Check for transfers to unusual destinations
-    known_domains = ['company.com', 'partner.org', 'vendor.net']  # Example trusted domains
-    for event in events:
-        destination = event.get('destination_domain', event.get('destination_host', ''))
-        if destination and not any(domain in destination.lower() for domain in known_domains):
-            # Check if there's data being transferred
-            if event.get('bytes_out', 0) > 0 or event.get('bytes', 0) > 0:
-                # Check if the event contains sensitive data keywords
-                event_str = str(event).lower()
-                if any(keyword in event_str for keyword in sensitive_data_keywords):
-                    alerts.append({
-                        'alert_id': generate_alert_id(),
-                        'title': f"Potential data exfiltration to unusual destination",
-                        'description': f"Sensitive data transfer detected to unusual destination: {destination}",
-                        'severity': 'high',
-                        'source_ip': event.get('source_ip'),
-                        'destination_ip': event.get('destination_ip'),
-                        'event_type': 'data_exfiltration',
-                        'created_at': datetime.now().isoformat(),
-                        'related_events': [event.get('event_id')],
-                        'status': 'new',
-                        'details': {
-                            'destination': destination,
-                            'sensitive_keywords': [k for k in sensitive_data_keywords if k in event_str]
-                        }
-                    })
-    
-    # Check for unusual timing of data transfers
-    for event in events:
-        if event.get('direction') == 'outbound' or event.get('traffic_direction') == 'outbound':
-            # Check if timestamp is available
-            timestamp = event.get('timestamp', event.get('created_at', ''))
-            if timestamp:
-                try:
-                    # Try to parse the timestamp
-                    if isinstance(timestamp, str):
-                        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                    else:
-                        dt = timestamp
-                    
-                    # Check if the transfer occurred during unusual hours
-                    hour = dt.hour
-                    if unusual_time_window[0] <= hour or hour <= unusual_time_window[1]:  # 10PM to 6AM
-                        # Check if there's significant data being transferred
-                        bytes_transferred = event.get('bytes_out', event.get('bytes', event.get('size', 0)))
-                        if bytes_transferred > 1000000:  # 1MB
-                            alerts.append({
-                                'alert_id': generate_alert_id(),
-                                'title': f"After-hours data transfer detected",
-                                'description': f"Large data transfer of {bytes_transferred} bytes detected during unusual hours ({hour}:00)",
-                                'severity': 'medium',
-                                'source_ip': event.get('source_ip'),
-                                'destination_ip': event.get('destination_ip'),
-                                'event_type': 'data_exfiltration',
-                                'created_at': datetime.now().isoformat(),
-                                'related_events': [event.get('event_id')],
-                                'status': 'new',
-                                'details': {
-                                    'transfer_time': timestamp,
-                                    'bytes_transferred': bytes_transferred
-                                }
-                            })
-                except (ValueError, TypeError):
-                    # Skip events with invalid timestamps
-                    pass
+    return run_detectors(events, [DataExfiltrationDetector()])[0]
+
+
+def detect_threat_intel_matches(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Detect events involving indicators listed in threat intelligence feeds.
     
-    return alerts
+    Args:
+        events: List of processed events
+        
+    Returns:
+        List of threat intelligence match alerts
+    """
+    return run_detectors(events, [ThreatIntelDetector()])[0]
 
 
 def deduplicate_alerts(alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
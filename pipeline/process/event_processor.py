@@ -2,24 +2,237 @@
 
 import logging
 import json
-from typing import List, Dict, Any
-from datetime import datetime
+import time
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, FrozenSet
+from datetime import datetime, timezone
+
+from pipeline.utils.keyword_matcher import get_keyword_matcher, keyword_text
+from pipeline.utils.metrics import record_processing_error
+from pipeline.process.normalized_event import NormalizedEvent
+from pipeline.process.field_extraction import configure_field_mappings, get_field_extractor
+from pipeline.process.timestamps import get_timestamp_parser, parse_timestamp_value, reset_timestamp_parsers
 
 logger = logging.getLogger("technoshield-pipeline.process")
 
+# Keyword lists used to infer the event type, in order of precedence
+EVENT_TYPE_PRECEDENCE = ['authentication', 'network', 'malware', 'access_control']
+
+# Fields added at collection time, which differ between reads of the same event
+VOLATILE_FIELDS = frozenset(['collection_time'])
+
+# Position of a file event in its file, set by the data collector
+SOURCE_OFFSET_FIELD = 'source_offset'
+
+# Default number of recent event IDs remembered for deduplication
+DEFAULT_DEDUP_CACHE_SIZE = 100000
+
+# Parallel normalization defaults, overridden by the processing configuration;
+# 0 workers normalizes every batch in-process
+DEFAULT_PARALLEL_WORKERS = 0
+DEFAULT_PARALLEL_CHUNK_SIZE = 5000
+DEFAULT_MIN_PARALLEL_EVENTS = 20000
+
+
+class EventDeduplicator:
+    """Remembers recently seen event IDs, evicting the least recently seen."""
+
+    def __init__(self, max_size: int = DEFAULT_DEDUP_CACHE_SIZE):
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of remembered IDs, 0 disables deduplication
+        """
+        self.max_size = max_size
+        self._seen: 'OrderedDict[str, None]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def is_duplicate(self, event_id: str) -> bool:
+        """Check whether an ID was seen recently, remembering it if not.
+
+        Args:
+            event_id: Event ID
+
+        Returns:
+            True if the ID was seen before
+        """
+        if not self.max_size:
+            return False
+        if event_id in self._seen:
+            self._seen.move_to_end(event_id)
+            return True
+        self._seen[event_id] = None
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+        return False
+
+
+# Fields identifying the events of each source, and the field mappings and timezone of each source, by source name
+_id_fields_by_source: Dict[str, List[str]] = {}
+_field_mappings_by_source: Dict[str, Dict[str, Any]] = {}
+_timezones_by_source: Dict[str, str] = {}
+_deduplicator = EventDeduplicator()
+_compact_raw_events = False
+_parallel_workers = DEFAULT_PARALLEL_WORKERS
+_parallel_chunk_size = DEFAULT_PARALLEL_CHUNK_SIZE
+_min_parallel_events = DEFAULT_MIN_PARALLEL_EVENTS
+_pool: Optional[ProcessPoolExecutor] = None
+
+# Normalized events of a chunk, None where an event failed, and (index, error message) pairs
+_NormalizedChunk = Tuple[List[Optional[NormalizedEvent]], List[Tuple[int, str]]]
+_pool_lock = threading.Lock()
+
+# Second and ISO text of the last processing time, shared by the events of that second
+_processed_clock = (0, '')
+
+
+def _processed_at() -> str:
+    """Get the processing time to the second as one string shared between events."""
+    global _processed_clock
+    now = int(time.time())
+    second, text = _processed_clock
+    if now != second:
+        text = datetime.fromtimestamp(now).isoformat()
+        _processed_clock = (now, text)
+    return text
+
+
+def configure_event_processing(data_sources: List[Dict[str, Any]],
+                               processing_config: Optional[Dict[str, Any]] = None) -> None:
+    """Apply the per-source event ID fields, deduplication, event storage and parallelism settings.
 
-def process_events(raw_events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    Args:
+        data_sources: The data_sources configuration section; a source's
+            ``id_fields`` lists the fields that identify its events, its
+            ``field_mappings`` the raw fields holding each typed field and its
+            ``timezone`` the timezone of its times without an offset (local
+            time by default)
+        processing_config: The processing configuration section; with
+            ``compact_raw_events`` the original events are kept as JSON, and
+            batches of at least ``min_parallel_events`` are normalized by
+            ``parallel_workers`` processes in chunks of ``parallel_chunk_size``
+    """
+    global _id_fields_by_source, _field_mappings_by_source, _timezones_by_source, _deduplicator, _compact_raw_events
+    global _parallel_workers, _parallel_chunk_size, _min_parallel_events
+    # Workers copy the settings when they start, so running ones are replaced
+    shutdown_event_processing()
+    _id_fields_by_source = {
+        source.get('name', 'unnamed'): list(source['id_fields'])
+        for source in data_sources if source.get('id_fields')
+    }
+    _field_mappings_by_source = {
+        source.get('name', 'unnamed'): dict(source['field_mappings'])
+        for source in data_sources if source.get('field_mappings')
+    }
+    configure_field_mappings(_field_mappings_by_source)
+    _timezones_by_source = {
+        source.get('name', 'unnamed'): source['timezone']
+        for source in data_sources if source.get('timezone')
+    }
+    processing_config = processing_config or {}
+    _deduplicator = EventDeduplicator(processing_config.get('dedup_cache_size', DEFAULT_DEDUP_CACHE_SIZE))
+    _compact_raw_events = bool(processing_config.get('compact_raw_events', False))
+    _parallel_workers = processing_config.get('parallel_workers', DEFAULT_PARALLEL_WORKERS)
+    _parallel_chunk_size = max(1, processing_config.get('parallel_chunk_size', DEFAULT_PARALLEL_CHUNK_SIZE))
+    _min_parallel_events = processing_config.get('min_parallel_events', DEFAULT_MIN_PARALLEL_EVENTS)
+    reset_timestamp_parsers(_timezones_by_source)
+
+
+def shutdown_event_processing() -> None:
+    """Stop the normalization worker processes, if any were started."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Get the normalization worker pool, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers do not inherit locks held by the collector and detection threads
+            _pool = ProcessPoolExecutor(
+                max_workers=_parallel_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(_id_fields_by_source, _field_mappings_by_source, _timezones_by_source, _compact_raw_events)
+            )
+            logger.info(f"Started {_parallel_workers} event normalization workers")
+        return _pool
+
+
+def _init_worker(id_fields_by_source: Dict[str, List[str]], field_mappings_by_source: Dict[str, Dict[str, Any]],
+                 timezones_by_source: Dict[str, str], compact_raw_events: bool) -> None:
+    """Copy the parent's processing settings into a worker process."""
+    global _id_fields_by_source, _compact_raw_events
+    _id_fields_by_source = id_fields_by_source
+    configure_field_mappings(field_mappings_by_source)
+    reset_timestamp_parsers(timezones_by_source)
+    _compact_raw_events = compact_raw_events
+
+
+def process_events(raw_events: List[Dict[str, Any]]) -> List[NormalizedEvent]:
     """Process and normalize raw events from various sources.
     
+    Large batches are normalized in worker processes when parallel workers
+    are configured; the output order, duplicate removal and error logging
+    are the same either way.
+    
     Args:
         raw_events: List of raw events collected from data sources
         
     Returns:
         List of processed and normalized events
     """
+    if _parallel_workers and len(raw_events) >= _min_parallel_events:
+        normalized, errors = _normalize_parallel(raw_events)
+    else:
+        normalized, errors = _normalize_chunk(raw_events)
+    
+    for index, message in errors:
+        logger.error(f"Error processing event: {message}")
+        logger.debug(f"Problematic event: {json.dumps(raw_events[index], default=str)}")
+    
     processed_events = []
+    duplicates = 0
+    for raw_event, processed_event in zip(raw_events, normalized):
+        if processed_event:
+            # Re-reads, retries and replays of an event produce the same ID. Events
+            # without a stable identity (listener frames, API records without an id)
+            # may genuinely repeat, so they are always kept
+            if has_stable_identity(raw_event) and _deduplicator.is_duplicate(processed_event['event_id']):
+                duplicates += 1
+                continue
+            processed_events.append(processed_event)
+    
+    if duplicates:
+        logger.info(f"Skipped {duplicates} duplicate events")
     
-    for event in raw_events:
+    return processed_events
+
+
+def _normalize_chunk(raw_events: List[Dict[str, Any]]) -> _NormalizedChunk:
+    """Normalize raw events without deduplicating them.
+    
+    Args:
+        raw_events: List of raw events
+        
+    Returns:
+        The normalized events, None where an event failed, and the
+        (index, error message) pairs of the failed events
+    """
+    normalized = []
+    errors = []
+    
+    for index, event in enumerate(raw_events):
         try:
             # Determine the event type and use appropriate processor
             source_type = event.get('source_type', '').lower()
@@ -28,23 +241,59 @@ def process_events(raw_events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
                 processed_event = process_api_event(event)
             elif source_type == 'file':
                 processed_event = process_file_event(event)
-            elif source_type == 'syslog':
+            elif source_type in ('syslog', 'syslog_listener'):
                 processed_event = process_syslog_event(event)
             else:
                 # Default processing for unknown source types
                 processed_event = process_generic_event(event)
-            
-            if processed_event:
-                processed_events.append(processed_event)
+            normalized.append(processed_event)
                 
         except Exception as e:
-            logger.error(f"Error processing event: {str(e)}")
-            logger.debug(f"Problematic event: {json.dumps(event, default=str)}")
+            normalized.append(None)
+            errors.append((index, str(e)))
     
-    return processed_events
+    return normalized, errors
+
+
+def _normalize_in_worker(raw_events: List[Dict[str, Any]]) -> _NormalizedChunk:
+    """Normalize a chunk in a worker process, leaving out raw dictionaries the parent already holds."""
+    normalized, errors = _normalize_chunk(raw_events)
+    if not _compact_raw_events:
+        for event in normalized:
+            if event is not None:
+                event['raw_data'] = None
+    return normalized, errors
 
 
-def process_api_event(event: Dict[str, Any]) -> Dict[str, Any]:
+def _normalize_parallel(raw_events: List[Dict[str, Any]]) -> _NormalizedChunk:
+    """Normalize a batch in chunks across the worker pool, in order.
+
+    Falls back to in-process normalization if the pool cannot be used.
+    """
+    size = _parallel_chunk_size
+    starts = range(0, len(raw_events), size)
+    try:
+        results = list(_get_pool().map(_normalize_in_worker, [raw_events[start:start + size] for start in starts]))
+    except Exception as e:
+        # A worker died or the batch could not be sent; the pool is rebuilt on the next batch
+        logger.warning(f"Parallel normalization failed, processing {len(raw_events)} events in-process: {str(e)}")
+        record_processing_error("event_processor", "parallel_normalization")
+        shutdown_event_processing()
+        return _normalize_chunk(raw_events)
+    
+    normalized = []
+    errors = []
+    for start, (chunk_events, chunk_errors) in zip(starts, results):
+        if not _compact_raw_events:
+            for offset, event in enumerate(chunk_events):
+                if event is not None:
+                    event['raw_data'] = raw_events[start + offset]
+        normalized.extend(chunk_events)
+        errors.extend((start + index, message) for index, message in chunk_errors)
+    return normalized, errors
+
+
+def process_api_event(event: Dict[str, Any]) -> NormalizedEvent:
     """Process an event from an API source.
     
     Args:
@@ -54,35 +303,31 @@ def process_api_event(event: Dict[str, Any]) -> Dict[str, Any]:
         Processed and normalized event
     """
     # Create a new normalized event structure
-    normalized = {
-        'event_id': event.get('id') or generate_event_id(event),
-        'timestamp': parse_timestamp(event),
-        'source': {
-            'name': event.get('source_name', 'unknown'),
-            'type': 'api'
-        },
-        'event_type': determine_event_type(event),
-        'severity': determine_severity(event),
-        'description': extract_description(event),
-        'raw_data': event,  # Store the original event for reference
-        'processed_at': datetime.now().isoformat()
-    }
-    
-    # Extract additional fields based on event structure
-    if 'ip_address' in event:
-        normalized['source_ip'] = event['ip_address']
-    elif 'source_ip' in event:
-        normalized['source_ip'] = event['source_ip']
-    
-    if 'user' in event:
-        normalized['user'] = event['user']
-    elif 'username' in event:
-        normalized['user'] = event['username']
+    source_name = event.get('source_name', 'unknown')
+    keywords = scan_keywords(event)
+    event_type = determine_event_type(event, keywords)
+    description = extract_description(event)
+    normalized = NormalizedEvent(
+        event_id=event.get('id') or generate_event_id(event),
+        timestamp=parse_timestamp(event),
+        source_name=source_name,
+        source_type='api',
+        event_type=event_type,
+        severity=determine_severity(event),
+        description=description,
+        raw_data=event,  # Store the original event for reference
+        processed_at=_processed_at(),
+        # Typed fields (addresses, ports, bytes, direction, outcome, user) and the
+        # keywords shared by classification and detection are extracted once here
+        fields=get_field_extractor(source_name).extract(event, event_type, description.lower(), keywords),
+        compact_raw=_compact_raw_events,
+        keywords=keywords
+    )
     
     return normalized
 
 
-def process_file_event(event: Dict[str, Any]) -> Dict[str, Any]:
+def process_file_event(event: Dict[str, Any]) -> NormalizedEvent:
     """Process an event from a file source.
     
     Args:
@@ -96,7 +341,7 @@ def process_file_event(event: Dict[str, Any]) -> Dict[str, Any]:
     return process_generic_event(event)
 
 
-def process_syslog_event(event: Dict[str, Any]) -> Dict[str, Any]:
+def process_syslog_event(event: Dict[str, Any]) -> NormalizedEvent:
     """Process an event from a syslog source.
     
     Args:
@@ -110,7 +355,7 @@ def process_syslog_event(event: Dict[str, Any]) -> Dict[str, Any]:
     return process_generic_event(event)
 
 
-def process_generic_event(event: Dict[str, Any]) -> Dict[str, Any]:
+def process_generic_event(event: Dict[str, Any]) -> NormalizedEvent:
     """Process an event with a generic approach when source-specific processing is not available.
     
     Args:
@@ -120,81 +365,121 @@ def process_generic_event(event: Dict[str, Any]) -> Dict[str, Any]:
         Processed and normalized event
     """
     # Create a new normalized event structure with basic fields
-    normalized = {
-        'event_id': event.get('id') or generate_event_id(event),
-        'timestamp': parse_timestamp(event),
-        'source': {
-            'name': event.get('source_name', 'unknown'),
-            'type': event.get('source_type', 'unknown')
-        },
-        'event_type': determine_event_type(event),
-        'severity': determine_severity(event),
-        'description': extract_description(event),
-        'raw_data': event,  # Store the original event for reference
-        'processed_at': datetime.now().isoformat()
-    }
+    source_name = event.get('source_name', 'unknown')
+    keywords = scan_keywords(event)
+    event_type = determine_event_type(event, keywords)
+    description = extract_description(event)
+    normalized = NormalizedEvent(
+        event_id=event.get('id') or generate_event_id(event),
+        timestamp=parse_timestamp(event),
+        source_name=source_name,
+        source_type=event.get('source_type', 'unknown'),
+        event_type=event_type,
+        severity=determine_severity(event),
+        description=description,
+        raw_data=event,  # Store the original event for reference
+        processed_at=_processed_at(),
+        fields=get_field_extractor(source_name).extract(event, event_type, description.lower(), keywords),
+        compact_raw=_compact_raw_events,
+        keywords=keywords
+    )
     
     return normalized
 
 
+def has_stable_identity(event: Dict[str, Any]) -> bool:
+    """Check whether an event's ID tells a re-read of it apart from a repeat.
+    
+    Events with their own ``id``, events read from a file position
+    (``source_offset``) and events of sources with configured ``id_fields``
+    keep their ID when read again; other identical events are
+    indistinguishable and may be genuine repeats.
+    
+    Args:
+        event: Raw event
+        
+    Returns:
+        True if repeats of the event's ID are re-reads to be deduplicated
+    """
+    return (bool(event.get('id')) or SOURCE_OFFSET_FIELD in event
+            or event.get('source_name', 'unknown') in _id_fields_by_source)
+
+
 def generate_event_id(event: Dict[str, Any]) -> str:
-    """Generate a unique ID for an event if it doesn't have one.
+    """Generate a deterministic ID for an event that doesn't have one.
+    
+    The ID is a hash of the event's source and its identifying fields:
+    the source's configured ``id_fields``, or otherwise every field except
+    those added at collection time. Events read from files also carry their
+    position in the file (``source_offset``), which is always part of the
+    ID, so identical lines logged within one timestamp are kept apart.
+    Reading the same event again always gives the same ID; only events
+    with a stable identity (see ``has_stable_identity``) are deduplicated
+    by it.
     
     Args:
         event: The event that needs an ID
         
     Returns:
-        A unique event ID string
+        Hex event ID string
     """
-    # Simple implementation - in production, use a more robust ID generation method
-    import hashlib
-    import time
+    source_name = event.get('source_name', 'unknown')
+    id_fields = _id_fields_by_source.get(source_name)
+    if id_fields:
+        identity = [event.get(field) for field in id_fields]
+        if SOURCE_OFFSET_FIELD in event:
+            identity.append(event[SOURCE_OFFSET_FIELD])
+    else:
+        identity = {k: v for k, v in event.items() if k not in VOLATILE_FIELDS}
     
-    # Create a hash from the event data and current time
-    event_str = json.dumps(event, sort_keys=True, default=str)
-    hash_input = f"{event_str}-{time.time()}"
-    return hashlib.md5(hash_input.encode()).hexdigest()
+    canonical = json.dumps([source_name, identity], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
 
 
-def parse_timestamp(event: Dict[str, Any]) -> str:
+def parse_timestamp(event: Dict[str, Any]) -> datetime:
     """Extract and normalize the timestamp from an event.
     
+    The timestamp field and format of each source are learned from its
+    first events, so later events are parsed once with the learned format.
+    Epoch seconds, milliseconds and microseconds, ISO 8601, RFC 3164 syslog,
+    RFC 2822 and common web server log formats are recognized. Times
+    without an offset are in the source's ``timezone``, local time unless
+    configured.
+    
     Args:
         event: The event containing a timestamp
         
     Returns:
-        ISO-formatted timestamp string
+        Timezone-aware UTC datetime; the collection time, or now, if the
+        event has no parseable timestamp
     """
-    # Look for common timestamp fields
-    timestamp = None
-    timestamp_fields = ['timestamp', 'time', 'date', 'created_at', 'event_time']
-    
-    for field in timestamp_fields:
-        if field in event and event[field]:
-            timestamp = event[field]
-            break
-    
-    if not timestamp:
-        # Use collection time if no timestamp is found
-        timestamp = event.get('collection_time', datetime.now().isoformat())
+    parsed = get_timestamp_parser(event.get('source_name', 'unknown')).parse(event)
+    if parsed is not None:
+        return parsed
     
-    # Attempt to normalize the timestamp format if it's not already ISO format
-    if isinstance(timestamp, str) and not timestamp.endswith('Z') and 'T' not in timestamp:
-        try:
-            # This is a very simplified approach - in production, use a more robust parser
-            dt = datetime.fromisoformat(timestamp)
-            return dt.isoformat()
-        except (ValueError, TypeError):
-            pass
+    # Use collection time if no timestamp is found; it is taken from the local clock
+    collected = parse_timestamp_value(event.get('collection_time'))
+    return collected or datetime.now(timezone.utc)
+
+
+def scan_keywords(event: Dict[str, Any]) -> FrozenSet[str]:
+    """Find the keywords of every keyword list in an event.
     
-    return str(timestamp)
+    Args:
+        event: Raw event
+        
+    Returns:
+        Set of keywords found in the event's canonical text
+    """
+    return get_keyword_matcher().find(keyword_text(event))
 
 
-def determine_event_type(event: Dict[str, Any]) -> str:
+def determine_event_type(event: Dict[str, Any], keywords: Optional[FrozenSet[str]] = None) -> str:
     """Determine the type of security event.
     
     Args:
         event: The event to categorize
+        keywords: Keywords found in the event, scanned for if not given
         
     Returns:
         Event type string
@@ -206,16 +491,13 @@ def determine_event_type(event: Dict[str, Any]) -> str:
         return event['type']
     
     # Try to infer from content
-    content = json.dumps(event, default=str).lower()
-    
-    if any(word in content for word in ['login', 'auth', 'password', 'credential']):
-        return 'authentication'
-    elif any(word in content for word in ['firewall', 'block', 'allow', 'network']):
-        return 'network'
-    elif any(word in content for word in ['malware', 'virus', 'trojan', 'ransomware']):
-        return 'malware'
-    elif any(word in content for word in ['permission', 'access', 'privilege']):
-        return 'access_control'
+    if keywords is None:
+        keywords = scan_keywords(event)
+    matches = get_keyword_matcher().matches(keywords)
+    
+    for event_type in EVENT_TYPE_PRECEDENCE:
+        if event_type in matches:
+            return event_type
     
     return 'unknown'
 
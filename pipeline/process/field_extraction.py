@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+
+import re
+from typing import List, Dict, Any, Optional, Callable, FrozenSet
+
+from pipeline.utils.keyword_matcher import get_keyword_matcher, keyword_text
+
+# Raw fields holding each typed field, in order of preference. A source's
+# field_mappings configuration is tried before these
+DEFAULT_FIELD_MAPPINGS: Dict[str, List[str]] = {
+    'source_ip': ['source_ip', 'src_ip', 'ip_address', 'client_ip'],
+    'source_port': ['source_port', 'src_port', 'sport', 'spt'],
+    'destination_ip': ['destination_ip', 'dest_ip', 'dst_ip'],
+    'destination_port': ['destination_port', 'dest_port', 'dst_port', 'dport', 'dpt', 'port'],
+    'destination_domain': ['destination_domain', 'destination_host', 'dest_host', 'domain'],
+    'protocol': ['protocol', 'proto', 'transport'],
+    'bytes_in': ['bytes_in', 'bytes_received', 'in_bytes', 'rcvd_bytes'],
+    'bytes_out': ['bytes_out', 'bytes_sent', 'out_bytes', 'sent_bytes', 'bytes', 'size'],
+    'direction': ['direction', 'traffic_direction', 'flow_direction'],
+    'auth_outcome': ['auth_outcome', 'outcome', 'auth_result', 'result', 'status', 'action'],
+    'user': ['user', 'username', 'user_name', 'account'],
+}
+
+# Destination port mentions in free text: "DPT=22", "dst_port=443", "to port 8080"
+_PORT_PATTERN = re.compile(r'\b(?:dpt|dport|dst_port|dest_port|destination_port|destination port|port)[=:\s]\s*(\d{1,5})\b')
+
+# Fields holding the free text of an event, in order of preference
+_TEXT_FIELDS = ['description', 'message', 'msg', 'detail', 'summary']
+
+_DIRECTIONS = {
+    'inbound': 'inbound', 'in': 'inbound', 'ingress': 'inbound', 'incoming': 'inbound',
+    'outbound': 'outbound', 'out': 'outbound', 'egress': 'outbound', 'outgoing': 'outbound',
+    'internal': 'internal', 'lateral': 'internal', 'local': 'internal',
+}
+
+_AUTH_OUTCOMES = {
+    'success': 'success', 'succeeded': 'success', 'successful': 'success', 'accepted': 'success',
+    'allow': 'success', 'allowed': 'success', 'ok': 'success', 'pass': 'success', 'passed': 'success',
+    'failure': 'failure', 'failed': 'failure', 'fail': 'failure', 'denied': 'failure', 'deny': 'failure',
+    'rejected': 'failure', 'reject': 'failure', 'invalid': 'failure', 'error': 'failure',
+}
+
+# IANA protocol numbers of the common protocols
+_PROTOCOL_NUMBERS = {'1': 'icmp', '6': 'tcp', '17': 'udp', '58': 'ipv6-icmp'}
+
+
+def _to_text(value: Any) -> Optional[str]:
+    """Non-empty stripped string, or None."""
+    text = str(value).strip()
+    return text or None
+
+
+def _to_port(value: Any) -> Optional[int]:
+    """Port number between 1 and 65535, or None."""
+    try:
+        port = int(value)
+    except (TypeError, ValueError):
+        return None
+    return port if 0 < port < 65536 else None
+
+
+def _to_bytes(value: Any) -> Optional[int]:
+    """Non-negative byte count, or None."""
+    if isinstance(value, bool):
+        return None
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        return None
+    return count if count >= 0 else None
+
+
+def _to_protocol(value: Any) -> Optional[str]:
+    """Lowercase protocol name, translating IANA protocol numbers."""
+    protocol = str(value).strip().lower()
+    return _PROTOCOL_NUMBERS.get(protocol, protocol) or None
+
+
+def _to_direction(value: Any) -> Optional[str]:
+    """'inbound', 'outbound' or 'internal', or None."""
+    return _DIRECTIONS.get(str(value).strip().lower())
+
+
+def _to_auth_outcome(value: Any) -> Optional[str]:
+    """'success' or 'failure', or None."""
+    if isinstance(value, bool):
+        return 'success' if value else 'failure'
+    return _AUTH_OUTCOMES.get(str(value).strip().lower())
+
+
+_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    'source_ip': _to_text,
+    'source_port': _to_port,
+    'destination_ip': _to_text,
+    'destination_port': _to_port,
+    'destination_domain': _to_text,
+    'protocol': _to_protocol,
+    'bytes_in': _to_bytes,
+    'bytes_out': _to_bytes,
+    'direction': _to_direction,
+    'auth_outcome': _to_auth_outcome,
+    'user': _to_text,
+}
+
+
+def event_text(event: Dict[str, Any]) -> str:
+    """Get the lower-cased free text of an event, empty if it has none."""
+    for field in _TEXT_FIELDS:
+        value = event.get(field)
+        if value:
+            return str(value).lower()
+    return ''
+
+
+class FieldExtractor:
+    """Extracts typed fields from the raw events of one source.
+
+    Each typed field is read from the first of its candidate raw fields
+    holding a value that converts, so ports and byte counts are ints,
+    directions are 'inbound', 'outbound' or 'internal', and authentication
+    outcomes are 'success' or 'failure'. Two facts fall back to the event's
+    text: the destination port of network events ("DPT=22") and, for
+    authentication events without an outcome field, whether the event has
+    auth_failure keywords ('failure', otherwise 'unknown').
+    """
+
+    def __init__(self, field_mappings: Optional[Dict[str, Any]] = None):
+        """Initialize the extractor.
+
+        Args:
+            field_mappings: Raw field, or list of raw fields, for each typed
+                field; tried before the default candidates
+        """
+        self.candidates: Dict[str, List[str]] = {}
+        for field, defaults in DEFAULT_FIELD_MAPPINGS.items():
+            mapped = (field_mappings or {}).get(field) or []
+            if isinstance(mapped, str):
+                mapped = [mapped]
+            self.candidates[field] = list(mapped) + [name for name in defaults if name not in mapped]
+
+    def extract(self, event: Dict[str, Any], event_type: Optional[str] = None,
+                text: Optional[str] = None, keywords: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+        """Extract the typed fields of an event.
+
+        Args:
+            event: Raw event
+            event_type: Event type; authentication outcomes are only
+                extracted for authentication events
+            text: Lower-cased free text of the event, read from it if not given
+            keywords: Keywords found in the event, scanned for if not given
+
+        Returns:
+            Typed field values, without the fields the event does not have
+        """
+        fields = {}
+        for field, candidates in self.candidates.items():
+            if field == 'auth_outcome' and event_type != 'authentication':
+                continue
+            convert = _CONVERTERS[field]
+            for name in candidates:
+                value = event.get(name)
+                if value is None or value == '':
+                    continue
+                converted = convert(value)
+                if converted is not None:
+                    fields[field] = converted
+                    break
+
+        if event_type == 'network' and 'destination_port' not in fields:
+            # Free-text port mentions are only trusted for network events; in other
+            # logs (e.g. sshd) "port N" is usually the client's source port
+            match = _PORT_PATTERN.search(event_text(event) if text is None else text)
+            port = _to_port(match.group(1)) if match else None
+            if port is not None:
+                fields['destination_port'] = port
+
+        if event_type == 'authentication' and 'auth_outcome' not in fields:
+            matcher = get_keyword_matcher()
+            matches = matcher.matches(keywords) if keywords is not None else matcher.scan(keyword_text(event))
+            fields['auth_outcome'] = 'failure' if 'auth_failure' in matches else 'unknown'
+
+        return fields
+
+
+_default_extractor = FieldExtractor()
+_extractors: Dict[str, FieldExtractor] = {}
+
+
+def configure_field_mappings(field_mappings_by_source: Dict[str, Dict[str, Any]]) -> None:
+    """Apply the field mappings of each source.
+
+    Args:
+        field_mappings_by_source: The ``field_mappings`` of each data source,
+            by source name
+    """
+    global _extractors
+    _extractors = {name: FieldExtractor(mappings) for name, mappings in field_mappings_by_source.items()}
+
+
+def get_field_extractor(source_name: Optional[str]) -> FieldExtractor:
+    """Get the field extractor of a source, the default one if it has no mappings."""
+    return _extractors.get(source_name, _default_extractor)
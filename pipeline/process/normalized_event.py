@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+from collections.abc import MutableMapping
+from typing import Dict, Any, Optional, Iterator, FrozenSet
+
+from pipeline.utils.keyword_matcher import get_keyword_matcher
+
+# Typed fields extracted from the raw event, present only when it had a value for them
+TYPED_FIELDS = ('source_ip', 'user', 'source_port', 'destination_ip', 'destination_port', 'destination_domain',
+                'protocol', 'bytes_in', 'bytes_out', 'direction', 'auth_outcome')
+
+# Keys of a normalized event, in the order the event processor has always produced them
+EVENT_KEYS = ('event_id', 'timestamp', 'source', 'event_type', 'severity', 'description',
+              'raw_data', 'processed_at') + TYPED_FIELDS
+
+_OPTIONAL_KEYS = frozenset(TYPED_FIELDS)
+
+_MISSING = object()
+
+
+def _intern(value: Any) -> Any:
+    """Intern strings that repeat across events, passing other values through."""
+    return sys.intern(value) if type(value) is str else value
+
+
+class NormalizedEvent(MutableMapping):
+    """A processed event stored in slots instead of nested dictionaries.
+
+    Behaves like the dictionaries the event processor used to return:
+    ``event['source']`` is still ``{'name': ..., 'type': ...}``, optional keys
+    are only present when set, and ``repr`` matches the equivalent dict, so
+    detectors and storage need no changes. Repeated strings (source, event
+    type, severity) are interned and shared between events. The typed
+    fields (see ``TYPED_FIELDS``) are extracted once at normalization so
+    detectors can read them directly, and so are the keywords found in the
+    raw event (``keywords``, not one of the mapping's keys).
+
+    The raw record is kept either as the original dictionary or, with
+    ``compact_raw``, as UTF-8 JSON decoded each time ``raw_data`` is read;
+    the compact form lets the collected dictionaries be freed once a batch
+    is processed, at the cost of a decode per access. Keys outside the
+    standard set can still be assigned and are kept in a small side dict.
+    """
+
+    __slots__ = ('event_id', 'timestamp', 'source_name', 'source_type', 'event_type', 'severity',
+                 'description', 'processed_at', 'keywords', '_raw', '_extra') + TYPED_FIELDS
+
+    def __init__(self, event_id: str, timestamp: Any, source_name: str, source_type: str,
+                 event_type: str, severity: str, description: str, raw_data: Optional[Dict[str, Any]],
+                 processed_at: str, fields: Optional[Dict[str, Any]] = None, compact_raw: bool = False,
+                 keywords: Optional[FrozenSet[str]] = None):
+        """Initialize the event.
+
+        Args:
+            event_id: Event ID
+            timestamp: Event time
+            source_name: Name of the source the event was collected from
+            source_type: Type of that source
+            event_type: Event type
+            severity: Severity level
+            description: Human-readable description
+            raw_data: The original event
+            processed_at: ISO time the event was processed
+            fields: Typed field values
+            compact_raw: Store the original event as JSON instead of keeping the dictionary
+            keywords: Keywords found in the original event, None if it was not scanned
+        """
+        self.event_id = event_id
+        self.timestamp = timestamp
+        self.source_name = _intern(source_name)
+        self.source_type = _intern(source_type)
+        self.event_type = _intern(event_type)
+        self.severity = _intern(severity)
+        self.description = description
+        self.processed_at = processed_at
+        self.keywords = keywords
+        self._extra = None
+        for field in TYPED_FIELDS:
+            setattr(self, field, _MISSING)
+        if fields:
+            for field, value in fields.items():
+                self[field] = value
+        if compact_raw and raw_data is not None:
+            self._raw = json.dumps(raw_data, separators=(',', ':'), default=str).encode('utf-8')
+        else:
+            self._raw = raw_data
+
+    @property
+    def raw_data(self) -> Optional[Dict[str, Any]]:
+        """The original event, decoded on every access when stored compactly."""
+        if isinstance(self._raw, bytes):
+            return json.loads(self._raw)
+        return self._raw
+
+    @property
+    def source(self) -> Dict[str, str]:
+        """The ``{'name': ..., 'type': ...}`` source dictionary."""
+        return {'name': self.source_name, 'type': self.source_type}
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'source':
+            return self.source
+        if key == 'raw_data':
+            return self.raw_data
+        if key in EVENT_KEYS:
+            value = getattr(self, key)
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == 'source':
+            self.source_name = _intern(value.get('name'))
+            self.source_type = _intern(value.get('type'))
+        elif key == 'raw_data':
+            self._raw = value
+        elif key in EVENT_KEYS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in _OPTIONAL_KEYS and getattr(self, key) is not _MISSING:
+            setattr(self, key, _MISSING)
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for key in EVENT_KEYS:
+            if key not in _OPTIONAL_KEYS or getattr(self, key) is not _MISSING:
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key: Any) -> bool:
+        if key in _OPTIONAL_KEYS:
+            return getattr(self, key) is not _MISSING
+        if key in EVENT_KEYS:
+            return True
+        return self._extra is not None and key in self._extra
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the equivalent plain dictionary."""
+        return {key: self[key] for key in self}
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The missing-key sentinel is not picklable by identity, so unset keys are left out
+        state = {}
+        for slot in self.__slots__:
+            value = getattr(self, slot)
+            if value is not _MISSING:
+                state[slot] = value
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for field in TYPED_FIELDS:
+            setattr(self, field, _MISSING)
+        self.keywords = None
+        self._extra = None
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        # Unpickled strings and keyword sets are new objects, share them again
+        for slot in ('source_name', 'source_type', 'event_type', 'severity'):
+            setattr(self, slot, _intern(getattr(self, slot)))
+        if self.keywords is not None:
+            self.keywords = get_keyword_matcher().share(self.keywords)
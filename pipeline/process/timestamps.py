@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+
+import re
+import logging
+import threading
+from datetime import datetime, timezone, timedelta, tzinfo
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Tuple, Callable
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+logger = logging.getLogger("technoshield-pipeline.process")
+
+# Fields probed for the event time, in order
+TIMESTAMP_FIELDS = ['timestamp', 'time', 'date', 'created_at', 'event_time', '@timestamp']
+
+# Events whose winning field and format are counted before a source's choice is fixed
+DEFAULT_LEARN_EVENTS = 5
+
+_MONTHS = {name: number for number, name in enumerate(
+    ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'], 1)}
+
+# RFC 3164: "Oct 16 12:00:01", the day padded with a space or a zero
+_RFC3164_PATTERN = re.compile(r'^([A-Z][a-z]{2}) +(\d{1,2}) (\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?$')
+
+# Formats tried with strptime after the dedicated parsers
+_STRPTIME_FORMATS = {
+    'clf': '%d/%b/%Y:%H:%M:%S %z',           # 16/Oct/2023:12:00:01 +0000 (Apache/Nginx)
+    'log_comma': '%Y-%m-%d %H:%M:%S,%f',     # 2023-10-16 12:00:01,123 (Python logging)
+    'slashes': '%Y/%m/%d %H:%M:%S',          # 2023/10/16 12:00:01
+    'month_year': '%b %d %Y %H:%M:%S',       # Oct 16 2023 12:00:01 (network devices)
+}
+
+
+def resolve_timezone(name: Optional[str]) -> Optional[tzinfo]:
+    """Resolve a source's ``timezone`` setting.
+
+    Args:
+        name: IANA timezone name such as "Europe/Berlin" or "UTC"; None,
+            empty or "local" for the local timezone
+
+    Returns:
+        The timezone, or None for the local timezone
+    """
+    if not name or str(name).lower() == 'local':
+        return None
+    if str(name).upper() == 'UTC':
+        return timezone.utc
+    try:
+        return ZoneInfo(str(name))
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.error(f"Unknown timezone {name}, using local time")
+        return None
+
+
+def _localize(value: datetime, tz: Optional[tzinfo]) -> datetime:
+    """Attach a timezone to a naive time; None is the local timezone."""
+    if tz is None:
+        return value.astimezone()
+    return value.replace(tzinfo=tz)
+
+
+def _to_utc(value: datetime, tz: Optional[tzinfo] = None) -> datetime:
+    """Convert to an aware UTC datetime; naive times are taken to be in ``tz``."""
+    if value.tzinfo is None:
+        value = _localize(value, tz)
+    return value.astimezone(timezone.utc)
+
+
+def _parse_epoch(value: Any, tz: Optional[tzinfo] = None) -> Optional[datetime]:
+    """Parse epoch seconds, milliseconds, microseconds or nanoseconds."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        try:
+            value = float(value) if '.' in value else int(value)
+        except ValueError:
+            return None
+    if not isinstance(value, (int, float)):
+        return None
+
+    magnitude = abs(value)
+    if magnitude < 1e11:
+        seconds = value
+    elif magnitude < 1e14:
+        seconds = value / 1e3
+    elif magnitude < 1e17:
+        seconds = value / 1e6
+    else:
+        seconds = value / 1e9
+    try:
+        return datetime.fromtimestamp(seconds, tz=timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        return None
+
+
+def _parse_iso(value: Any, tz: Optional[tzinfo] = None) -> Optional[datetime]:
+    """Parse ISO 8601 strings and datetime objects."""
+    if isinstance(value, datetime):
+        return _to_utc(value, tz)
+    if not isinstance(value, str) or len(value) < 10 or not value[:4].isdigit():
+        return None
+    text = value.strip()
+    if text.endswith(('Z', 'z')):
+        text = text[:-1] + '+00:00'
+    try:
+        return _to_utc(datetime.fromisoformat(text), tz)
+    except ValueError:
+        return None
+
+
+def _parse_rfc3164(value: Any, tz: Optional[tzinfo] = None, now: Optional[datetime] = None) -> Optional[datetime]:
+    """Parse RFC 3164 syslog timestamps, which have no year or timezone.
+
+    The year is the current one, or the previous one for a time more than a
+    day in the future, which happens when reading December logs in January.
+    """
+    if not isinstance(value, str):
+        return None
+    match = _RFC3164_PATTERN.match(value.strip())
+    if not match or match.group(1) not in _MONTHS:
+        return None
+
+    now = (now or datetime.now(timezone.utc)).astimezone(tz)
+    fraction = match.group(6)
+    try:
+        parsed = _localize(datetime(now.year, _MONTHS[match.group(1)], int(match.group(2)),
+                                    int(match.group(3)), int(match.group(4)), int(match.group(5)),
+                                    int(fraction.ljust(6, '0')) if fraction else 0), tz)
+    except ValueError:
+        return None
+    if parsed > now + timedelta(days=1):
+        parsed = _localize(parsed.replace(year=now.year - 1, tzinfo=None), tz)
+    return parsed.astimezone(timezone.utc)
+
+
+def _parse_rfc2822(value: Any, tz: Optional[tzinfo] = None) -> Optional[datetime]:
+    """Parse RFC 2822 dates: "Mon, 16 Oct 2023 12:00:01 +0000"."""
+    if not isinstance(value, str) or ',' not in value[:5]:
+        return None
+    try:
+        # Dates always carry a zone; "-0000" (UTC, local zone unknown) parses as naive
+        return _to_utc(parsedate_to_datetime(value), timezone.utc)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def _strptime_parser(fmt: str) -> Callable[[Any, Optional[tzinfo]], Optional[datetime]]:
+    """Build a parser for one strptime format."""
+    def parse(value: Any, tz: Optional[tzinfo] = None) -> Optional[datetime]:
+        if not isinstance(value, str):
+            return None
+        try:
+            return _to_utc(datetime.strptime(value.strip(), fmt), tz)
+        except ValueError:
+            return None
+    return parse
+
+
+# Parsers keyed by format name, in the order they are probed. Each takes the
+# value and the timezone of naive times (None for local time)
+TIMESTAMP_PARSERS: Dict[str, Callable[[Any, Optional[tzinfo]], Optional[datetime]]] = {
+    'epoch': _parse_epoch,
+    'iso8601': _parse_iso,
+    'rfc3164': _parse_rfc3164,
+    'rfc2822': _parse_rfc2822,
+}
+TIMESTAMP_PARSERS.update({name: _strptime_parser(fmt) for name, fmt in _STRPTIME_FORMATS.items()})
+
+
+def parse_timestamp_value(value: Any, tz: Optional[tzinfo] = None) -> Optional[datetime]:
+    """Parse a single timestamp value in any recognized format.
+
+    Args:
+        value: Timestamp string, number or datetime
+        tz: Timezone of times without an offset, None for local time
+
+    Returns:
+        Aware UTC datetime, or None if the value is not a recognized timestamp
+    """
+    if value in (None, ''):
+        return None
+    for parser in TIMESTAMP_PARSERS.values():
+        parsed = parser(value, tz)
+        if parsed is not None:
+            return parsed
+    return None
+
+
+class TimestampParser:
+    """Parses the timestamps of one source into aware UTC datetimes.
+
+    For the first ``learn_events`` events every field and format is probed
+    and the winning (field, format) pairs are counted; after that the most
+    frequent pair is tried first, so a source's events cost a single parse.
+    Events the learned pair cannot parse are still probed in full, and a
+    run of ``learn_events`` such misses starts learning again. Times without
+    an offset are in the source's timezone, local time unless configured.
+    """
+
+    def __init__(self, learn_events: int = DEFAULT_LEARN_EVENTS, tz: Optional[tzinfo] = None):
+        """Initialize the parser.
+
+        Args:
+            learn_events: Number of events counted before the choice is fixed
+            tz: Timezone of times without an offset, None for local time
+        """
+        self.learn_events = learn_events
+        self.tz = tz
+        self.learned: Optional[Tuple[str, str]] = None
+        self._votes: Dict[Tuple[str, str], int] = {}
+        self._misses = 0
+
+    def parse(self, event: Dict[str, Any]) -> Optional[datetime]:
+        """Get the time of an event.
+
+        Args:
+            event: Raw event
+
+        Returns:
+            Aware UTC datetime, or None if no field holds a parseable time
+        """
+        if self.learned is not None:
+            field, format_name = self.learned
+            value = event.get(field)
+            if value not in (None, ''):
+                parsed = TIMESTAMP_PARSERS[format_name](value, self.tz)
+                if parsed is not None:
+                    self._misses = 0
+                    return parsed
+
+            self._misses += 1
+            if self._misses >= self.learn_events:
+                self._relearn()
+
+        found = self._probe(event)
+        if found is None:
+            return None
+        parsed, winner = found
+        if self.learned is None:
+            self._vote(winner)
+        return parsed
+
+    def _probe(self, event: Dict[str, Any]) -> Optional[Tuple[datetime, Tuple[str, str]]]:
+        """Try every field and format, returning the first parse and what produced it."""
+        for field in TIMESTAMP_FIELDS:
+            value = event.get(field)
+            if value in (None, ''):
+                continue
+            for format_name, parser in TIMESTAMP_PARSERS.items():
+                parsed = parser(value, self.tz)
+                if parsed is not None:
+                    return parsed, (field, format_name)
+        return None
+
+    def _vote(self, winner: Tuple[str, str]) -> None:
+        """Count a winning pair and fix the most frequent one once enough are counted."""
+        self._votes[winner] = self._votes.get(winner, 0) + 1
+        if sum(self._votes.values()) >= self.learn_events:
+            self.learned = max(self._votes, key=self._votes.get)
+            self._votes = {}
+
+    def _relearn(self) -> None:
+        """Forget the learned pair after repeated misses."""
+        self.learned = None
+        self._votes = {}
+        self._misses = 0
+
+
+_parsers: Dict[str, TimestampParser] = {}
+_timezones: Dict[str, Optional[tzinfo]] = {}
+_parsers_lock = threading.Lock()
+
+
+def get_timestamp_parser(source_name: str) -> TimestampParser:
+    """Get the timestamp parser of a source, creating it on first use.
+
+    Args:
+        source_name: Name of the source
+
+    Returns:
+        TimestampParser of the source
+    """
+    parser = _parsers.get(source_name)
+    if parser is None:
+        with _parsers_lock:
+            parser = _parsers.setdefault(source_name, TimestampParser(tz=_timezones.get(source_name)))
+    return parser
+
+
+def source_timezone(source_name: Optional[str]) -> Optional[tzinfo]:
+    """Get the timezone of a source's times without an offset, None for local time."""
+    return _timezones.get(source_name)
+
+
+def reset_timestamp_parsers(timezones_by_source: Optional[Dict[str, Optional[str]]] = None) -> None:
+    """Forget the formats learned for every source and apply their timezones.
+
+    Args:
+        timezones_by_source: The ``timezone`` setting of each data source, by
+            source name; sources without one use local time
+    """
+    global _timezones
+    with _parsers_lock:
+        _parsers.clear()
+        _timezones = {name: resolve_timezone(zone) for name, zone in (timezones_by_source or {}).items()}
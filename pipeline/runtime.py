@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Dict, Any, Optional, Callable
+
+from pipeline.utils.logging_config import get_logger
+from pipeline.utils.metrics import set_queue_size, record_queue_state, OperationTimer
+from pipeline.ingest import data_collector
+from pipeline.process import event_processor
+from pipeline.models import threat_detector
+
+logger = get_logger("pipeline")
+
+# Staged runtime defaults
+DEFAULT_QUEUE_CAPACITY = 50000
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_LISTENER_POLL_SECONDS = 1
+
+
+def collect_cycle(pipeline_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Collect one cycle of raw events from every configured source.
+
+    Args:
+        pipeline_config: Loaded pipeline configuration
+
+    Returns:
+        List of raw events
+    """
+    collection_config = pipeline_config.get('collection', {})
+
+    with OperationTimer("pipeline_stage", {"stage": "collect"}):
+        raw_data = data_collector.collect_from_all_sources(
+            pipeline_config['data_sources'],
+            max_workers=collection_config.get('max_workers', data_collector.DEFAULT_MAX_WORKERS),
+            source_timeout=collection_config.get('source_timeout_seconds',
+                                                 data_collector.DEFAULT_SOURCE_TIMEOUT_SECONDS)
+        )
+    logger.info(f"Collected {len(raw_data)} raw events from data sources")
+    return raw_data
+
+
+def analyze_cycle(raw_data: List[Dict[str, Any]], db, archiver=None) -> int:
+    """Normalize, analyze and store one cycle of raw events.
+
+    Args:
+        raw_data: Raw events collected in the cycle
+        db: DatabaseConnector used to store alerts
+        archiver: EventArchiver persisting the processed events, if enabled
+
+    Returns:
+        Number of alerts generated
+    """
+    with OperationTimer("pipeline_stage", {"stage": "process"}):
+        processed_events = event_processor.process_events(raw_data)
+    logger.info(f"Processed and normalized {len(processed_events)} events")
+    if archiver is not None:
+        archiver.submit(processed_events)
+
+    with OperationTimer("pipeline_stage", {"stage": "detect"}):
+        alerts = threat_detector.detect_threats(processed_events)
+    logger.info(f"Generated {len(alerts)} security alerts")
+
+    updates = threat_detector.drain_alert_updates()
+    if alerts or updates:
+        with OperationTimer("pipeline_stage", {"stage": "store"}):
+            db.upsert_alerts(alerts + updates)
+        logger.info(f"Stored {len(alerts)} alerts and {len(updates)} occurrence updates in database")
+
+    return len(alerts)
+
+
+def run_overlapped_cycles(pipeline_config: Dict[str, Any], db,
+                          max_cycles: Optional[int] = None, archiver=None) -> None:
+    """Run processing cycles with collection overlapping analysis.
+
+    While cycle N is normalized, analyzed and stored on a background thread,
+    the loop goes on to collect cycle N+1. Analysis runs on a single worker
+    and cycle N+1 is only handed over once cycle N is finished, so events
+    from each source are still analyzed and stored in collection order.
+
+    Args:
+        pipeline_config: Loaded pipeline configuration
+        db: DatabaseConnector used to store alerts
+        max_cycles: Stop after this many cycles, None to run forever
+        archiver: EventArchiver persisting the processed events, if enabled
+    """
+    interval = pipeline_config.get('processing_interval_seconds', 60)
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis")
+    pending: Optional[Future] = None
+    cycles = 0
+
+    try:
+        while max_cycles is None or cycles < max_cycles:
+            start_time = time.monotonic()
+            cycles += 1
+            logger.info(f"Starting overlapped processing cycle {cycles}")
+
+            try:
+                raw_data = collect_cycle(pipeline_config)
+                _wait_for_analysis(pending)
+                pending = executor.submit(analyze_cycle, raw_data, db, archiver)
+            except Exception as e:
+                logger.error(f"Error in processing cycle: {str(e)}")
+                # Sleep for a short time before retrying
+                time.sleep(10)
+                continue
+
+            # Sleep to maintain the desired collection interval
+            elapsed = time.monotonic() - start_time
+            if elapsed < interval and (max_cycles is None or cycles < max_cycles):
+                time.sleep(interval - elapsed)
+    finally:
+        _wait_for_analysis(pending)
+        executor.shutdown(wait=True)
+
+
+def _wait_for_analysis(pending: Optional[Future]) -> None:
+    """Wait for the previous cycle's analysis, logging rather than raising its errors."""
+    if pending is None:
+        return
+    started = time.monotonic()
+    try:
+        pending.result()
+    except Exception as e:
+        logger.error(f"Error in analysis of previous cycle: {str(e)}")
+    waited = time.monotonic() - started
+    if waited > 0.1:
+        logger.info(f"Collection waited {waited:.2f} seconds for the previous cycle's analysis")
+
+
+class StageQueue:
+    """Bounded queue of event batches between two pipeline stages.
+
+    Capacity is counted in events rather than batches, so memory stays flat
+    however the batches are sized. ``put`` blocks while the queue is full,
+    which is what slows the upstream stage down (backpressure).
+    """
+
+    def __init__(self, name: str, capacity: int = DEFAULT_QUEUE_CAPACITY,
+                 on_change: Optional[Callable[[], None]] = None):
+        """Initialize the queue.
+
+        Args:
+            name: Stage name used for metrics
+            capacity: Maximum number of queued events
+            on_change: Called after every put or get, e.g. to export totals
+        """
+        self.name = name
+        self.capacity = capacity
+        self.depth = 0
+        self._batches = deque()
+        self._condition = threading.Condition()
+        self._on_change = on_change
+
+    def put(self, batch: List[Dict[str, Any]], stop: Optional[threading.Event] = None) -> bool:
+        """Append a batch, blocking while the queue is full.
+
+        A batch larger than the whole capacity is still accepted once the
+        queue is empty, so oversized batches cannot deadlock the pipeline.
+
+        Args:
+            batch: Events to enqueue
+            stop: Event that aborts the wait when set
+
+        Returns:
+            False if the wait was aborted by ``stop``
+        """
+        with self._condition:
+            while self.depth and self.depth + len(batch) > self.capacity:
+                if stop is not None and stop.is_set():
+                    return False
+                self._condition.wait(timeout=0.5)
+            self._batches.append((time.monotonic(), batch))
+            self.depth += len(batch)
+            self._condition.notify_all()
+
+        self._report()
+        return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """Remove the oldest batch, waiting up to ``timeout`` seconds for one.
+
+        Returns:
+            The batch, or None if the queue stayed empty
+        """
+        with self._condition:
+            if not self._batches:
+                self._condition.wait(timeout=timeout)
+                if not self._batches:
+                    return None
+            enqueued_at, batch = self._batches.popleft()
+            self.depth -= len(batch)
+            self._condition.notify_all()
+
+        self._report(time.monotonic() - enqueued_at)
+        return batch
+
+    def _report(self, lag_seconds: Optional[float] = None) -> None:
+        """Export the queue depth and lag."""
+        record_queue_state(self.name, self.depth, lag_seconds)
+        if self._on_change:
+            self._on_change()
+
+
+class StagedPipeline:
+    """Runs collection, processing and detection as concurrent stages.
+
+    Every source is polled by its own collector thread on its own interval
+    (``poll_interval_seconds``; syslog listeners default to one second).
+    Collected events flow through bounded queues to a processing thread and
+    then to a detection-and-storage thread. When detection falls behind the
+    queues fill up and collectors block instead of buffering without limit.
+    """
+
+    def __init__(self, pipeline_config: Dict[str, Any], db, archiver=None):
+        """Initialize the runtime.
+
+        Args:
+            pipeline_config: Loaded pipeline configuration
+            db: DatabaseConnector used to store alerts
+            archiver: EventArchiver persisting the processed events, if enabled
+        """
+        runtime_config = pipeline_config.get('runtime', {})
+        capacity = runtime_config.get('queue_capacity', DEFAULT_QUEUE_CAPACITY)
+
+        self.sources_config = pipeline_config['data_sources']
+        self.default_interval = pipeline_config.get('processing_interval_seconds', 60)
+        self.batch_size = runtime_config.get('batch_size', DEFAULT_BATCH_SIZE)
+        self.db = db
+        self.archiver = archiver
+        self.raw_queue = StageQueue("collect", capacity, self._report_total)
+        self.processed_queue = StageQueue("process", capacity, self._report_total)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """Start the stage threads."""
+        self._stop.clear()
+        for source_config in self.sources_config:
+            self._spawn(self._collect_loop, f"collect-{source_config.get('name', 'unnamed')}", source_config)
+        self._spawn(self._process_loop, "process")
+        self._spawn(self._detect_loop, "detect")
+        logger.info(f"Started staged pipeline with {len(self.sources_config)} collectors")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Signal every stage to stop and wait for the threads to exit."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+        logger.info("Stopped staged pipeline")
+
+    def run_forever(self) -> None:
+        """Start the stages and block until interrupted."""
+        self.start()
+        try:
+            while not self._stop.wait(1.0):
+                pass
+        finally:
+            self.stop()
+
+    def _spawn(self, target: Callable, name: str, *args) -> None:
+        """Start a daemon thread for a stage."""
+        thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _report_total(self) -> None:
+        """Export the total number of queued events."""
+        set_queue_size(self.raw_queue.depth + self.processed_queue.depth)
+
+    def _poll_interval(self, source_config: Dict[str, Any]) -> float:
+        """Get the polling interval of a source."""
+        if 'poll_interval_seconds' in source_config:
+            return float(source_config['poll_interval_seconds'])
+        if source_config.get('type', '').lower() == 'syslog_listener':
+            return DEFAULT_LISTENER_POLL_SECONDS
+        return float(self.default_interval)
+
+    def _collect_loop(self, source_config: Dict[str, Any]) -> None:
+        """Poll one source and feed its events to the processing stage."""
+        interval = self._poll_interval(source_config)
+
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                events = data_collector.tag_events(data_collector.collect_from_source(source_config),
+                                                   source_config)
+                for start in range(0, len(events), self.batch_size):
+                    if not self.raw_queue.put(events[start:start + self.batch_size], self._stop):
+                        return
+            except Exception as e:
+                logger.error(f"Error collecting from {source_config.get('name', 'unnamed')}: {str(e)}")
+
+            # Time spent blocked on a full queue counts towards the interval
+            self._stop.wait(max(0.0, interval - (time.monotonic() - started)))
+
+    def _process_loop(self) -> None:
+        """Normalize collected batches and feed them to the detection stage."""
+        while not self._stop.is_set():
+            batch = self.raw_queue.get(timeout=0.5)
+            if batch is None:
+                continue
+            try:
+                processed = event_processor.process_events(batch)
+                if self.archiver is not None:
+                    self.archiver.submit(processed)
+                if processed and not self.processed_queue.put(processed, self._stop):
+                    return
+            except Exception as e:
+                logger.error(f"Error in processing stage: {str(e)}")
+
+    def _detect_loop(self) -> None:
+        """Detect threats in processed batches and store the alerts."""
+        while not self._stop.is_set():
+            batch = self.processed_queue.get(timeout=0.5)
+            if batch is None:
+                continue
+            try:
+                alerts = threat_detector.detect_threats(batch)
+                updates = threat_detector.drain_alert_updates()
+                if alerts or updates:
+                    self.db.upsert_alerts(alerts + updates)
+                    logger.info(f"Stored {len(alerts)} alerts and {len(updates)} occurrence updates in database")
+            except Exception as e:
+                logger.error(f"Error in detection stage: {str(e)}")
@@ -0,0 +1,14 @@
+import time
+
+import pytest
+
+
+@pytest.fixture
+def local_timezone(monkeypatch):
+    # Naive times default to the local timezone, pin it for the test
+    def set_local_timezone(name):
+        monkeypatch.setenv("TZ", name)
+        time.tzset()
+    yield set_local_timezone
+    monkeypatch.undo()
+    time.tzset()
@@ -0,0 +1,75 @@
+from datetime import datetime
+
+from pipeline.models.alert_suppression import AlertSuppressor, alert_fingerprint
+
+
+def _alert(alert_id, source_ip="10.0.0.1", title="Potential brute force attack from 10.0.0.1", related=None):
+    return {"alert_id": alert_id, "title": title, "description": "", "event_type": "authentication_attack",
+            "source_ip": source_ip, "severity": "high", "related_events": related or []}
+
+
+def test_fingerprint_depends_on_rule_entity_and_window():
+    base = alert_fingerprint(_alert("a"), 3600, timestamp=7200)
+
+    assert alert_fingerprint(_alert("b"), 3600, timestamp=10799) == base
+    assert alert_fingerprint(_alert("a"), 3600, timestamp=10800) != base
+    assert alert_fingerprint(_alert("a", source_ip="10.0.0.2"), 3600, timestamp=7200) != base
+    assert alert_fingerprint(_alert("a", title="Potential port scanning from 10.0.0.1"), 3600,
+                             timestamp=7200) != base
+
+
+def test_repeats_become_one_occurrence_update_per_fingerprint():
+    suppressor = AlertSuppressor(window_seconds=3600)
+
+    first = suppressor.suppress([_alert("a1", related=["e1"])], timestamp=7200)
+    assert [a["alert_id"] for a in first] == ["a1"]
+    assert first[0]["occurrence_count"] == 1
+
+    assert suppressor.suppress([_alert("a2", related=["e2"])], timestamp=7260) == []
+    assert suppressor.suppress([_alert("a3", related=["e2", "e3"])], timestamp=7320) == []
+
+    updates = suppressor.drain_updates()
+    assert len(updates) == 1
+    assert updates[0]["alert_id"] == "a1"
+    assert updates[0]["fingerprint"] == first[0]["fingerprint"]
+    assert updates[0]["occurrence_count"] == 2
+    assert updates[0]["related_events"] == ["e2", "e3"]
+    assert suppressor.drain_updates() == []
+
+
+def test_alert_is_reported_again_in_the_next_window():
+    suppressor = AlertSuppressor(window_seconds=3600)
+    suppressor.suppress([_alert("a1")], timestamp=7200)
+
+    again = suppressor.suppress([_alert("a2")], timestamp=10800)
+
+    assert [a["alert_id"] for a in again] == ["a2"]
+    assert len(suppressor) == 1
+
+
+def test_cache_size_is_bounded():
+    suppressor = AlertSuppressor(window_seconds=3600, max_entries=2)
+    suppressor.suppress([_alert(f"a{i}", source_ip=f"10.0.0.{i}") for i in range(5)], timestamp=7200)
+
+    assert len(suppressor) == 2
+
+
+def test_upsert_aggregates_repeats_into_one_row():
+    from pipeline.utils.db_connector import DatabaseConnector
+
+    db = DatabaseConnector("sqlite://")
+    suppressor = AlertSuppressor(window_seconds=3600)
+
+    first = suppressor.suppress([_alert("a1", related=["e1"])], timestamp=7200)
+    suppressor.suppress([_alert("a2", related=["e2"]), _alert("a3", related=["e3"])], timestamp=7260)
+    assert db.upsert_alerts(first + suppressor.drain_updates()) == 1
+    suppressor.suppress([_alert("a4", related=["e4"])], timestamp=7320)
+    assert db.upsert_alerts(suppressor.drain_updates()) == 1
+
+    with db.engine.connect() as connection:
+        rows = connection.execute(db.alerts_table.select()).mappings().all()
+    assert len(rows) == 1
+    assert rows[0]["alert_id"] == "a1"
+    assert rows[0]["occurrence_count"] == 4
+    assert rows[0]["related_events"] == ["e1", "e2", "e3", "e4"]
+    assert rows[0]["last_seen"] == datetime.fromtimestamp(7320)
@@ -1,15 +1,30 @@
 import pytest
 import os
+import bz2
+import gzip
+import io
+import lzma
+import socket
 import json
 import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
 from unittest.mock import patch, MagicMock
 from pipeline.ingest.data_collector import (
+    collect_from_all_sources,
+    collect_from_api,
     collect_from_file,
     collect_from_syslog,
     collect_from_json_file,
     collect_from_csv_file,
     collect_from_log_file
 )
+from pipeline.ingest import json_stream
+from pipeline.ingest.http_client import close_http_client_pool
+from pipeline.ingest import syslog_listener
+from pipeline.ingest.syslog_listener import SyslogListener, parse_syslog_frame
 
 
 @pytest.fixture
@@ -153,4 +168,523 @@ def test_collect_from_syslog(mock_collect_log):
     
     # Verify collect_from_log_file was called with the correct parameters
     mock_collect_log.assert_called_once_with("/var/log/syslog", r"test pattern")
-    assert result == [{"test": "syslog data"}]
\ No newline at end of file
+    assert result == [{"test": "syslog data"}]
+
+def test_collect_from_log_file_follow_reads_only_new_lines(tmp_path):
+    log_path = tmp_path / "auth.log"
+    log_path.write_text("Jun 1 12:00:00 failed login\n")
+    config = {
+        "name": "auth",
+        "pattern": r"(\w+ \d+ [\d:]+) (.+)",
+        "field_names": ["timestamp", "message"],
+        "follow": True,
+        "checkpoint_file": str(tmp_path / "checkpoints.json"),
+    }
+
+    assert [e["message"] for e in collect_from_log_file(str(log_path), config)] == ["failed login"]
+    assert collect_from_log_file(str(log_path), config) == []
+
+    with open(log_path, "a") as f:
+        f.write("Jun 1 12:00:05 accepted login\nJun 1 12:00:06 partial")
+    assert [e["message"] for e in collect_from_log_file(str(log_path), config)] == ["accepted login"]
+
+    with open(log_path, "a") as f:
+        f.write(" line\n")
+    assert [e["message"] for e in collect_from_log_file(str(log_path), config)] == ["partial line"]
+
+
+def test_collect_from_log_file_follow_handles_rotation_and_truncation(tmp_path):
+    log_path = tmp_path / "auth.log"
+    log_path.write_text("Jun 1 12:00:00 first\n")
+    config = {
+        "name": "auth",
+        "pattern": r"(\w+ \d+ [\d:]+) (.+)",
+        "field_names": ["timestamp", "message"],
+        "follow": True,
+        "checkpoint_file": str(tmp_path / "checkpoints.json"),
+    }
+    collect_from_log_file(str(log_path), config)
+
+    # Lines written just before rotation are drained from the renamed file
+    with open(log_path, "a") as f:
+        f.write("Jun 1 12:00:01 late\n")
+    os.rename(log_path, tmp_path / "auth.log.1")
+    log_path.write_text("Jun 1 12:00:02 rotated\n")
+    assert [e["message"] for e in collect_from_log_file(str(log_path), config)] == ["late", "rotated"]
+
+    log_path.write_text("")
+    with open(log_path, "a") as f:
+        f.write("Jun 1 12:00:03 truncated\n")
+    assert [e["message"] for e in collect_from_log_file(str(log_path), config)] == ["truncated"]
+
+
+def test_collect_from_csv_file_follow_keeps_header(tmp_path):
+    csv_path = tmp_path / "events.csv"
+    csv_path.write_text("timestamp,source_ip\n2023-06-01T12:00:00,192.168.1.1\n")
+    config = {"name": "csv", "follow": True, "checkpoint_file": str(tmp_path / "checkpoints.json")}
+
+    assert collect_from_csv_file(str(csv_path), config)[0]["source_ip"] == "192.168.1.1"
+
+    with open(csv_path, "a") as f:
+        f.write("2023-06-01T12:05:00,192.168.1.2\n")
+    assert collect_from_csv_file(str(csv_path), config) == [
+        {"timestamp": "2023-06-01T12:05:00", "source_ip": "192.168.1.2", "source_offset": 84}
+    ]
+
+
+def test_collect_from_file_jsonl_follow(tmp_path):
+    jsonl_path = tmp_path / "events.jsonl"
+    jsonl_path.write_text('{"source_ip": "192.168.1.1"}\n')
+    config = {
+        "name": "jsonl",
+        "path": str(jsonl_path),
+        "format": "jsonl",
+        "follow": True,
+        "checkpoint_file": str(tmp_path / "checkpoints.json"),
+    }
+
+    assert collect_from_file(config) == [{"source_ip": "192.168.1.1", "source_offset": 29}]
+    with open(jsonl_path, "a") as f:
+        f.write('{"source_ip": "192.168.1.2"}\n')
+    assert collect_from_file(config) == [{"source_ip": "192.168.1.2", "source_offset": 58}]
+
+
+def test_collect_from_all_sources_runs_sources_concurrently():
+    def slow_collect(config):
+        time.sleep(0.3)
+        return [{"value": config["name"]}]
+
+    sources = [{"name": f"source{i}", "type": "api"} for i in range(4)]
+    with patch("pipeline.ingest.data_collector.collect_from_source", side_effect=slow_collect):
+        start = time.monotonic()
+        events = collect_from_all_sources(sources, max_workers=4, source_timeout=5)
+        elapsed = time.monotonic() - start
+
+    assert elapsed < 1.0
+    assert sorted(e["source_name"] for e in events) == ["source0", "source1", "source2", "source3"]
+
+
+def test_collect_from_all_sources_enforces_source_deadline():
+    release = threading.Event()
+
+    def collect(config):
+        if config["name"] == "slow":
+            release.wait(5)
+        return [{"value": config["name"]}]
+
+    sources = [{"name": "slow", "type": "api", "timeout_seconds": 0.2}, {"name": "fast", "type": "file"}]
+    with patch("pipeline.ingest.data_collector.collect_from_source", side_effect=collect), \
+            patch("pipeline.ingest.data_collector.record_data_collection") as mock_record:
+        events = collect_from_all_sources(sources, max_workers=2, source_timeout=5)
+        assert [e["source_name"] for e in events] == ["fast"]
+        mock_record.assert_called_once_with(source="slow", status="timeout", data_points=0)
+
+        # The overrunning source is merged into the next cycle once it finishes
+        release.set()
+        time.sleep(0.1)
+        events = collect_from_all_sources([], max_workers=2, source_timeout=5)
+    assert [e["source_name"] for e in events] == ["slow"]
+
+
+@pytest.fixture
+def local_api_server():
+    # Stand-in HTTP/1.1 server that counts accepted TCP connections
+    connections = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            connections.append(self.client_address)
+            super().setup()
+
+        def do_GET(self):
+            body = json.dumps({"data": {"events": [{"path": self.path}]}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}", connections
+
+    server.shutdown()
+    server.server_close()
+    close_http_client_pool()
+
+
+def test_collect_from_api_reuses_pooled_connection(local_api_server):
+    base_url, connections = local_api_server
+    config = {"name": "pooled", "url": f"{base_url}/events", "events_path": "data.events"}
+
+    for _ in range(3):
+        assert collect_from_api(config) == [{"path": "/events"}]
+
+    assert len(connections) == 1
+
+
+def test_collect_from_api_concurrent_sources_share_pool(local_api_server):
+    base_url, connections = local_api_server
+    sources = [
+        {"name": f"api{i}", "type": "api", "url": f"{base_url}/feed{i}", "events_path": "data.events"}
+        for i in range(4)
+    ]
+
+    for _ in range(2):
+        events = collect_from_all_sources(sources, max_workers=4, source_timeout=5)
+        assert sorted(e["path"] for e in events) == ["/feed0", "/feed1", "/feed2", "/feed3"]
+
+    # One kept-alive connection per source, reused by the second cycle
+    assert len(connections) == 4
+
+
+@pytest.fixture
+def paged_api_server():
+    # Stand-in HTTP server serving a feed of ten events through every pagination style
+    feed = [{"id": i, "timestamp": f"2023-06-01T12:00:{i:02d}"} for i in range(10)]
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            requests_seen.append((parsed.path, query))
+
+            events = [e for e in feed if e["timestamp"] > query.get("since", "")]
+            size = int(query.get("limit", query.get("per_page", 3)))
+            headers = {}
+            if parsed.path == "/page":
+                start = (int(query["page"]) - 1) * size
+                body = {"events": events[start:start + size]}
+            elif parsed.path == "/offset":
+                start = int(query["offset"])
+                body = {"events": events[start:start + size]}
+            elif parsed.path == "/cursor":
+                start = int(query.get("cursor", 0))
+                body = {"events": events[start:start + size], "meta": {"next_cursor": str(start + size)}}
+            else:
+                start = int(query.get("start", 0))
+                body = {"events": events[start:start + size]}
+                if start + size < len(events):
+                    headers["Link"] = f'<{base_url}/link?start={start + size}&limit={size}>; rel="next"'
+
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield base_url, feed, requests_seen
+
+    server.shutdown()
+    server.server_close()
+    close_http_client_pool()
+
+
+@pytest.mark.parametrize("pagination", [
+    {"type": "page", "page_size": 3, "page_size_param": "per_page"},
+    {"type": "offset", "page_size": 3},
+    {"type": "cursor", "page_size": 3, "cursor_path": "meta.next_cursor"},
+    {"type": "link", "page_size": 3},
+])
+def test_collect_from_api_pagination_strategies(paged_api_server, tmp_path, pagination):
+    base_url, feed, _ = paged_api_server
+    config = {
+        "name": f"paged_{pagination['type']}",
+        "url": f"{base_url}/{pagination['type']}",
+        "events_path": "events",
+        "pagination": pagination,
+        "checkpoint_file": str(tmp_path / "checkpoints.json"),
+    }
+
+    assert [e["id"] for e in collect_from_api(config)] == [e["id"] for e in feed]
+
+
+def test_collect_from_api_since_high_water_mark_and_max_pages(paged_api_server, tmp_path):
+    base_url, feed, requests_seen = paged_api_server
+    config = {
+        "name": "since_feed",
+        "url": f"{base_url}/offset",
+        "events_path": "events",
+        "pagination": {"type": "offset", "page_size": 3, "max_pages": 2},
+        "since": {"param": "since", "field": "timestamp"},
+        "checkpoint_file": str(tmp_path / "checkpoints.json"),
+    }
+
+    # The backlog is drained two pages per cycle, resuming where the last cycle stopped
+    assert [e["id"] for e in collect_from_api(config)] == [0, 1, 2, 3, 4, 5]
+    assert [e["id"] for e in collect_from_api(config)] == [6, 7, 8, 9]
+
+    # Once drained, only events newer than the high-water mark are requested
+    assert collect_from_api(config) == []
+    assert requests_seen[-1][1]["since"] == feed[-1]["timestamp"]
+    assert requests_seen[-1][1]["offset"] == "0"
+
+
+def test_collect_from_api_caps_pages_per_cycle_by_default(paged_api_server, tmp_path, monkeypatch):
+    from pipeline.ingest import pagination
+
+    monkeypatch.setattr(pagination, "DEFAULT_MAX_PAGES", 3)
+    base_url, _, _ = paged_api_server
+    config = {
+        "name": "default_cap",
+        "url": f"{base_url}/page",
+        "events_path": "events",
+        "pagination": {"type": "page", "page_size": 3, "page_size_param": "per_page"},
+        "checkpoint_file": str(tmp_path / "checkpoints.json"),
+    }
+
+    assert [e["id"] for e in collect_from_api(config)] == list(range(9))
+    assert [e["id"] for e in collect_from_api(config)] == [9]
+
+
+def test_iter_json_events_streams_nested_events_path(tmp_path, monkeypatch):
+    # Tiny refills force every token to straddle buffer boundaries
+    monkeypatch.setattr(json_stream, "READ_CHUNK_CHARS", 7)
+    events = [{"id": i, "message": f"login \"failed\" [{i}]", "bytes": 10 ** i} for i in range(20)]
+    document = {
+        "meta": {"note": "skip {me} \\\" [and] me", "values": [1, 2.5, None, True]},
+        "data": {"count": 20, "events": events},
+    }
+    json_path = tmp_path / "export.json"
+    json_path.write_text(json.dumps(document, indent=2))
+
+    assert list(json_stream.iter_json_events(str(json_path), "data.events")) == events
+    assert list(json_stream.iter_json_events(str(json_path), "data.missing")) == []
+    assert list(json_stream.iter_json_events(str(json_path), "data.count")) == []
+
+
+def test_iter_json_events_every_chunk_size(tmp_path, monkeypatch):
+    # Scalars cut at a refill ("12." before "5", "1e" before "3", "tr" before "ue")
+    # must not be decoded early, whatever the chunk size
+    document = ('{"skip": [1e3, -0.25, "x"], "n": 12.5, "events": ['
+                '{"a": 12.5, "b": -1e3, "c": true, "d": null, "e": "q\\"uote"}, 123456, -0.5e-2, false, '
+                '[10, 2.25], "s"]}')
+    expected = json.loads(document)["events"]
+    json_path = tmp_path / "export.json"
+    json_path.write_text(document)
+
+    for chunk_size in range(1, len(document) + 1):
+        monkeypatch.setattr(json_stream, "READ_CHUNK_CHARS", chunk_size)
+        assert list(json_stream.iter_json_events(str(json_path), "events")) == expected, chunk_size
+
+    # A top-level scalar followed only by the end of the file is complete
+    number_path = tmp_path / "number.json"
+    number_path.write_text("12.5")
+    monkeypatch.setattr(json_stream, "READ_CHUNK_CHARS", 3)
+    assert list(json_stream.iter_json_events(str(number_path))) == [12.5]
+
+
+def test_collect_from_json_file_streaming_matches_json_load(sample_json_file):
+    expected = collect_from_json_file(sample_json_file, {})
+
+    assert collect_from_json_file(sample_json_file, {"streaming": True}) == expected
+
+
+def test_collect_from_file_ndjson_parallel_chunks(tmp_path):
+    ndjson_path = tmp_path / "events.ndjson"
+    with open(ndjson_path, "w") as f:
+        for i in range(500):
+            f.write(json.dumps({"id": i, "source_ip": f"10.0.0.{i % 255}"}) + "\n")
+        f.write("not json\n")
+
+    config = {"path": str(ndjson_path), "format": "ndjson", "parallel_workers": 2, "chunk_size_bytes": 1024}
+    events = collect_from_file(config)
+
+    assert len(json_stream.ndjson_chunks(str(ndjson_path), 1024)) > 2
+    assert [e["id"] for e in events] == list(range(500))
+
+
+def test_collect_from_file_streams_capped_batches_across_cycles(tmp_path):
+    checkpoint_file = str(tmp_path / "checkpoints.json")
+    ndjson_path = tmp_path / "events.ndjson"
+    ndjson_path.write_text("".join(json.dumps({"id": i}) + "\n" for i in range(25)))
+    json_path = tmp_path / "events.json"
+    json_path.write_text(json.dumps({"events": [{"id": i} for i in range(25)]}))
+
+    for config in (
+        {"name": "ndjson", "path": str(ndjson_path), "format": "ndjson", "parallel_workers": 2,
+         "chunk_size_bytes": 64, "max_events": 10, "checkpoint_file": checkpoint_file},
+        {"name": "json", "path": str(json_path), "format": "json", "events_path": "events",
+         "streaming": True, "max_events": 10, "checkpoint_file": checkpoint_file},
+    ):
+        batches = [[e["id"] for e in collect_from_file(config)] for _ in range(4)]
+
+        # Each cycle resumes where the previous batch stopped, then the file starts over
+        assert batches == [list(range(10)), list(range(10, 20)), list(range(20, 25)), list(range(10))]
+
+
+def _write_archive(path, lines, mtime):
+    opener = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}.get(os.path.splitext(str(path))[1], open)
+    with opener(path, "wt") as f:
+        f.write("".join(f"{line}\n" for line in lines))
+    os.utime(path, (mtime, mtime))
+
+
+def test_collect_from_file_glob_processes_rotated_archives_once_in_order(tmp_path):
+    now = time.time()
+    _write_archive(tmp_path / "auth.log.4.xz", ["Jun 1 12:00:00 e1"], now - 400)
+    _write_archive(tmp_path / "auth.log.3.bz2", ["Jun 1 12:00:00 e2"], now - 300)
+    _write_archive(tmp_path / "auth.log.2.gz", ["Jun 1 12:00:00 e3"], now - 200)
+    _write_archive(tmp_path / "auth.log.1", ["Jun 1 12:00:00 e4"], now - 100)
+    _write_archive(tmp_path / "auth.log", ["Jun 1 12:00:00 e5"], now)
+    config = {
+        "name": "auth",
+        "path": str(tmp_path / "auth.log*"),
+        "format": "log",
+        "pattern": r"(\w+ \d+ [\d:]+) (.+)",
+        "field_names": ["timestamp", "message"],
+        "checkpoint_file": str(tmp_path / "checkpoints.json"),
+    }
+
+    assert [e["message"] for e in collect_from_file(config)] == ["e1", "e2", "e3", "e4", "e5"]
+    # Archives are done; only the live file is read again
+    assert [e["message"] for e in collect_from_file(config)] == ["e5"]
+
+
+def test_collect_from_file_glob_tells_apart_archives_sharing_a_header(tmp_path):
+    now = time.time()
+    header = "timestamp,source_ip,action"
+    _write_archive(tmp_path / "fw.csv.3.gz", [header, "2023-06-01T12:00:00,10.0.0.1,deny"], now - 300)
+    _write_archive(tmp_path / "fw.csv.2", [header, "2023-06-01T12:00:01,10.0.0.2,deny"], now - 200)
+    _write_archive(tmp_path / "fw.csv.1", [header, "2023-06-01T12:00:02,10.0.0.3,allow"], now - 100)
+    _write_archive(tmp_path / "fw.csv", [header], now)
+    config = {
+        "name": "firewall",
+        "path": str(tmp_path / "fw.csv*"),
+        "format": "csv",
+        "checkpoint_file": str(tmp_path / "checkpoints.json"),
+    }
+
+    assert [e["source_ip"] for e in collect_from_file(config)] == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+
+    # A later archive with the same header is new, not one of the done ones
+    _write_archive(tmp_path / "fw.csv.4", [header, "2023-06-01T11:59:59,10.0.0.4,deny"], now - 400)
+    assert [e["source_ip"] for e in collect_from_file(config)] == ["10.0.0.4"]
+
+
+def test_collect_from_syslog_glob_follow_resumes_compressed_rotation(tmp_path):
+    log_path = tmp_path / "syslog"
+    _write_archive(log_path, ["<13>Jun 1 12:00:00 host app: first"], time.time())
+    config = {
+        "name": "syslog",
+        "path": str(tmp_path / "syslog*"),
+        "pattern": r"<(\d+)>(\w+ \d+ [\d:]+) (\S+) (\S+): (.+)",
+        "field_names": ["priority", "timestamp", "hostname", "process", "message"],
+        "follow": True,
+        "checkpoint_file": str(tmp_path / "checkpoints.json"),
+    }
+    assert [e["message"] for e in collect_from_syslog(config)] == ["first"]
+
+    # Lines appended before logrotate renames and compresses the file are not lost or repeated
+    with open(log_path, "a") as f:
+        f.write("<13>Jun 1 12:00:01 host app: second\n")
+    with open(log_path, "rb") as src, gzip.open(tmp_path / "syslog.1.gz", "wb") as dst:
+        dst.write(src.read())
+    os.unlink(log_path)
+    _write_archive(log_path, ["<13>Jun 1 12:00:02 host app: third"], time.time() + 10)
+
+    events = collect_from_syslog(config)
+    assert [e["message"] for e in events] == ["second", "third"]
+    assert events[0]["severity"] == 5
+    assert collect_from_syslog(config) == []
+
+
+def test_parse_syslog_frame_rfc5424_and_rfc3164():
+    event = parse_syslog_frame(
+        '<34>1 2023-10-16T12:00:01.003Z host1 sshd 4321 ID47 [auth@1 user="root"] Failed password for root'
+    )
+    assert event["timestamp"] == "2023-10-16T12:00:01.003Z"
+    assert event["process"] == "sshd"
+    assert event["structured_data"] == '[auth@1 user="root"]'
+    assert event["message"] == "Failed password for root"
+    assert (event["facility"], event["severity"]) == (4, 2)
+
+    event = parse_syslog_frame("<13>Oct 16 12:00:01 host1 sudo[99]: session opened")
+    assert (event["hostname"], event["process"], event["pid"]) == ("host1", "sudo", "99")
+    assert event["message"] == "session opened"
+    assert (event["facility"], event["severity"]) == (1, 5)
+
+
+def test_syslog_listener_receives_udp_and_tcp_into_bounded_buffer():
+    listener = SyslogListener(host="127.0.0.1", port=0, protocol="both", buffer_size=3)
+    listener.start()
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as udp:
+            udp.sendto(b"<13>Oct 16 12:00:01 host1 app: udp message", ("127.0.0.1", listener.port))
+        with socket.create_connection(("127.0.0.1", listener.port)) as tcp:
+            frame = b"<13>Oct 16 12:00:02 host1 app: octet counted"
+            tcp.sendall(b"%d %s" % (len(frame), frame) + b"<13>Oct 16 12:00:03 host1 app: newline\n")
+
+        deadline = time.monotonic() + 2
+        while len(listener.buffer) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert sorted(e["message"] for e in listener.drain()) == ["newline", "octet counted", "udp message"]
+
+        # A full buffer drops the oldest events instead of growing
+        for i in range(5):
+            listener.receive(f"<13>Oct 16 12:00:0{i} host1 app: burst {i}")
+        assert [e["message"] for e in listener.drain()] == ["burst 2", "burst 3", "burst 4"]
+    finally:
+        listener.stop()
+
+
+def test_iter_tcp_frames_rejects_bad_counts_and_discards_oversized_frames(monkeypatch):
+    monkeypatch.setattr(syslog_listener, "MAX_FRAME_BYTES", 16)
+    stream = (
+        b"5 first"                              # octet counted
+        b"30 <13>abcdefghijklmnopqrstuvwxyz"    # octet counted, 14 bytes over the cap
+        b"2023-10-16 no pri\n"                  # digits that are not an octet count
+        b"12345678901234 too long\n"            # more digits than any octet count
+        + b"x" * 40 + b"\n"                     # newline framed, over the cap
+        + b"last\n"
+    )
+    frames = list(syslog_listener._iter_tcp_frames(io.BufferedReader(io.BytesIO(stream))))
+
+    assert frames == [
+        "first", "<13>abcdefghijkl", "2023-10-16 no pr", "12345678901234 t", "x" * 16, "last\n"
+    ]
+
+
+def test_collect_from_all_sources_collects_unnamed_and_duplicate_sources():
+    sources = [{"type": "file", "path": "a.csv"}, {"type": "file", "path": "b.csv"},
+               {"name": "dup", "type": "api", "url": "x"}, {"name": "dup", "type": "api", "url": "y"}]
+
+    def collect(config):
+        return [{"value": config.get("path") or config.get("url")}]
+
+    with patch("pipeline.ingest.data_collector.collect_from_source", side_effect=collect):
+        for _ in range(2):
+            events = collect_from_all_sources(sources, max_workers=4, source_timeout=5)
+            assert sorted(e["value"] for e in events) == ["a.csv", "b.csv", "x", "y"]
+
+
+def test_data_freshness_ages_the_collected_source_labels():
+    from pipeline.utils import metrics
+
+    with patch("pipeline.utils.metrics.time.time", return_value=1000.0):
+        metrics.record_data_collection(source="fresh_source", status="success", data_points=1)
+    with patch("pipeline.utils.metrics.time.time", return_value=1090.0):
+        metrics.update_data_freshness()
+
+    assert metrics.data_freshness.labels(source="fresh_source")._value.get() == 90.0
@@ -0,0 +1,145 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from pipeline.utils.db_connector import DatabaseConnector
+
+
+@pytest.fixture
+def db():
+    connector = DatabaseConnector("sqlite://", insert_chunk_size=3)
+    yield connector
+    connector.engine.dispose()
+
+
+def _alert(alert_id):
+    return {"alert_id": alert_id, "title": f"Alert {alert_id}", "description": "test", "severity": "high",
+            "event_type": "malware", "source_ip": "10.0.0.1", "related_events": ["e1"]}
+
+
+def _event(event_id):
+    return {"event_id": event_id, "timestamp": "2023-10-16T12:00:00Z", "source": {"name": "auth", "type": "file"},
+            "event_type": "authentication", "severity": "low", "user": "root",
+            "processed_at": "2023-10-16T12:00:01", "raw_data": {"message": "session opened"}}
+
+
+def test_store_alerts_counts_only_new_alerts_across_chunks(db):
+    assert db.store_alerts([_alert(str(i)) for i in range(7)]) == 7
+    assert db.store_alerts([_alert("1"), _alert("7"), _alert("7"), _alert("8")]) == 2
+
+    with db.engine.connect() as connection:
+        rows = connection.execute(db.alerts_table.select()).mappings().all()
+    assert sorted(int(row["alert_id"]) for row in rows) == list(range(9))
+    assert rows[0]["related_events"] == ["e1"]
+
+
+def test_store_events_parses_timestamps_and_skips_stored_events(db):
+    assert db.store_events([_event("a"), _event("b")]) == 2
+    assert db.store_events([_event("b"), _event("c")]) == 1
+
+    with db.engine.connect() as connection:
+        row = connection.execute(db.events_table.select().where(db.events_table.c.event_id == "a")).mappings().one()
+    assert row["source_name"] == "auth"
+    assert row["timestamp"].hour == 12
+    assert row["raw_data"] == {"message": "session opened"}
+
+
+def test_times_are_stored_as_naive_utc(db, local_timezone):
+    from datetime import datetime, timezone
+
+    local_timezone("America/New_York")
+    event = dict(_event("tz"), timestamp=datetime(2023, 10, 16, 12, 0, tzinfo=timezone.utc))
+    assert db.store_events([event]) == 1
+
+    with db.engine.connect() as connection:
+        row = connection.execute(db.events_table.select().where(db.events_table.c.event_id == "tz")).mappings().one()
+    # The naive local processing time (UTC-4) is stored in UTC like the event time
+    assert row["timestamp"] == datetime(2023, 10, 16, 12, 0)
+    assert row["processed_at"] == datetime(2023, 10, 16, 16, 0, 1)
+
+
+def test_failed_chunk_does_not_lose_other_chunks(db):
+    events = [_event(str(i)) for i in range(6)]
+    events[1]["raw_data"] = object()  # not JSON serializable, fails the first chunk
+
+    assert db.store_events(events) == 3
+
+
+def test_copy_events_falls_back_to_inserts_outside_postgresql(db):
+    assert db.copy_events([_event("a"), _event("a"), _event("b")]) == 2
+
+
+def test_copy_events_stages_rows_without_the_id_column(db):
+    import csv
+    from unittest.mock import MagicMock
+    from sqlalchemy.dialects import postgresql
+
+    connection = MagicMock()
+    cursor = connection.cursor.return_value
+    cursor.rowcount = 2
+    copied = []
+    cursor.copy_expert.side_effect = lambda sql, buffer: copied.append((sql, buffer.getvalue()))
+    db.engine = MagicMock(dialect=postgresql.dialect())
+    db.engine.raw_connection.return_value = connection
+
+    assert db.copy_events([_event("a"), _event("a"), _event("b")]) == 2
+
+    create, merge = [call.args[0] for call in cursor.execute.call_args_list]
+    assert create.startswith("CREATE TEMP TABLE events_staging ON COMMIT DROP AS SELECT event_id, ")
+    assert create.endswith("FROM events WITH NO DATA")
+    assert " id," not in create and "LIKE" not in create and "DEFAULTS" not in create
+    copy_sql, data = copied[0]
+    assert copy_sql.startswith("COPY events_staging (event_id, ") and copy_sql.endswith("FROM STDIN WITH (FORMAT csv)")
+    assert [row[0] for row in csv.reader(data.splitlines())] == ["a", "a", "b"]
+    assert merge.startswith("INSERT INTO events (event_id, ")
+    assert "SELECT DISTINCT ON (event_id)" in merge and merge.endswith("ON CONFLICT (event_id) DO NOTHING")
+    connection.commit.assert_called_once()
+    connection.close.assert_called_once()
+
+
+def test_copy_csv_encodes_nulls_json_and_timestamps():
+    import csv
+    from datetime import datetime
+    from pipeline.utils.db_connector import _csv_buffer
+
+    buffer = _csv_buffer(
+        [{"event_id": "a", "timestamp": datetime(2023, 10, 16, 12, 0), "description": 'say "hi"\nbye\x00',
+          "raw_data": "plain", "user": None}],
+        ["event_id", "timestamp", "description", "raw_data", "user"],
+        {"raw_data"}
+    )
+
+    text = buffer.getvalue()
+    assert text.endswith(",\n")  # NULL is an unquoted empty field
+    assert next(csv.reader(buffer)) == ["a", "2023-10-16T12:00:00", 'say "hi"\nbye', '"plain"', ""]
+
+
+def test_upsert_alerts_migrates_alerts_table_created_before_fingerprints(tmp_path):
+    db_url = f"sqlite:///{tmp_path / 'pipeline.db'}"
+    engine = create_engine(db_url)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE alerts (id INTEGER PRIMARY KEY, alert_id VARCHAR(50) NOT NULL UNIQUE, "
+            "title VARCHAR(255) NOT NULL, description TEXT, severity VARCHAR(20) NOT NULL, "
+            "source_ip VARCHAR(50), event_type VARCHAR(50), created_at DATETIME, updated_at DATETIME, "
+            "related_events JSON, status VARCHAR(20), details JSON)"
+        ))
+        connection.execute(text("INSERT INTO alerts (alert_id, title, severity) VALUES ('old', 'Old alert', 'low')"))
+    engine.dispose()
+
+    connector = DatabaseConnector(db_url)
+    try:
+        first = dict(_alert("a1"), fingerprint="f" * 32, last_seen="2023-10-16T12:00:00")
+        repeat = dict(_alert("a2"), fingerprint="f" * 32, last_seen="2023-10-16T13:00:00", related_events=["e2"])
+        assert connector.upsert_alerts([first]) == 1
+        assert connector.upsert_alerts([repeat]) == 1
+
+        with connector.engine.connect() as connection:
+            rows = connection.execute(connector.alerts_table.select().order_by("id")).mappings().all()
+        assert [row["alert_id"] for row in rows] == ["old", "a1"]
+        assert rows[1]["occurrence_count"] == 2
+        assert rows[1]["related_events"] == ["e1", "e2"]
+    finally:
+        connector.engine.dispose()
+
+    # Connecting again finds nothing left to migrate
+    DatabaseConnector(db_url).engine.dispose()
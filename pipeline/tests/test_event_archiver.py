@@ -0,0 +1,60 @@
+import time
+import threading
+
+from pipeline.utils.event_archiver import EventArchiver
+
+
+class RecordingDB:
+    def __init__(self):
+        self.batches = []
+        self.written = threading.Event()
+
+    def copy_events(self, events):
+        self.batches.append([e["event_id"] for e in events])
+        self.written.set()
+        return len(events)
+
+
+def _events(start, count):
+    return [{"event_id": str(i)} for i in range(start, start + count)]
+
+
+def test_full_batches_are_written_without_waiting_for_the_interval():
+    db = RecordingDB()
+    archiver = EventArchiver(db, capacity=100, batch_size=5, flush_seconds=60)
+    archiver.start()
+    try:
+        archiver.submit(_events(0, 7))
+        assert db.written.wait(2)
+    finally:
+        archiver.stop()
+
+    assert db.batches == [[str(i) for i in range(5)], ["5", "6"]]
+    assert archiver.archived == 7
+
+
+def test_partial_batches_are_written_after_the_flush_interval():
+    db = RecordingDB()
+    archiver = EventArchiver(db, capacity=100, batch_size=50, flush_seconds=0.1)
+    archiver.start()
+    try:
+        archiver.submit(_events(0, 3))
+        assert db.written.wait(2)
+        assert db.batches == [["0", "1", "2"]]
+    finally:
+        archiver.stop()
+
+
+def test_oldest_events_are_dropped_when_the_queue_is_full():
+    db = RecordingDB()
+    archiver = EventArchiver(db, capacity=4, batch_size=100, flush_seconds=60)
+
+    started = time.monotonic()
+    archiver.submit(_events(0, 3))
+    archiver.submit(_events(3, 3))
+    assert time.monotonic() - started < 1
+
+    archiver.start()
+    archiver.stop()
+    assert archiver.dropped == 2
+    assert db.batches == [["2", "3", "4", "5"]]
@@ -0,0 +1,241 @@
+import pickle
+
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from pipeline.process import event_processor
+from pipeline.process.event_processor import (
+    process_events,
+    shutdown_event_processing,
+    generate_event_id,
+    parse_timestamp,
+    configure_event_processing,
+    EventDeduplicator
+)
+from pipeline.process.normalized_event import NormalizedEvent
+from pipeline.process.timestamps import TimestampParser
+
+
+@pytest.fixture(autouse=True)
+def fresh_processing_state():
+    # The deduplication cache persists across calls, start every test from scratch
+    configure_event_processing([])
+    yield
+    configure_event_processing([])
+
+
+def _raw(message, collection_time="2023-10-16T12:00:00", source_name="auth"):
+    return {"message": message, "host": "web-1", "source_name": source_name, "source_type": "syslog",
+            "collection_time": collection_time}
+
+
+def test_event_ids_are_deterministic_and_ignore_collection_time():
+    first = generate_event_id(_raw("Failed password for root"))
+
+    assert generate_event_id(_raw("Failed password for root", collection_time="2023-10-17T00:00:00")) == first
+    assert generate_event_id(_raw("Failed password for admin")) != first
+    assert generate_event_id(_raw("Failed password for root", source_name="other")) != first
+
+
+def test_event_ids_use_the_configured_fields_of_the_source():
+    configure_event_processing([{"name": "auth", "id_fields": ["message"]}])
+
+    event = _raw("session opened")
+    changed = dict(event, host="web-2")
+    assert generate_event_id(event) == generate_event_id(changed)
+    assert generate_event_id(dict(event, source_name="other")) != generate_event_id(dict(changed, source_name="other"))
+
+
+def test_reprocessed_events_are_dropped():
+    configure_event_processing([{"name": "auth", "id_fields": ["message"]}])
+    first = process_events([_raw("a"), _raw("b"), _raw("a")])
+    again = process_events([_raw("b", collection_time="2023-10-16T12:01:00"), _raw("c")])
+
+    assert [e["description"] for e in first] == ["a", "b"]
+    assert [e["description"] for e in again] == ["c"]
+
+
+def test_repeated_listener_frames_are_all_processed():
+    from pipeline.ingest.syslog_listener import SyslogListener
+    from pipeline.ingest.data_collector import tag_events
+
+    listener = SyslogListener(host="127.0.0.1", port=0)
+    for _ in range(3):
+        listener.receive("<38>Oct 16 12:00:01 host sshd[42]: Failed password for root from 10.0.0.9")
+    config = {"name": "syslog_in", "type": "syslog_listener"}
+
+    # Identical frames are separate attempts, not re-reads of one event
+    assert len(process_events(tag_events(listener.drain(), config))) == 3
+    # API records without an id are kept too, those with one are deduplicated
+    records = [{"message": "login failed", "source_name": "api", "source_type": "api"}] * 2
+    assert len(process_events(records)) == 2
+    with_id = [dict(record, id="evt-1") for record in records]
+    assert len(process_events(with_id)) == 1
+
+
+def test_identical_lines_of_a_file_keep_distinct_ids_and_rereads_are_dropped(tmp_path):
+    from pipeline.ingest.data_collector import collect_from_file, tag_events
+
+    configure_event_processing([{"name": "auth", "id_fields": ["timestamp", "message"]}])
+    log_path = tmp_path / "auth.log"
+    log_path.write_text("Oct 16 12:00:01 Failed password for root\n" * 2 + "Oct 16 12:00:01 Accepted password\n")
+    config = {"name": "auth", "type": "file", "path": str(log_path), "format": "log",
+              "pattern": r"(\w+ \d+ [\d:]+) (.+)", "field_names": ["timestamp", "message"]}
+
+    first = process_events(tag_events(collect_from_file(config), config))
+    again = process_events(tag_events(collect_from_file(config), config))
+
+    assert [e["description"] for e in first] == ["Failed password for root"] * 2 + ["Accepted password"]
+    assert again == []
+
+
+def test_deduplicator_is_bounded_and_can_be_disabled():
+    dedup = EventDeduplicator(max_size=2)
+    assert not dedup.is_duplicate("a")
+    assert not dedup.is_duplicate("b")
+    assert not dedup.is_duplicate("c")
+    assert len(dedup) == 2
+    assert not dedup.is_duplicate("a")
+
+    disabled = EventDeduplicator(max_size=0)
+    assert not disabled.is_duplicate("a") and not disabled.is_duplicate("a")
+
+
+def test_timestamps_of_common_formats_are_normalized_to_utc(local_timezone):
+    local_timezone("UTC")
+    expected = datetime(2023, 10, 16, 12, 0, 1, tzinfo=timezone.utc)
+    for value in [1697457601, "1697457601", 1697457601000, 1697457601000000,
+                  "2023-10-16T12:00:01Z", "2023-10-16T14:00:01+02:00", "2023-10-16 12:00:01",
+                  "16/Oct/2023:14:00:01 +0200", "Mon, 16 Oct 2023 12:00:01 +0000"]:
+        assert parse_timestamp({"source_name": str(value), "time": value}) == expected, value
+
+    syslog = parse_timestamp({"source_name": "syslog", "timestamp": "Oct  6 12:00:01"})
+    assert (syslog.month, syslog.day, syslog.hour, syslog.tzinfo) == (10, 6, 12, timezone.utc)
+    assert syslog <= datetime.now(timezone.utc) + timedelta(days=1)
+
+    fallback = parse_timestamp({"source_name": "x", "timestamp": "garbage", "collection_time": "2023-10-16T12:00:01"})
+    assert fallback == expected
+
+
+def test_naive_timestamps_are_in_the_source_timezone_or_local_time(local_timezone):
+    local_timezone("Asia/Kolkata")
+    configure_event_processing([{"name": "fw", "timezone": "America/New_York"}, {"name": "utc", "timezone": "UTC"}])
+    expected = datetime(2023, 10, 16, 16, 0, 1, tzinfo=timezone.utc)
+
+    # New York is UTC-4 in October; explicit offsets are kept as they are
+    assert parse_timestamp({"source_name": "fw", "time": "2023-10-16 12:00:01"}) == expected
+    assert parse_timestamp({"source_name": "fw", "time": "2023/10/16 12:00:01"}) == expected
+    assert parse_timestamp({"source_name": "fw", "time": "2023-10-16T17:00:01+01:00"}) == expected
+    syslog = parse_timestamp({"source_name": "fw", "timestamp": "Oct  6 12:00:01"})
+    assert (syslog.day, syslog.hour, syslog.tzinfo) == (6, 16, timezone.utc)
+
+    assert parse_timestamp({"source_name": "utc", "time": "2023-10-16 16:00:01"}) == expected
+    # Without a setting the local timezone applies (UTC+5:30)
+    assert parse_timestamp({"source_name": "other", "time": "2023-10-16 21:30:01"}) == expected
+
+
+def test_timestamp_parser_learns_the_field_and_format_of_a_source():
+    parser = TimestampParser(learn_events=3)
+    for second in range(3):
+        parser.parse({"event_time": f"2023-10-16 12:00:0{second}", "date": "not a date"})
+    assert parser.learned == ("event_time", "iso8601")
+
+    # Events the learned format cannot parse are still probed in full
+    assert parser.parse({"epoch": 1, "ts": "x", "time": 1697457601}).year == 2023
+    assert parser.learned == ("event_time", "iso8601")
+
+    # A source that changes format is learned again
+    for _ in range(6):
+        parser.parse({"time": 1697457601})
+    assert parser.learned == ("time", "epoch")
+
+
+def test_normalized_events_behave_like_the_dicts_they_replace():
+    raw = dict(_raw("Failed password for root"), source_type="api", username="root")
+    event = process_events([raw])[0]
+
+    assert isinstance(event, NormalizedEvent)
+    assert event['source'] == {'name': 'auth', 'type': 'api'}
+    assert event['user'] == 'root' and event.get('source_ip') is None and 'source_ip' not in event
+    assert event['raw_data'] is raw
+    assert list(event) == ['event_id', 'timestamp', 'source', 'event_type', 'severity', 'description',
+                           'raw_data', 'processed_at', 'user', 'auth_outcome']
+    assert repr(event) == repr(event.to_dict()) and event == event.to_dict()
+
+    event['score'] = 3
+    assert event['score'] == 3 and 'score' in event
+    assert pickle.loads(pickle.dumps(event)) == event
+
+
+def test_compact_raw_events_are_decoded_on_access():
+    configure_event_processing([], {'compact_raw_events': True})
+    raw = _raw("session opened")
+    event = process_events([raw])[0]
+
+    assert event['raw_data'] == raw and event['raw_data'] is not raw
+    assert 'session opened' in str(event).lower()
+
+
+def _parallel_batch():
+    events = [dict(_raw(f"Failed password for user{i}"), source_offset=i) for i in range(20)]
+    events[7] = "not an event"
+    events[12] = dict(events[3])
+    return events
+
+
+def test_parallel_normalization_matches_in_process_normalization(caplog):
+    events = _parallel_batch()
+    serial = process_events(events)
+
+    configure_event_processing([], {'parallel_workers': 2, 'parallel_chunk_size': 3, 'min_parallel_events': 1})
+    caplog.clear()
+    try:
+        with caplog.at_level('ERROR', logger="technoshield-pipeline.process"):
+            parallel = process_events(events)
+    finally:
+        shutdown_event_processing()
+
+    assert [event['event_id'] for event in parallel] == [event['event_id'] for event in serial]
+    assert len(parallel) == 18
+    assert parallel[0]['raw_data'] is events[0]
+    assert parallel[0]['event_type'] == serial[0]['event_type']
+    assert len([r for r in caplog.records if r.message.startswith("Error processing event")]) == 1
+
+
+def test_parallel_normalization_falls_back_to_in_process(monkeypatch):
+    configure_event_processing([], {'parallel_workers': 2, 'min_parallel_events': 1})
+
+    def broken_pool():
+        raise OSError("cannot start workers")
+
+    monkeypatch.setattr(event_processor, '_get_pool', broken_pool)
+    assert len(process_events(_parallel_batch())) == 18
+
+
+def test_typed_fields_are_extracted_with_source_mappings():
+    configure_event_processing([{"name": "fw", "field_mappings": {"destination_port": "target_port",
+                                                                   "bytes_out": ["octets"]}}])
+    raw = {"source_name": "fw", "source_type": "file", "event_type": "network", "src": "x",
+           "src_ip": "10.0.0.1", "sport": "51000", "dst_ip": "203.0.113.9", "target_port": "443",
+           "port": 80, "proto": 6, "octets": "1200", "bytes_received": 10, "flow_direction": "Egress"}
+
+    event = process_events([raw])[0]
+
+    assert (event['source_ip'], event['source_port'], event['destination_ip'], event['destination_port']) == \
+        ("10.0.0.1", 51000, "203.0.113.9", 443)
+    assert (event['protocol'], event['bytes_out'], event['bytes_in'], event['direction']) == \
+        ("tcp", 1200, 10, "outbound")
+    assert 'auth_outcome' not in event
+
+
+def test_auth_outcome_and_message_ports_are_extracted_once():
+    from pipeline.process.field_extraction import FieldExtractor
+
+    extractor = FieldExtractor()
+    assert extractor.extract({"result": "DENIED"}, "authentication")["auth_outcome"] == "failure"
+    assert extractor.extract({"message": "Invalid user admin"}, "authentication")["auth_outcome"] == "failure"
+    assert extractor.extract({"message": "Accepted password"}, "authentication")["auth_outcome"] == "unknown"
+    assert extractor.extract({"message": "SRC=10.0.0.2 SPT=40000 DPT=22"}, "network")["destination_port"] == 22
+    # sshd "port N" is the client port, not a destination
+    assert "destination_port" not in extractor.extract({"message": "from 10.0.0.2 port 51234"}, "authentication")
+    assert "destination_port" not in extractor.extract({"destination_port": 70000}, "network")
@@ -0,0 +1,132 @@
+import hashlib
+
+import pytest
+
+from pipeline.intel.cidr_tree import CIDRTree
+from pipeline.intel.domain_trie import DomainSuffixTrie
+from pipeline.intel.hash_index import HashIndex, build_hash_index, parse_hash
+from pipeline.intel.feeds import ThreatIntel
+
+
+def test_cidr_tree_returns_the_longest_matching_prefix():
+    tree = CIDRTree()
+    tree.insert("10.0.0.0/8", "wide")
+    tree.insert("10.1.0.0/16", "narrow")
+    tree.insert("10.1.2.3", "host")
+    tree.insert("2001:db8::/32", "v6")
+
+    assert tree.lookup("10.200.0.1") == "wide"
+    assert tree.lookup("10.1.9.9") == "narrow"
+    assert tree.lookup("10.1.2.3") == "host"
+    assert tree.lookup("11.0.0.1") is None
+    assert tree.lookup("2001:db8:0:0::42") == "v6"
+    assert tree.lookup("not an ip") is None
+    assert len(tree) == 4
+
+
+def test_cidr_tree_matches_random_networks_like_a_linear_scan():
+    import ipaddress
+    import random
+
+    rng = random.Random(7)
+    networks = []
+    tree = CIDRTree()
+    for i in range(300):
+        network = ipaddress.ip_network((rng.getrandbits(32), rng.randint(4, 30)), strict=False)
+        networks.append(network)
+        tree.insert(str(network), str(network))
+
+    for _ in range(2000):
+        address = ipaddress.ip_address(rng.getrandbits(32))
+        containing = [n for n in networks if address in n]
+        expected = str(max(containing, key=lambda n: n.prefixlen)) if containing else None
+        assert tree.lookup(str(address)) == expected
+
+
+def test_cidr_tree_rejects_invalid_networks():
+    tree = CIDRTree()
+    assert not tree.insert("10.0.0.0/33", "x")
+    assert not tree.insert("example.com", "x")
+    assert len(tree) == 0
+
+
+def test_domain_trie_matches_domains_and_subdomains_only():
+    trie = DomainSuffixTrie()
+    trie.insert("evil.com", "feed")
+    trie.insert("*.bad.example.org.", "other")
+
+    assert trie.lookup("evil.com") == "feed"
+    assert trie.lookup("cdn.EVIL.com") == "feed"
+    assert trie.lookup("x.bad.example.org") == "other"
+    assert trie.lookup("notevil.com") is None
+    assert trie.lookup("evil.com.attacker.net") is None
+    assert trie.lookup("example.org") is None
+
+
+def test_hash_index_finds_digests_of_any_value(tmp_path):
+    digests = [hashlib.sha256(str(i).encode()).digest() for i in range(1000)]
+    # A digest ending in NUL bytes must still be found
+    digests.append(b'\x01' * 30 + b'\x00\x00')
+    path = str(tmp_path / "hashes.idx")
+
+    assert build_hash_index(digests + digests[:10], 32, path) == 1001
+    index = HashIndex(path)
+    assert all(digest in index for digest in digests)
+    assert hashlib.sha256(b"other").digest() not in index
+    assert b'\x01' * 30 + b'\x00\x01' not in index
+    assert hashlib.md5(b"0").digest() not in index
+
+
+def test_parse_hash_accepts_md5_sha1_and_sha256_only():
+    assert len(parse_hash(hashlib.md5(b"x").hexdigest())) == 16
+    assert len(parse_hash(hashlib.sha1(b"x").hexdigest().upper())) == 20
+    assert len(parse_hash(hashlib.sha256(b"x").hexdigest())) == 32
+    assert parse_hash("abc") is None
+    assert parse_hash("z" * 32) is None
+
+
+@pytest.fixture
+def feed_files(tmp_path):
+    ips = tmp_path / "ips.txt"
+    ips.write_text("# bad actors\n203.0.113.7\n198.51.100.0/24, scanner\nbogus\n")
+    domains = tmp_path / "domains.txt"
+    domains.write_text("evil.com\n")
+    hashes = tmp_path / "hashes.txt"
+    hashes.write_text(hashlib.md5(b"payload").hexdigest() + "\n" + hashlib.sha256(b"payload").hexdigest() + "\n")
+    return {
+        'index_dir': str(tmp_path / "index"),
+        'reload_interval_seconds': 0,
+        'feeds': [
+            {'name': 'ips', 'type': 'ip', 'path': str(ips)},
+            {'name': 'domains', 'type': 'domain', 'path': str(domains)},
+            {'name': 'hashes', 'type': 'hash', 'path': str(hashes)},
+            {'name': 'missing', 'type': 'ip', 'path': str(tmp_path / "missing.txt")},
+        ]
+    }
+
+
+def test_threat_intel_loads_feeds(feed_files):
+    snapshot = ThreatIntel(feed_files).load()
+
+    assert snapshot.match_ip("203.0.113.7") == "ips"
+    assert snapshot.match_ip("198.51.100.20") == "ips"
+    assert snapshot.match_domain("www.evil.com") == "domains"
+    assert snapshot.match_hash(hashlib.md5(b"payload").hexdigest()) == "hashes"
+    assert snapshot.match_hash(hashlib.sha256(b"payload").hexdigest().upper()) == "hashes"
+    assert snapshot.match_hash(hashlib.sha1(b"payload").hexdigest()) is None
+    assert snapshot.counts == {('ips', 'ip'): 2, ('domains', 'domain'): 1, ('hashes', 'hash'): 2}
+
+
+def test_threat_intel_reloads_changed_feeds_into_a_new_snapshot(feed_files, tmp_path):
+    intel = ThreatIntel(feed_files)
+    old = intel.load()
+    assert not intel.reload_if_changed()
+
+    (tmp_path / "domains.txt").write_text("evil.com\nworse.net\n")
+    assert intel.reload_if_changed()
+
+    assert intel.snapshot is not old
+    assert intel.snapshot.match_domain("worse.net") == "domains"
+    assert old.match_domain("worse.net") is None
+    # The previous snapshot's hash index is still usable
+    assert old.match_hash(hashlib.md5(b"payload").hexdigest()) == "hashes"
@@ -0,0 +1,43 @@
+from pipeline.utils.keyword_matcher import KeywordMatcher, get_keyword_matcher
+from pipeline.process.event_processor import determine_event_type
+
+
+def test_scan_returns_matches_in_list_order():
+    matcher = KeywordMatcher({'colors': ['Red', 'green', 'blue'], 'shapes': ['square']})
+
+    matches = matcher.scan("blue sky over a red roof")
+
+    assert matches.get('colors') == ['red', 'blue']
+    assert matches.get('shapes') == []
+    assert 'colors' in matches
+    assert 'shapes' not in matches
+
+
+def test_scan_finds_overlapping_and_nested_keywords_in_one_pass():
+    matcher = KeywordMatcher({'a': ['bad password', 'fail'], 'b': ['password', 'pass', 'word'], 'c': ['failed']})
+
+    matches = matcher.scan("bad password failed")
+
+    assert matches.found == {'bad password', 'password', 'pass', 'word', 'fail', 'failed'}
+    assert matches.get('b') == ['password', 'pass', 'word']
+    # Texts with the same matches share one set
+    assert matcher.find("failed, bad password") is matches.found
+
+
+def test_shared_matcher_covers_classification_and_detection_lists():
+    matches = get_keyword_matcher().scan("failed password for admin, trojan dropped")
+
+    assert matches.get('auth_failure') == ['fail']
+    assert matches.get('malware_indicator') == ['trojan']
+    assert 'password' in matches.get('sensitive_data')
+    assert 'authentication' in matches
+
+
+def test_determine_event_type_keeps_precedence():
+    # Authentication wins over malware when both match
+    assert determine_event_type({'message': 'virus found after login'}) == 'authentication'
+    assert determine_event_type({'message': 'firewall dropped packet'}) == 'network'
+    assert determine_event_type({'message': 'ransomware detected'}) == 'malware'
+    assert determine_event_type({'message': 'privilege escalation'}) == 'access_control'
+    assert determine_event_type({'message': 'hello'}) == 'unknown'
+    assert determine_event_type({'event_type': 'custom', 'message': 'login'}) == 'custom'
@@ -6,8 +6,23 @@ from pipeline.models.threat_detector import (
     detect_authentication_attacks,
     detect_malware_indicators,
     detect_suspicious_network_activity,
-    detect_data_exfiltration
+    detect_data_exfiltration,
+    detect_threat_intel_matches,
+    default_detectors,
+    run_detectors,
+    configure_detector,
+    EventView
 )
+from pipeline.process.event_processor import process_events
+from pipeline.utils.keyword_matcher import keyword_text
+
+
+@pytest.fixture(autouse=True)
+def fresh_detection_state():
+    # Detection windows persist across calls, start every test from scratch
+    configure_detector({})
+    yield
+    configure_detector({})
 
 
 @pytest.fixture
@@ -193,4 +208,300 @@ def test_detect_data_exfiltration_with_sample_data(sample_network_data):
     # Check that the alerts contain the expected descriptions
     alert_descriptions = [alert["description"] for alert in alerts]
     assert any("unusual hours" in desc.lower() for desc in alert_descriptions)
-    assert any("sensitive data" in desc.lower() for desc in alert_descriptions)
\ No newline at end of file
+    assert any("sensitive data" in desc.lower() for desc in alert_descriptions)
+
+
+def _mixed_events():
+    events = []
+    for i in range(4):
+        events.append({"event_id": f"auth-{i}", "source_ip": "10.0.0.1", "event_type": "authentication",
+                       "message": "Failed password for root"})
+    for port in range(20, 26):
+        events.append({"event_id": f"net-{port}", "source_ip": "10.0.0.2", "event_type": "network",
+                       "message": f"connection to port {port}"})
+    events.append({"event_id": "mal-1", "source_ip": "10.0.0.3", "message": "trojan found"})
+    events.append({"event_id": "exf-1", "source_ip": "10.0.0.4", "direction": "outbound",
+                   "bytes_out": 20000000, "destination_ip": "203.0.113.5"})
+    return events
+
+
+def test_single_pass_matches_individual_detectors():
+    events = _mixed_events()
+
+    combined = run_detectors(events, default_detectors())
+    individual = [
+        detect_authentication_attacks(events),
+        detect_malware_indicators(events),
+        detect_suspicious_network_activity(events),
+        detect_data_exfiltration(events),
+        detect_threat_intel_matches(events)
+    ]
+
+    def strip(alerts):
+        return [(a["title"], a["related_events"]) for a in alerts]
+
+    assert [strip(a) for a in combined] == [strip(a) for a in individual]
+    assert [len(a) for a in combined] == [1, 1, 1, 1, 0]
+
+
+def test_event_text_is_computed_once_per_event():
+    events = _mixed_events()
+
+    with patch("pipeline.models.threat_detector.keyword_text", wraps=keyword_text) as text:
+        run_detectors(events, default_detectors())
+
+    assert text.call_count == len(events)
+
+
+def test_normalized_events_are_not_rescanned_for_keywords():
+    processed = process_events([{"message": "Trojan dropped after failed login", "source_ip": "10.0.0.5",
+                                 "source_name": "edr", "source_type": "file"}])
+    # Classification and detection read the same keywords, found once at normalization
+    assert processed[0]["event_type"] == "authentication"
+    assert {"trojan", "fail", "login"} <= processed[0].keywords
+
+    with patch("pipeline.models.threat_detector.keyword_text", wraps=keyword_text) as text:
+        alerts = detect_malware_indicators(processed)
+
+    assert text.call_count == 0
+    assert [a["title"] for a in alerts] == ["Potential malware detected: trojan"]
+
+
+def test_event_view_caches_lowered_text():
+    view = EventView({"message": "Trojan FOUND"})
+
+    assert "trojan found" in view.text
+    assert view.text is view.text
+
+
+def _failed_login(event_id, ip="10.0.0.9", user="alice", minutes_ago=0):
+    return {"event_id": event_id, "source_ip": ip, "user": user, "event_type": "authentication",
+            "message": "Failed password", "timestamp": (datetime.now() - timedelta(minutes=minutes_ago)).isoformat()}
+
+
+def test_auth_failures_accumulate_across_batches():
+    assert detect_authentication_attacks([_failed_login("a1"), _failed_login("a2")]) == []
+
+    alerts = detect_authentication_attacks([_failed_login("a3"), _failed_login("a4")])
+
+    ip_alert = next(a for a in alerts if a["title"].endswith("from 10.0.0.9"))
+    assert "Detected 4 failed" in ip_alert["description"]
+    assert ip_alert["related_events"] == ["a3", "a4"]
+
+
+def test_auth_failures_outside_window_do_not_count():
+    configure_detector({"authentication_failures": 3, "authentication_window_seconds": 60})
+
+    old = [_failed_login("old1", minutes_ago=30), _failed_login("old2", minutes_ago=30)]
+    assert detect_authentication_attacks(old + [_failed_login("new1")]) == []
+
+
+def test_auth_failures_per_user_across_ips():
+    events = [_failed_login(f"u{i}", ip=f"10.0.1.{i}", user="bob") for i in range(3)]
+
+    alerts = detect_authentication_attacks(events)
+
+    assert [a["title"] for a in alerts] == ["Potential brute force attack against user bob"]
+    assert alerts[0]["user"] == "bob"
+
+
+def _connection(event_id, ip="10.0.2.1", port=22, destination="203.0.113.1", seconds_ago=0):
+    return {"event_id": event_id, "source_ip": ip, "event_type": "network", "destination_port": port,
+            "destination_ip": destination,
+            "timestamp": (datetime.now() - timedelta(seconds=seconds_ago)).isoformat()}
+
+
+def test_port_scan_counts_distinct_ports_not_events():
+    # Many connections to the same few ports are not a scan
+    events = [_connection(f"c{i}", port=80 + i % 3) for i in range(50)]
+    assert detect_suspicious_network_activity(events) == []
+
+    alerts = detect_suspicious_network_activity([_connection(f"d{p}", port=p) for p in range(1000, 1002)])
+    assert "5 different ports" in alerts[0]["description"]
+
+
+def test_port_scan_extracts_ports_from_messages():
+    events = [{"event_id": f"m{p}", "source_ip": "10.0.2.2", "event_type": "network",
+               "message": f"IN=eth0 SRC=10.0.2.2 DST=10.0.0.5 PROTO=TCP SPT=40000 DPT={p}"} for p in range(20, 26)]
+    # sshd style "port N" on non-network events is the client port and is ignored
+    events.append({"event_id": "ssh", "source_ip": "10.0.2.2", "event_type": "authentication",
+                   "message": "Accepted password for bob from 10.0.2.2 port 51234 ssh2"})
+
+    alerts = detect_suspicious_network_activity(events)
+
+    assert len(alerts) == 1
+    assert "6 different ports" in alerts[0]["description"]
+    assert "ssh" not in alerts[0]["related_events"]
+
+
+def test_horizontal_scan_detected():
+    events = [_connection(f"h{i}", port=445, destination=f"10.1.0.{i}") for i in range(25)]
+
+    alerts = detect_suspicious_network_activity(events)
+
+    assert [a["title"] for a in alerts] == ["Potential host sweep from 10.0.2.1 on port 445"]
+
+
+def test_distinct_ports_scale_with_fixed_memory():
+    from pipeline.utils.windows import SlidingDistinctCounter
+
+    counter = SlidingDistinctCounter(window_seconds=300)
+    for port in range(1, 20001):
+        count = counter.add("10.0.2.3", port, timestamp=1000)
+
+    assert abs(count - 20000) < 20000 * 0.1
+    bucket = counter._keys["10.0.2.3"].buckets[0][1]
+    assert bucket.items is None and len(bucket.sketch.registers) == 1024
+
+
+def _upload(event_id, ip="10.0.3.1", size=5000000, destination="198.51.100.7"):
+    # Midday, so the after-hours rule stays quiet
+    return {"event_id": event_id, "source_ip": ip, "direction": "outbound", "bytes_out": size,
+            "destination_ip": destination, "timestamp": datetime.now().replace(hour=12).isoformat()}
+
+
+def test_cumulative_outbound_volume_alerts_once_when_crossing_threshold():
+    configure_detector({"data_transfer_threshold_mb": 20})
+
+    # 5MB uploads stay under the single transfer rule, but add up across batches
+    assert detect_data_exfiltration([_upload("u1"), _upload("u2")]) == []
+    alerts = detect_data_exfiltration([_upload("u3"), _upload("u4", destination="198.51.100.8")])
+    assert [a["title"] for a in alerts] == ["Cumulative outbound transfer threshold exceeded by 10.0.3.1"]
+    assert alerts[0]["details"]["bytes_transferred"] >= 20000000
+    assert alerts[0]["details"]["top_destinations"][0]["destination"] == "198.51.100.7"
+
+    # Already over the threshold, further transfers do not alert again
+    assert detect_data_exfiltration([_upload("u5")]) == []
+
+
+def test_detect_threats_exports_top_talkers():
+    from pipeline.utils import metrics
+
+    detect_threats([_upload("t1", ip="10.0.3.2", size=3000), _upload("t2", ip="10.0.3.3", size=9000)])
+
+    assert metrics.top_talker_bytes.labels(source_ip="10.0.3.3")._value.get() == 9000
+    assert metrics.top_talker_bytes.labels(source_ip="10.0.3.2")._value.get() == 3000
+
+
+def test_exfiltration_rules_keep_rule_order_and_parse_numeric_strings():
+    events = [
+        {"event_id": "late", "source_ip": "10.0.4.1", "direction": "outbound", "bytes_out": "2000000",
+         "timestamp": "2023-10-16T23:15:00Z"},
+        {"event_id": "big", "source_ip": "10.0.4.2", "traffic_direction": "outbound", "size": 20000000,
+         "timestamp": "2023-10-16T12:00:00"},
+        {"event_id": "leak", "source_ip": "10.0.4.3", "destination_domain": "paste.example.io", "bytes": 10,
+         "message": "confidential export"},
+        {"event_id": "small", "source_ip": "10.0.4.4", "direction": "outbound", "bytes_out": 10,
+         "timestamp": "not a timestamp"},
+    ]
+
+    alerts = detect_data_exfiltration(events)
+
+    assert [a["related_events"] for a in alerts] == [["big"], ["leak"], ["late"]]
+    assert alerts[0]["details"]["bytes_transferred"] == 20000000
+    assert alerts[1]["details"]["sensitive_keywords"] == ["confidential", "export"]
+    assert "(23:00)" in alerts[2]["description"]
+
+
+def test_after_hours_rule_uses_the_hour_where_the_source_is(local_timezone):
+    from pipeline.process.event_processor import configure_event_processing
+
+    local_timezone("America/New_York")
+    configure_event_processing([{"name": "berlin_fw", "timezone": "Europe/Berlin"}])
+    try:
+        events = [
+            # 19:30 and 23:30 in New York (UTC-4), 00:30 in Berlin (UTC+2)
+            {"event_id": "evening", "source_ip": "10.0.5.1", "direction": "outbound", "bytes_out": 2000000,
+             "timestamp": "2023-10-16T23:30:00Z", "source_name": "fw"},
+            {"event_id": "night", "source_ip": "10.0.5.2", "direction": "outbound", "bytes_out": 2000000,
+             "timestamp": "2023-10-17T03:30:00Z", "source_name": "fw"},
+            {"event_id": "berlin", "source_ip": "10.0.5.3", "direction": "outbound", "bytes_out": 2000000,
+             "timestamp": "2023-10-16T22:30:00Z", "source_name": "berlin_fw"},
+        ]
+
+        alerts = detect_data_exfiltration(events)
+    finally:
+        configure_event_processing([])
+
+    assert [a["related_events"] for a in alerts] == [["night"], ["berlin"]]
+    assert "(23:00)" in alerts[0]["description"]
+    assert "(0:00)" in alerts[1]["description"]
+
+
+def test_threat_intel_matches_ips_domains_and_hashes(tmp_path):
+    import hashlib
+    from pipeline.intel.feeds import configure_threat_intel
+
+    (tmp_path / "ips.txt").write_text("198.51.100.0/24\n")
+    (tmp_path / "domains.txt").write_text("evil.com\n")
+    (tmp_path / "hashes.txt").write_text(hashlib.sha256(b"dropper").hexdigest() + "\n")
+    configure_threat_intel({
+        'index_dir': str(tmp_path / "index"),
+        'feeds': [
+            {'name': 'ips', 'type': 'ip', 'path': str(tmp_path / "ips.txt")},
+            {'name': 'domains', 'type': 'domain', 'path': str(tmp_path / "domains.txt")},
+            {'name': 'hashes', 'type': 'hash', 'path': str(tmp_path / "hashes.txt")},
+        ]
+    })
+    try:
+        events = [
+            {"event_id": "ip", "source_ip": "10.0.0.1", "destination_ip": "198.51.100.9"},
+            {"event_id": "domain", "source_ip": "10.0.0.2", "destination_host": "https://cdn.evil.com:8443/x"},
+            {"event_id": "hash", "source_ip": "10.0.0.3",
+             "raw_data": {"sha256": hashlib.sha256(b"dropper").hexdigest()}},
+            {"event_id": "clean", "source_ip": "10.0.0.4", "destination_host": "notevil.com"},
+        ]
+
+        alerts = detect_threat_intel_matches(events)
+    finally:
+        configure_threat_intel({})
+
+    assert [a["related_events"] for a in alerts] == [["ip"], ["domain"], ["hash"]]
+    assert [a["details"]["matches"][0]["type"] for a in alerts] == ["ip", "domain", "hash"]
+    assert alerts[1]["details"]["matches"][0] == {"indicator": "cdn.evil.com", "type": "domain", "feed": "domains"}
+    assert all(a["event_type"] == "threat_intel" for a in alerts)
+
+
+def test_known_domains_match_by_suffix_not_substring():
+    events = [
+        {"event_id": "known", "destination_domain": "mail.company.com", "bytes": 10, "message": "confidential"},
+        {"event_id": "lookalike", "destination_domain": "company.com.evil.io", "bytes": 10,
+         "message": "confidential"},
+    ]
+
+    alerts = detect_data_exfiltration(events)
+
+    assert [a["related_events"] for a in alerts] == [["lookalike"]]
+
+
+def test_repeated_detections_are_suppressed_across_cycles():
+    from pipeline.models.threat_detector import drain_alert_updates
+
+    first = detect_threats([_failed_login(f"a{i}") for i in range(3)])
+    assert len(first) == 1
+    assert first[0]["occurrence_count"] == 1 and first[0]["fingerprint"]
+
+    assert detect_threats([_failed_login("a3")]) == []
+    updates = drain_alert_updates()
+    assert [(u["alert_id"], u["occurrence_count"]) for u in updates] == [(first[0]["alert_id"], 1)]
+
+
+def test_detectors_use_typed_fields_of_processed_events():
+    from pipeline.process.event_processor import process_events, configure_event_processing
+
+    configure_event_processing([])
+    raw = [{"source_name": "fw", "source_type": "file", "event_type": "network", "src_ip": "10.0.5.1",
+            "dst_ip": "203.0.113.5", "dport": port, "message": "connection"} for port in range(100, 106)]
+    raw.append({"source_name": "fw", "source_type": "file", "src_ip": "10.0.5.2", "traffic_direction": "egress",
+                "bytes_sent": "20000000", "message": "flow closed"})
+    raw += [{"source_name": "auth", "source_type": "api", "event_type": "authentication", "ip_address": "10.0.5.3",
+             "username": "eve", "outcome": "failed", "attempt": i} for i in range(3)]
+    events = process_events(raw)
+
+    network, exfil, auth = (detect_suspicious_network_activity(events), detect_data_exfiltration(events),
+                            detect_authentication_attacks(events))
+
+    assert [a["title"] for a in network] == ["Potential port scanning from 10.0.5.1"]
+    assert exfil[0]["details"]["bytes_transferred"] == 20000000
+    assert {a["title"] for a in auth} == {"Potential brute force attack from 10.0.5.3",
+                                          "Potential brute force attack against user eve"}
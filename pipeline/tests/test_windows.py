@@ -0,0 +1,90 @@
+from pipeline.utils.windows import SlidingWindowCounter
+
+
+def test_counts_expire_with_the_window():
+    counter = SlidingWindowCounter(window_seconds=60, bucket_seconds=10)
+
+    assert counter.add("ip", timestamp=1000) == 1
+    assert counter.add("ip", timestamp=1030) == 2
+    assert counter.add("ip", timestamp=1065) == 2  # the event at 1000 fell out
+    assert counter.count("ip", timestamp=1200) == 0
+
+
+def test_late_events_outside_the_window_are_ignored():
+    counter = SlidingWindowCounter(window_seconds=60, bucket_seconds=10)
+    counter.add("ip", timestamp=1000)
+
+    assert counter.add("ip", timestamp=900) == 1
+    assert counter.add("ip", timestamp=990) == 2
+
+
+def test_idle_keys_are_evicted_and_size_is_bounded():
+    counter = SlidingWindowCounter(window_seconds=60, bucket_seconds=10, max_keys=3)
+    for i in range(5):
+        counter.add(f"ip{i}", timestamp=1000)
+    assert len(counter) == 3
+    assert counter.count("ip0", timestamp=1000) == 0
+
+    counter.add("other", timestamp=2000)
+    assert len(counter) == 1
+
+
+def test_distinct_counter_is_exact_below_the_limit_and_estimates_beyond():
+    from pipeline.utils.sketches import DistinctCounter
+
+    counter = DistinctCounter(exact_limit=64)
+    for i in range(50):
+        counter.add(i)
+        counter.add(i)
+    assert counter.count() == 50
+
+    for i in range(50, 100000):
+        counter.add(i)
+    assert abs(counter.count() - 100000) < 100000 * 0.1
+
+
+def test_distinct_window_drops_expired_buckets():
+    from pipeline.utils.windows import SlidingDistinctCounter
+
+    counter = SlidingDistinctCounter(window_seconds=60, bucket_seconds=15)
+    for port in range(10):
+        counter.add("ip", port, timestamp=1000)
+
+    assert counter.add("ip", 5, timestamp=1030) == 10
+    assert counter.add("ip", 99, timestamp=1070) == 2
+
+
+def test_count_min_sketch_never_undercounts():
+    from pipeline.utils.sketches import CountMinSketch
+
+    sketch = CountMinSketch(width=256, depth=4)
+    for i in range(5000):
+        sketch.add(f"key{i % 500}", i % 7)
+
+    for i in range(500):
+        exact = sum(j % 7 for j in range(i, 5000, 500))
+        assert exact <= sketch.estimate(f"key{i}") <= exact + sketch.total * 0.02
+
+
+def test_space_saving_keeps_heavy_hitters():
+    from pipeline.utils.sketches import SpaceSaving
+
+    summary = SpaceSaving(capacity=10)
+    for i in range(10000):
+        summary.add(f"noise{i}", 1)
+        if i % 10 == 0:
+            summary.add("heavy", 100)
+
+    assert summary.top(1)[0][0] == "heavy"
+    assert len(summary.counts) == 10
+
+
+def test_volume_window_rotates_epochs():
+    from pipeline.utils.windows import SlidingVolumeCounter
+
+    counter = SlidingVolumeCounter(window_seconds=60)
+    counter.add("ip", 100, timestamp=1000)
+    assert counter.add("ip", 50, timestamp=1070) == 150  # previous epoch still counted
+    assert counter.add("ip", 10, timestamp=1130) == 60   # the first epoch rotated out
+    assert counter.top(1) == [("ip", 60)]
+    assert counter.add("ip", 1, timestamp=1400) == 1
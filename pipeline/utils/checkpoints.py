@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger("technoshield-pipeline.utils.checkpoints")
+
+# Directory used for pipeline state when a source does not name its own checkpoint file
+DEFAULT_STATE_DIR = os.environ.get("PIPELINE_STATE_DIR", "state")
+DEFAULT_CHECKPOINT_FILE = os.path.join(DEFAULT_STATE_DIR, "checkpoints.json")
+
+
+class CheckpointStore:
+    """Persists small per-key collection checkpoints (offsets, cursors) as JSON on disk."""
+
+    def __init__(self, path: str):
+        """Initialize the store and load any checkpoints already on disk.
+
+        Args:
+            path: Path to the JSON checkpoint file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._checkpoints = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Load checkpoints from disk.
+
+        Returns:
+            Checkpoint dictionary, empty if the file is missing or unreadable
+        """
+        if not os.path.exists(self.path):
+            return {}
+
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                return data
+            logger.warning(f"Ignoring malformed checkpoint file: {self.path}")
+        except (OSError, ValueError) as e:
+            logger.error(f"Error loading checkpoint file {self.path}: {str(e)}")
+
+        return {}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the checkpoint stored for a key.
+
+        Args:
+            key: Checkpoint key
+
+        Returns:
+            A copy of the checkpoint dictionary or None if not found
+        """
+        with self._lock:
+            checkpoint = self._checkpoints.get(key)
+            return dict(checkpoint) if checkpoint is not None else None
+
+    def set(self, key: str, checkpoint: Dict[str, Any]) -> None:
+        """Store a checkpoint for a key and flush the store to disk.
+
+        Args:
+            key: Checkpoint key
+            checkpoint: JSON-serializable checkpoint dictionary
+        """
+        with self._lock:
+            self._checkpoints[key] = dict(checkpoint)
+            self._save()
+
+    def delete(self, key: str) -> None:
+        """Remove the checkpoint for a key if present.
+
+        Args:
+            key: Checkpoint key
+        """
+        with self._lock:
+            if self._checkpoints.pop(key, None) is not None:
+                self._save()
+
+    def _save(self) -> None:
+        """Atomically write all checkpoints to disk (caller holds the lock)."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Write to a temporary file first so a crash never leaves a truncated checkpoint file
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._checkpoints, f)
+        os.replace(tmp_path, self.path)
+
+
+# Stores shared by every source that uses the same checkpoint file
+_stores: Dict[str, CheckpointStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_checkpoint_store(path: Optional[str] = None) -> CheckpointStore:
+    """Get the shared checkpoint store for a file path.
+
+    Args:
+        path: Path to the checkpoint file, defaults to DEFAULT_CHECKPOINT_FILE
+
+    Returns:
+        CheckpointStore instance for the path
+    """
+    path = os.path.abspath(path or DEFAULT_CHECKPOINT_FILE)
+
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = CheckpointStore(path)
+        return _stores[path]
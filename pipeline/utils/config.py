@@ -24,9 +24,44 @@ DEFAULT_CONFIG = {
             "events_path": "data.events"
         }
     ],
+    "runtime": {
+        "mode": "serial",
+        "queue_capacity": 50000,
+        "batch_size": 5000
+    },
+    "processing": {
+        "dedup_cache_size": 100000,
+        "compact_raw_events": False,
+        "parallel_workers": 0,
+        "parallel_chunk_size": 5000,
+        "min_parallel_events": 20000
+    },
+    "collection": {
+        "max_workers": 8,
+        "source_timeout_seconds": 45
+    },
     "alert_thresholds": {
         "authentication_failures": 3,
-        "port_scan_threshold": 5
+        "authentication_window_seconds": 300,
+        "max_tracked_keys": 100000,
+        "port_scan_threshold": 5,
+        "host_scan_threshold": 20,
+        "port_scan_window_seconds": 300,
+        "data_transfer_threshold_mb": 100,
+        "data_transfer_window_seconds": 3600,
+        "top_talkers": 10,
+        "suppression_window_seconds": 3600
+    },
+    "event_archive": {
+        "enabled": False,
+        "queue_capacity": 500000,
+        "batch_size": 50000,
+        "flush_interval_seconds": 5
+    },
+    "threat_intel": {
+        "feeds": [],
+        "index_dir": "state/intel",
+        "reload_interval_seconds": 300
     },
     "logging": {
         "level": "INFO",
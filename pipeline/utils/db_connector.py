@@ -1,27 +1,72 @@
 #!/usr/bin/env python3
 
+import io
 import os
+import csv
+import json
 import logging
-from typing import List, Dict, Any
-from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, JSON, DateTime, Text
-from sqlalchemy.sql import select, insert
-from datetime import datetime
+from typing import List, Dict, Any, Optional, Set
+from sqlalchemy import create_engine, inspect, text, MetaData, Table, Column, Index, Integer, String, JSON, DateTime, Text
+from sqlalchemy.sql import select, insert, func, literal_column
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import datetime, timezone
 
 logger = logging.getLogger("technoshield-pipeline.utils.db")
 
+# Maximum number of related event IDs kept on an aggregated alert
+MAX_RELATED_EVENTS = 1000
+
+# Default number of rows written per INSERT statement and transaction
+DEFAULT_INSERT_CHUNK_SIZE = 1000
+
+# INSERT constructs supporting ON CONFLICT, by dialect
+_UPSERT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+# Appends the proposed related events to the stored ones, up to MAX_RELATED_EVENTS
+_MERGE_RELATED_EVENTS = {
+    'postgresql': (
+        "(SELECT coalesce(json_agg(merged.value), '[]'::json) FROM ("
+        "SELECT value FROM json_array_elements(coalesce({table}.related_events, '[]'::json)) "
+        "UNION ALL SELECT value FROM json_array_elements(coalesce(excluded.related_events, '[]'::json)) "
+        "LIMIT {limit}) AS merged)"
+    ),
+    'sqlite': (
+        "(SELECT json_group_array(merged.value) FROM ("
+        "SELECT value FROM json_each(coalesce({table}.related_events, '[]')) "
+        "UNION ALL SELECT value FROM json_each(coalesce(excluded.related_events, '[]')) "
+        "LIMIT {limit}) AS merged)"
+    ),
+}
+
+# Scalar maximum function, by dialect
+_GREATEST = {
+    'postgresql': func.greatest,
+    'sqlite': func.max,
+}
+
 
 class DatabaseConnector:
     """Handles database connections and operations for the pipeline."""
     
-    def __init__(self):
-        """Initialize the database connector using environment variables."""
-        self.db_url = self._build_connection_string()
+    def __init__(self, db_url: Optional[str] = None, insert_chunk_size: int = DEFAULT_INSERT_CHUNK_SIZE):
+        """Initialize the database connector.
+        
+        Args:
+            db_url: Database URL, built from environment variables by default
+            insert_chunk_size: Maximum number of rows written per statement
+        """
+        self.db_url = db_url or self._build_connection_string()
+        self.insert_chunk_size = max(int(insert_chunk_size), 1)
         self.engine = create_engine(self.db_url)
         self.metadata = MetaData()
         self._define_tables()
         
-        # Create tables if they don't exist
+        # Create tables if they don't exist, and bring older ones up to date
         self.metadata.create_all(self.engine)
+        self._migrate_tables()
         logger.info("Database connection initialized")
     
     def _build_connection_string(self) -> str:
@@ -50,11 +95,17 @@ class DatabaseConnector:
             Column('severity', String(20), nullable=False),
             Column('source_ip', String(50)),
             Column('event_type', String(50)),
-            Column('created_at', DateTime, default=datetime.now),
-            Column('updated_at', DateTime, default=datetime.now, onupdate=datetime.now),
+            Column('created_at', DateTime, default=_utcnow),
+            Column('updated_at', DateTime, default=_utcnow, onupdate=_utcnow),
             Column('related_events', JSON),
             Column('status', String(20), default='new'),
-            Column('details', JSON)
+            Column('details', JSON),
+            Column('fingerprint', String(32)),
+            Column('occurrence_count', Integer, default=1),
+            Column('last_seen', DateTime),
+            # Unique index rather than a column constraint, so it can be added to
+            # existing tables; upsert_alerts' ON CONFLICT (fingerprint) needs it
+            Index('ix_alerts_fingerprint', 'fingerprint', unique=True)
         )
         
         # Define the events table for storing processed events
@@ -75,106 +126,331 @@ class DatabaseConnector:
             Column('raw_data', JSON)
         )
     
+    def _migrate_tables(self):
+        """Add the columns and indexes missing from tables created by earlier versions.
+        
+        ``create_all`` skips tables that already exist, so columns added to a
+        table definition since (such as the alert fingerprint, occurrence
+        count and last seen time) are added here, as nullable columns.
+        """
+        inspector = inspect(self.engine)
+        preparer = self.engine.dialect.identifier_preparer
+        with self.engine.begin() as connection:
+            for table in (self.alerts_table, self.events_table):
+                existing = {column['name'] for column in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name in existing:
+                        continue
+                    column_type = column.type.compile(dialect=self.engine.dialect)
+                    connection.execute(text(
+                        f"ALTER TABLE {preparer.format_table(table)} "
+                        f"ADD COLUMN {preparer.format_column(column)} {column_type}"
+                    ))
+                    logger.info(f"Added column {column.name} to the {table.name} table")
+                for index in table.indexes:
+                    index.create(connection, checkfirst=True)
+    
     def store_alerts(self, alerts: List[Dict[str, Any]]) -> int:
         """Store detected security alerts in the database.
         
+        Alerts whose alert_id is already stored are skipped.
+        
         Args:
             alerts: List of alert dictionaries to store
             
         Returns:
-            Number of alerts successfully stored
+            Number of alerts actually inserted
         """
         if not alerts:
             return 0
         
-        connection = self.engine.connect()
-        count = 0
+        count = self._insert_new_rows(self.alerts_table, 'alert_id', [_alert_row(alert) for alert in alerts])
+        logger.info(f"Stored {count} new alerts in the database")
+        return count
+    
+    def upsert_alerts(self, alerts: List[Dict[str, Any]]) -> int:
+        """Store alerts, aggregating them into existing alerts with the same fingerprint.
         
-        try:
-            for alert in alerts:
-                # Check if alert already exists
-                query = select([self.alerts_table]).where(self.alerts_table.c.alert_id == alert['alert_id'])
-                result = connection.execute(query).fetchone()
-                
-                if result is None:
-                    # Insert new alert
-                    insert_stmt = insert(self.alerts_table).values(
-                        alert_id=alert['alert_id'],
-                        title=alert['title'],
-                        description=alert['description'],
-                        severity=alert['severity'],
-                        source_ip=alert.get('source_ip'),
-                        event_type=alert['event_type'],
-                        created_at=datetime.now(),
-                        updated_at=datetime.now(),
-                        related_events=alert.get('related_events', []),
-                        status=alert.get('status', 'new'),
-                        details=alert.get('details', {})
-                    )
-                    connection.execute(insert_stmt)
-                    count += 1
-            
-            logger.info(f"Stored {count} new alerts in the database")
-            return count
+        All alerts are written with one ``INSERT ... ON CONFLICT DO UPDATE``
+        statement: new fingerprints are inserted, known ones have their
+        occurrence count incremented, ``last_seen`` extended and the new
+        related events appended (up to ``MAX_RELATED_EVENTS``).
+        
+        Args:
+            alerts: New alerts and suppressed repeats
+                (``threat_detector.drain_alert_updates``) to store
             
-        except Exception as e:
-            logger.error(f"Error storing alerts in database: {str(e)}")
+        Returns:
+            Number of alerts inserted or updated
+        """
+        if not alerts:
             return 0
-        finally:
-            connection.close()
+        
+        dialect = self.engine.dialect.name
+        if dialect not in _UPSERT_INSERTS:
+            logger.error(f"Alert upserts are not supported on {dialect} databases, storing alerts individually")
+            return self.store_alerts(alerts)
+        
+        table = self.alerts_table
+        rows = _aggregate_alert_rows([_alert_row(alert) for alert in alerts])
+        count = 0
+        
+        # Batches beyond the chunk size are split to stay under parameter limits
+        for start in range(0, len(rows), self.insert_chunk_size):
+            chunk = rows[start:start + self.insert_chunk_size]
+            upsert_stmt = _UPSERT_INSERTS[dialect](table).values(chunk)
+            upsert_stmt = upsert_stmt.on_conflict_do_update(
+                index_elements=[table.c.fingerprint],
+                set_={
+                    'occurrence_count': table.c.occurrence_count + upsert_stmt.excluded.occurrence_count,
+                    'last_seen': func.coalesce(_GREATEST[dialect](table.c.last_seen, upsert_stmt.excluded.last_seen),
+                                               table.c.last_seen, upsert_stmt.excluded.last_seen),
+                    'related_events': literal_column(
+                        _MERGE_RELATED_EVENTS[dialect].format(table=table.name, limit=MAX_RELATED_EVENTS)),
+                    'updated_at': upsert_stmt.excluded.updated_at,
+                }
+            )
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(upsert_stmt)
+                count += len(chunk)
+            except Exception as e:
+                logger.error(f"Error upserting alerts in database: {str(e)}")
+        
+        logger.info(f"Upserted {count} alerts in the database")
+        return count
     
     def store_events(self, events: List[Dict[str, Any]]) -> int:
         """Store processed events in the database for historical analysis.
         
+        Events whose event_id is already stored are skipped.
+        
         Args:
             events: List of processed event dictionaries to store
             
         Returns:
-            Number of events successfully stored
+            Number of events actually inserted
         """
         if not events:
             return 0
         
-        connection = self.engine.connect()
-        count = 0
+        count = self._insert_new_rows(self.events_table, 'event_id', [_event_row(event) for event in events])
+        logger.info(f"Stored {count} new events in the database")
+        return count
+    
+    def copy_events(self, events: List[Dict[str, Any]]) -> int:
+        """Bulk load processed events with PostgreSQL ``COPY``.
+        
+        The events are streamed as CSV with ``COPY FROM STDIN`` into a
+        temporary staging table, then merged into the events table with one
+        ``INSERT ... SELECT ... ON CONFLICT DO NOTHING``, all in a single
+        transaction. On other databases this falls back to ``store_events``.
         
+        Args:
+            events: List of processed event dictionaries to store
+            
+        Returns:
+            Number of events actually inserted
+        """
+        if not events:
+            return 0
+        if self.engine.dialect.name != 'postgresql':
+            return self.store_events(events)
+        
+        table = self.events_table
+        preparer = self.engine.dialect.identifier_preparer
+        columns = [column.name for column in table.columns if column.name != 'id']
+        column_list = ", ".join(preparer.quote(name) for name in columns)
+        table_name = preparer.format_table(table)
+        json_columns = {column.name for column in table.columns if isinstance(column.type, JSON)}
+        buffer = _csv_buffer([_event_row(event) for event in events], columns, json_columns)
+        
+        connection = self.engine.raw_connection()
         try:
-            for event in events:
-                # Check if event already exists
-                query = select([self.events_table]).where(self.events_table.c.event_id == event['event_id'])
-                result = connection.execute(query).fetchone()
-                
-                if result is None:
-                    # Parse timestamp if it's a string
-                    timestamp = event.get('timestamp')
-                    if isinstance(timestamp, str):
-                        try:
-                            timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                        except (ValueError, TypeError):
-                            timestamp = datetime.now()
-                    
-                    # Insert new event
-                    insert_stmt = insert(self.events_table).values(
-                        event_id=event['event_id'],
-                        timestamp=timestamp,
-                        source_name=event.get('source', {}).get('name'),
-                        source_type=event.get('source', {}).get('type'),
-                        event_type=event.get('event_type'),
-                        severity=event.get('severity'),
-                        description=event.get('description'),
-                        source_ip=event.get('source_ip'),
-                        user=event.get('user'),
-                        processed_at=event.get('processed_at'),
-                        raw_data=event.get('raw_data')
-                    )
-                    connection.execute(insert_stmt)
-                    count += 1
+            cursor = connection.cursor()
+            # Only the copied columns, without defaults: the id default would draw
+            # a value from the events sequence for every staged row
+            cursor.execute(f"CREATE TEMP TABLE events_staging ON COMMIT DROP AS "
+                           f"SELECT {column_list} FROM {table_name} WITH NO DATA")
+            cursor.copy_expert(f"COPY events_staging ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+            # Duplicates within the batch are dropped before the merge
+            cursor.execute(
+                f"INSERT INTO {table_name} ({column_list}) "
+                f"SELECT DISTINCT ON (event_id) {column_list} FROM events_staging "
+                f"ON CONFLICT (event_id) DO NOTHING"
+            )
+            count = cursor.rowcount
+            connection.commit()
             
-            logger.info(f"Stored {count} new events in the database")
+            logger.info(f"Copied {count} new events into the database")
             return count
             
         except Exception as e:
-            logger.error(f"Error storing events in database: {str(e)}")
+            connection.rollback()
+            logger.error(f"Error copying events into database: {str(e)}")
             return 0
         finally:
-            connection.close()
\ No newline at end of file
+            connection.close()
+    
+    def _insert_new_rows(self, table: Table, key: str, rows: List[Dict[str, Any]]) -> int:
+        """Insert rows whose key is not stored yet, in chunks.
+        
+        Each chunk is written in its own transaction as an executemany of
+        ``INSERT ... ON CONFLICT DO NOTHING RETURNING``, which SQLAlchemy
+        sends as multi-row VALUES statements; the returned keys count the
+        rows actually inserted, and a failing chunk only loses its own rows.
+        Dialects without ON CONFLICT support fall back to checking and
+        inserting row by row, still one transaction per chunk.
+        
+        Args:
+            table: Table to insert into
+            key: Name of the unique column identifying a row
+            rows: Rows to insert
+            
+        Returns:
+            Number of rows actually inserted
+        """
+        dialect_insert = _UPSERT_INSERTS.get(self.engine.dialect.name)
+        count = 0
+        
+        for start in range(0, len(rows), self.insert_chunk_size):
+            chunk = rows[start:start + self.insert_chunk_size]
+            try:
+                with self.engine.begin() as connection:
+                    if dialect_insert is not None:
+                        insert_stmt = dialect_insert(table).on_conflict_do_nothing(
+                            index_elements=[table.c[key]]
+                        ).returning(table.c[key])
+                        count += len(connection.execute(insert_stmt, chunk).fetchall())
+                    else:
+                        count += self._insert_rows_individually(connection, table, key, chunk)
+            except Exception as e:
+                logger.error(f"Error storing {len(chunk)} rows in {table.name}: {str(e)}")
+        
+        return count
+    
+    def _insert_rows_individually(self, connection, table: Table, key: str, rows: List[Dict[str, Any]]) -> int:
+        """Insert rows whose key is not stored yet, one statement per row."""
+        count = 0
+        seen = set()
+        for row in rows:
+            if row[key] in seen:
+                continue
+            seen.add(row[key])
+            query = select(table.c[key]).where(table.c[key] == row[key])
+            if connection.execute(query).first() is None:
+                connection.execute(insert(table).values(row))
+                count += 1
+        return count
+    
+
+def _alert_row(alert: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an alert dictionary to an alerts table row."""
+    now = _utcnow()
+    return {
+        'alert_id': alert['alert_id'],
+        'title': alert['title'],
+        'description': alert['description'],
+        'severity': alert['severity'],
+        'source_ip': alert.get('source_ip'),
+        'event_type': alert['event_type'],
+        'created_at': now,
+        'updated_at': now,
+        'related_events': alert.get('related_events', []),
+        'status': alert.get('status', 'new'),
+        'details': alert.get('details', {}),
+        'fingerprint': alert.get('fingerprint'),
+        'occurrence_count': alert.get('occurrence_count', 1),
+        'last_seen': _parse_datetime(alert.get('last_seen')),
+    }
+
+
+def _event_row(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a processed event dictionary to an events table row."""
+    source = event.get('source') or {}
+    return {
+        'event_id': event['event_id'],
+        'timestamp': _parse_datetime(event.get('timestamp')),
+        'source_name': source.get('name'),
+        'source_type': source.get('type'),
+        'event_type': event.get('event_type'),
+        'severity': event.get('severity'),
+        'description': event.get('description'),
+        'source_ip': event.get('source_ip'),
+        'user': event.get('user'),
+        'processed_at': _parse_datetime(event.get('processed_at')),
+        'raw_data': event.get('raw_data'),
+    }
+
+
+def _csv_buffer(rows: List[Dict[str, Any]], columns: List[str], json_columns: Set[str]) -> io.StringIO:
+    """Encode rows as CSV for ``COPY ... WITH (FORMAT csv)``.
+    
+    None and empty strings become unquoted empty fields, which COPY reads
+    as NULL; JSON columns are serialized and NUL characters, which
+    PostgreSQL text cannot hold, are removed.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    for row in rows:
+        values = []
+        for column in columns:
+            value = row.get(column)
+            if column in json_columns and value is not None:
+                value = json.dumps(value, default=str)
+            elif isinstance(value, datetime):
+                value = value.isoformat()
+            if isinstance(value, str) and '\x00' in value:
+                value = value.replace('\x00', '')
+            values.append(value)
+        writer.writerow(values)
+    buffer.seek(0)
+    return buffer
+
+
+def _aggregate_alert_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge rows sharing a fingerprint; one statement may not upsert a row twice."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    aggregated = []
+    for row in rows:
+        fingerprint = row['fingerprint']
+        existing = merged.get(fingerprint) if fingerprint else None
+        if existing is None:
+            row['related_events'] = list(row['related_events'] or [])
+            if fingerprint:
+                merged[fingerprint] = row
+            aggregated.append(row)
+            continue
+        existing['occurrence_count'] += row['occurrence_count']
+        if row['last_seen'] and (not existing['last_seen'] or row['last_seen'] > existing['last_seen']):
+            existing['last_seen'] = row['last_seen']
+        related = existing['related_events']
+        for event_id in row['related_events'] or []:
+            if len(related) >= MAX_RELATED_EVENTS:
+                break
+            if event_id not in related:
+                related.append(event_id)
+    return aggregated
+
+
+def _utcnow() -> datetime:
+    """Get the current time as naive UTC, the form every stored time takes."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _parse_datetime(value: Any) -> Any:
+    """Parse an ISO timestamp string and convert datetimes to naive UTC.
+    
+    The timestamp columns hold no offset, so every time is stored in UTC:
+    aware times are converted and naive ones are taken to be local time,
+    like the processing and last seen times the pipeline writes. Other
+    values are passed through.
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return _utcnow()
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+import time
+import threading
+from collections import deque
+from typing import List, Dict, Any, Optional
+
+from pipeline.utils.logging_config import get_logger
+from pipeline.utils.metrics import record_processing_error, record_queue_state
+
+logger = get_logger("pipeline.archive")
+
+# Event archive defaults, overridden by the event_archive configuration
+DEFAULT_ARCHIVE_QUEUE_CAPACITY = 500000
+DEFAULT_ARCHIVE_BATCH_SIZE = 50000
+DEFAULT_ARCHIVE_FLUSH_SECONDS = 5.0
+
+
+class EventArchiver:
+    """Persists processed events to the events table on a background thread.
+
+    ``submit`` only appends to an in-memory queue, so archiving never holds
+    up a processing cycle. The archive thread writes the queued events with
+    ``DatabaseConnector.copy_events`` once ``batch_size`` events are queued
+    or ``flush_seconds`` have passed. When the database falls behind and the
+    queue is full, the oldest events are dropped; drops are logged and
+    counted as processing errors.
+    """
+
+    def __init__(self, db, capacity: int = DEFAULT_ARCHIVE_QUEUE_CAPACITY,
+                 batch_size: int = DEFAULT_ARCHIVE_BATCH_SIZE,
+                 flush_seconds: float = DEFAULT_ARCHIVE_FLUSH_SECONDS):
+        """Initialize the archiver.
+
+        Args:
+            db: DatabaseConnector used to store events
+            capacity: Maximum number of queued events
+            batch_size: Maximum number of events written per COPY
+            flush_seconds: Maximum time an event waits in the queue
+        """
+        self.db = db
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.archived = 0
+        self.dropped = 0
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the archive thread."""
+        if self._thread is not None:
+            logger.warning("Event archiver is already running")
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._archive_loop, name="archive", daemon=True)
+        self._thread.start()
+        logger.info(f"Started event archiver with batches of up to {self.batch_size} events")
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Write the queued events and stop the archive thread."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+        logger.info(f"Stopped event archiver after archiving {self.archived} events")
+
+    def submit(self, events: List[Dict[str, Any]]) -> None:
+        """Queue processed events for archiving without blocking.
+
+        Args:
+            events: Processed events
+        """
+        if not events:
+            return
+        with self._condition:
+            self._queue.extend(events)
+            overflow = len(self._queue) - self.capacity
+            for _ in range(max(overflow, 0)):
+                self._queue.popleft()
+            if overflow > 0:
+                self.dropped += overflow
+            if len(self._queue) >= self.batch_size:
+                self._condition.notify_all()
+            depth = len(self._queue)
+
+        if overflow > 0:
+            record_processing_error("event_archiver", "queue_full")
+            logger.warning(f"Event archive queue is full, dropped {overflow} events")
+        record_queue_state("archive", depth)
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        """Wait for a full batch, the flush interval or a stop, then dequeue up to a batch."""
+        deadline = time.monotonic() + self.flush_seconds
+        with self._condition:
+            while len(self._queue) < self.batch_size and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(timeout=remaining)
+            count = min(len(self._queue), self.batch_size)
+            return [self._queue.popleft() for _ in range(count)]
+
+    def _archive_loop(self) -> None:
+        """Write queued events until stopped, then write whatever is left."""
+        while True:
+            batch = self._take_batch()
+            if batch:
+                try:
+                    self.archived += self.db.copy_events(batch)
+                except Exception as e:
+                    logger.error(f"Error archiving {len(batch)} events: {str(e)}")
+                record_queue_state("archive", len(self._queue))
+            elif self._stop.is_set():
+                return
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+
+import re
+import json
+import threading
+from typing import List, Dict, Any, Optional, Sequence, FrozenSet
+
+# Keyword lists shared by event classification and threat detection.
+# All keywords are lower case and matched as substrings of lower-cased text
+# (see keyword_text).
+KEYWORD_SETS: Dict[str, List[str]] = {
+    # Event classification, see event_processor.EVENT_TYPE_PRECEDENCE
+    'authentication': ['login', 'auth', 'password', 'credential'],
+    'network': ['firewall', 'block', 'allow', 'network'],
+    'malware': ['malware', 'virus', 'trojan', 'ransomware'],
+    'access_control': ['permission', 'access', 'privilege'],
+
+    # Threat detection rules
+    'auth_failure': ['fail', 'invalid', 'bad password', 'incorrect', 'denied'],
+    # Simple keyword-based detection (in production, use more sophisticated methods)
+    'malware_indicator': [
+        'malware', 'virus', 'trojan', 'ransomware', 'backdoor',
+        'suspicious process', 'unauthorized execution', 'known bad file'
+    ],
+    'sensitive_data': [
+        'confidential', 'secret', 'classified', 'restricted', 'personal',
+        'password', 'credit card', 'ssn', 'social security', 'database dump',
+        'export', 'download', 'backup', 'extract'
+    ],
+}
+
+
+# Distinct sets of matched keywords kept for sharing between events
+MAX_SHARED_MATCH_SETS = 4096
+
+
+def keyword_text(event: Dict[str, Any]) -> str:
+    """Build the canonical text keyword lists are matched against.
+
+    Classification, field extraction and detection all match this one text
+    of the raw event, so they agree on which keywords an event contains.
+
+    Args:
+        event: Raw event
+
+    Returns:
+        Lower-cased JSON form of the event
+    """
+    return json.dumps(event, default=str).lower()
+
+
+class KeywordMatcher:
+    """Matches several named keyword lists against texts.
+
+    Classification and every keyword-driven detection rule go through one
+    matcher, so the keyword lists live in one place. All keywords of all
+    lists are compiled into one regular expression, so a text is searched
+    once rather than once per list; the set of keywords found is what events
+    carry, and the matches of each list are read from it.
+
+    The expression is an alternation run by Python's ``re`` engine, not an
+    automaton: the alternatives are tried at each position of the text, so
+    a search is not guaranteed linear time. The keywords are plain literals,
+    so there is no catastrophic backtracking either.
+    """
+
+    def __init__(self, keyword_sets: Dict[str, Sequence[str]]):
+        """Compile the matcher.
+
+        Args:
+            keyword_sets: Keyword lists keyed by name
+        """
+        self.keyword_sets = {name: tuple(k.lower() for k in keywords) for name, keywords in keyword_sets.items()}
+        keywords = sorted({k for ks in self.keyword_sets.values() for k in ks if k}, key=len, reverse=True)
+        # The lookahead finds a keyword at every position, even inside or
+        # overlapping another match. Longest first, the alternation picks the
+        # longest keyword starting at a position, and the others starting
+        # there are its prefixes
+        self._pattern = re.compile('(?=(' + '|'.join(map(re.escape, keywords)) + '))') if keywords else None
+        self._prefixes = {k: frozenset(p for p in keywords if k.startswith(p)) for k in keywords}
+        self._shared: Dict[FrozenSet[str], FrozenSet[str]] = {frozenset(): frozenset()}
+        self._shared_lock = threading.Lock()
+
+    def find(self, text: str) -> FrozenSet[str]:
+        """Find the keywords of every list that occur in a text.
+
+        Args:
+            text: Lower-cased text to scan
+
+        Returns:
+            Set of keywords found, shared with other texts that have the same matches
+        """
+        found = set()
+        if self._pattern is not None:
+            for match in self._pattern.finditer(text):
+                found |= self._prefixes[match.group(1)]
+        return self.share(frozenset(found))
+
+    def share(self, found: FrozenSet[str]) -> FrozenSet[str]:
+        """Get the shared instance of a set of matched keywords.
+
+        Events match few distinct combinations of keywords, so they hold
+        references to one set per combination rather than a set each.
+
+        Args:
+            found: Set of matched keywords
+
+        Returns:
+            Equal set, shared between events
+        """
+        shared = self._shared.get(found)
+        if shared is None:
+            with self._shared_lock:
+                if len(self._shared) < MAX_SHARED_MATCH_SETS:
+                    shared = self._shared.setdefault(found, found)
+                else:
+                    shared = found
+        return shared
+
+    def scan(self, text: str) -> 'KeywordMatches':
+        """Match a text.
+
+        Args:
+            text: Lower-cased text to scan
+
+        Returns:
+            KeywordMatches for the text
+        """
+        return KeywordMatches(self.keyword_sets, self.find(text))
+
+    def matches(self, found: FrozenSet[str]) -> 'KeywordMatches':
+        """Wrap keywords found earlier, e.g. those stored on a normalized event.
+
+        Args:
+            found: Set of matched keywords returned by ``find``
+
+        Returns:
+            KeywordMatches for the keywords
+        """
+        return KeywordMatches(self.keyword_sets, found)
+
+
+class KeywordMatches:
+    """Keyword matches of one text, by list.
+
+    The matches of a list are read from the set of keywords found the first
+    time the list is asked for, and cached.
+    """
+
+    __slots__ = ('_keyword_sets', '_found', '_matched')
+
+    def __init__(self, keyword_sets: Dict[str, Sequence[str]], found: FrozenSet[str]):
+        """Initialize the matches.
+
+        Args:
+            keyword_sets: Keyword lists keyed by name
+            found: Keywords found in the text
+        """
+        self._keyword_sets = keyword_sets
+        self._found = found
+        self._matched: Dict[str, List[str]] = {}
+
+    @property
+    def found(self) -> FrozenSet[str]:
+        """Every keyword found in the text."""
+        return self._found
+
+    def get(self, name: str) -> List[str]:
+        """Get the keywords of a list that occur in the text.
+
+        Args:
+            name: Keyword list name
+
+        Returns:
+            Matched keywords in list order, empty if none matched
+        """
+        matched = self._matched.get(name)
+        if matched is None:
+            found = self._found
+            matched = self._matched[name] = [k for k in self._keyword_sets[name] if k in found] if found else []
+        return matched
+
+    def __contains__(self, name: str) -> bool:
+        """Check whether any keyword of a list occurs in the text."""
+        return bool(self.get(name))
+
+
+_matcher: Optional[KeywordMatcher] = None
+_matcher_lock = threading.Lock()
+
+
+def get_keyword_matcher() -> KeywordMatcher:
+    """Get the shared matcher compiled over ``KEYWORD_SETS``.
+
+    Returns:
+        KeywordMatcher instance
+    """
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = KeywordMatcher(KEYWORD_SETS)
+    return _matcher
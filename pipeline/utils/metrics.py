@@ -1,6 +1,6 @@
 from prometheus_client import Counter, Histogram, Gauge, Summary, start_http_server
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple
 import threading
 import logging
 
@@ -39,6 +39,13 @@ threat_detection_duration = Histogram(
     buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
 )
 
+pipeline_stage_duration = Histogram(
+    "pipeline_stage_duration_seconds",
+    "Duration of a pipeline cycle stage in seconds",
+    ["stage"],
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+)
+
 threats_detected = Counter(
     "threats_detected_total", 
     "Total number of threats detected",
@@ -56,12 +63,45 @@ processing_queue_size = Gauge(
     "Current size of the processing queue"
 )
 
+stage_queue_depth = Gauge(
+    "stage_queue_depth",
+    "Number of events waiting in a pipeline stage queue",
+    ["stage"]
+)
+
+stage_queue_lag = Gauge(
+    "stage_queue_lag_seconds",
+    "Time the last dequeued batch waited in a pipeline stage queue",
+    ["stage"]
+)
+
+top_talker_bytes = Gauge(
+    "top_talker_bytes",
+    "Estimated outbound bytes of the heaviest source IPs over the transfer window",
+    ["source_ip"]
+)
+
+top_talker_pair_bytes = Gauge(
+    "top_talker_pair_bytes",
+    "Estimated outbound bytes of the heaviest source/destination pairs over the transfer window",
+    ["source_ip", "destination"]
+)
+
+ioc_indicators_loaded = Gauge(
+    "ioc_indicators_loaded",
+    "Number of threat intelligence indicators currently loaded",
+    ["feed", "indicator_type"]
+)
+
 data_freshness = Gauge(
     "data_freshness_seconds", 
     "Time since last data collection",
     ["source"]
 )
 
+# Time of the last successful collection of each source label, aged by update_data_freshness
+_last_collected: Dict[str, float] = {}
+
 # Metrics server state
 _server_started = False
 _server_lock = threading.Lock()
@@ -102,6 +142,10 @@ class OperationTimer:
             ).observe(duration)
         elif self.operation_type == "threat_detection":
             threat_detection_duration.observe(duration)
+        elif self.operation_type == "pipeline_stage":
+            pipeline_stage_duration.labels(
+                stage=self.labels.get("stage", "unknown")
+            ).observe(duration)
 
 
 # Helper functions for recording metrics
@@ -114,6 +158,7 @@ def record_data_collection(source: str, status: str, data_points: int = 0, data_
     
     # Update data freshness timestamp
     if status == "success":
+        _last_collected[source] = time.time()
         data_freshness.labels(source=source).set(0)  # Reset to 0 when fresh data is collected
 
 
@@ -138,15 +183,33 @@ def set_queue_size(size: int) -> None:
     processing_queue_size.set(size)
 
 
+def record_queue_state(stage: str, depth: int, lag_seconds: Optional[float] = None) -> None:
+    """Record the depth (and optionally the lag) of a pipeline stage queue"""
+    stage_queue_depth.labels(stage=stage).set(depth)
+    if lag_seconds is not None:
+        stage_queue_lag.labels(stage=stage).set(lag_seconds)
+
+
+def record_top_talkers(sources: List[Tuple[str, int]], pairs: List[Tuple[Tuple[str, str], int]]) -> None:
+    """Replace the exported top talkers with the current ranking"""
+    top_talker_bytes.clear()
+    for source_ip, volume in sources:
+        top_talker_bytes.labels(source_ip=source_ip).set(volume)
+    top_talker_pair_bytes.clear()
+    for (source_ip, destination), volume in pairs:
+        top_talker_pair_bytes.labels(source_ip=source_ip, destination=destination).set(volume)
+
+
+def record_ioc_indicators(counts: Dict[Tuple[str, str], int]) -> None:
+    """Replace the exported indicator counts, keyed by (feed, indicator type)"""
+    ioc_indicators_loaded.clear()
+    for (feed, indicator_type), count in counts.items():
+        ioc_indicators_loaded.labels(feed=feed, indicator_type=indicator_type).set(count)
+
+
 def update_data_freshness() -> None:
     """Update all data freshness metrics (should be called periodically)"""
-    for source in ["api", "file", "syslog"]:
-        try:
-            # Get current value
-            current = data_freshness.labels(source=source)._value.get()
-            # Increment by the update interval (e.g., 60 seconds)
-            if current is not None:  # Only update if the metric exists
-                data_freshness.labels(source=source).set(current + 60)
-        except Exception:
-            # If the label doesn't exist yet, ignore
-            pass
\ No newline at end of file
+    now = time.time()
+    # Every source label that has been collected, as set by record_data_collection
+    for source, collected_at in list(_last_collected.items()):
+        data_freshness.labels(source=source).set(now - collected_at)
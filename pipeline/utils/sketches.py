@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+
+import math
+import heapq
+import hashlib
+import itertools
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# Default HyperLogLog precision: 2^10 registers, about 3% standard error
+DEFAULT_HLL_PRECISION = 10
+
+# Default number of distinct items counted exactly before switching to HyperLogLog
+DEFAULT_EXACT_LIMIT = 64
+
+# Default count-min sketch dimensions: about 0.1% overestimate of the total, 98% of the time
+DEFAULT_CMS_WIDTH = 2048
+DEFAULT_CMS_DEPTH = 4
+
+# Default number of heavy hitters monitored by a space-saving summary
+DEFAULT_TOP_K_CAPACITY = 100
+
+
+def hash64(item: Any) -> int:
+    """Hash an item to a stable 64-bit integer.
+
+    Unlike ``hash()``, the result does not change between processes.
+
+    Args:
+        item: Item to hash, converted to a string unless it is bytes
+
+    Returns:
+        64-bit hash
+    """
+    data = item if isinstance(item, bytes) else str(item).encode('utf-8', errors='replace')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
+
+
+class HyperLogLog:
+    """HyperLogLog cardinality estimator with a fixed number of registers."""
+
+    __slots__ = ('precision', 'registers')
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION):
+        """Initialize an empty sketch.
+
+        Args:
+            precision: Number of index bits; the sketch uses 2^precision bytes
+        """
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add_hash(self, hashed: int) -> bool:
+        """Add an item by its 64-bit hash.
+
+        Returns:
+            True if the sketch changed
+        """
+        index = hashed & ((1 << self.precision) - 1)
+        rest = hashed >> self.precision
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def merge(self, other: 'HyperLogLog') -> None:
+        """Merge another sketch of the same precision into this one."""
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def estimate(self) -> int:
+        """Estimate the number of distinct items added."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class DistinctCounter:
+    """Distinct item counter, exact for small sets and HyperLogLog beyond.
+
+    Up to ``exact_limit`` items are kept in a set; past that the set is
+    folded into a HyperLogLog sketch, so memory per counter is fixed.
+    """
+
+    __slots__ = ('exact_limit', 'precision', 'items', 'sketch')
+
+    def __init__(self, exact_limit: int = DEFAULT_EXACT_LIMIT, precision: int = DEFAULT_HLL_PRECISION):
+        """Initialize an empty counter.
+
+        Args:
+            exact_limit: Distinct items counted exactly
+            precision: HyperLogLog precision used beyond the limit
+        """
+        self.exact_limit = exact_limit
+        self.precision = precision
+        self.items: Optional[set] = set()
+        self.sketch: Optional[HyperLogLog] = None
+
+    @property
+    def exact(self) -> bool:
+        """Whether the counter still holds its items exactly."""
+        return self.sketch is None
+
+    def add(self, item: Any) -> bool:
+        """Add an item.
+
+        Returns:
+            True if the count may have changed
+        """
+        if self.sketch is not None:
+            return self.sketch.add_hash(hash64(item))
+        if item in self.items:
+            return False
+        self.items.add(item)
+        if len(self.items) > self.exact_limit:
+            self._to_sketch()
+        return True
+
+    def count(self) -> int:
+        """Get the (estimated) number of distinct items."""
+        if self.sketch is not None:
+            return self.sketch.estimate()
+        return len(self.items)
+
+    @classmethod
+    def union_count(cls, counters: Iterable['DistinctCounter']) -> int:
+        """Count the distinct items of several counters together.
+
+        The union is exact while every counter is, and estimated otherwise.
+
+        Args:
+            counters: Counters with the same precision
+
+        Returns:
+            (Estimated) number of distinct items across all counters
+        """
+        counters = list(counters)
+        if not counters:
+            return 0
+        if len(counters) == 1:
+            return counters[0].count()
+        if all(c.sketch is None for c in counters):
+            return len(set().union(*(c.items for c in counters)))
+
+        merged = HyperLogLog(counters[0].precision)
+        for counter in counters:
+            if counter.sketch is not None:
+                merged.merge(counter.sketch)
+            else:
+                for item in counter.items:
+                    merged.add_hash(hash64(item))
+        return merged.estimate()
+
+    def _to_sketch(self) -> None:
+        """Fold the exact set into a HyperLogLog sketch."""
+        self.sketch = HyperLogLog(self.precision)
+        for item in self.items:
+            self.sketch.add_hash(hash64(item))
+        self.items = None
+
+
+class CountMinSketch:
+    """Count-min sketch of weighted counts per key.
+
+    Estimates never undercount; with conservative updates the overestimate
+    is bounded by about ``e / width`` of the total added weight.
+    """
+
+    __slots__ = ('width', 'depth', 'rows', 'total')
+
+    def __init__(self, width: int = DEFAULT_CMS_WIDTH, depth: int = DEFAULT_CMS_DEPTH):
+        """Initialize an empty sketch.
+
+        Args:
+            width: Counters per row
+            depth: Number of rows (independent hash functions)
+        """
+        self.width = width
+        self.depth = depth
+        self.rows = [[0] * width for _ in range(depth)]
+        self.total = 0
+
+    def indexes(self, key: Hashable) -> List[int]:
+        """Get the counter index of a key in every row (double hashing).
+
+        Sketches of the same dimensions share indexes, so callers updating
+        several of them can hash a key once.
+        """
+        hashed = hash64(key)
+        h1, h2 = hashed & 0xFFFFFFFF, (hashed >> 32) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key: Hashable, amount: int = 1, indexes: Optional[List[int]] = None) -> int:
+        """Add weight to a key.
+
+        Args:
+            key: Key to count for
+            amount: Non-negative weight to add
+            indexes: Precomputed ``indexes(key)``
+
+        Returns:
+            Estimated total weight of the key
+        """
+        indexes = indexes or self.indexes(key)
+        rows = self.rows
+        estimate = min(rows[i][index] for i, index in enumerate(indexes)) + amount
+        # Conservative update: only raise counters below the new estimate
+        for i, index in enumerate(indexes):
+            if rows[i][index] < estimate:
+                rows[i][index] = estimate
+        self.total += amount
+        return estimate
+
+    def estimate(self, key: Hashable, indexes: Optional[List[int]] = None) -> int:
+        """Get the estimated total weight of a key.
+
+        Args:
+            key: Key to look up
+            indexes: Precomputed ``indexes(key)``
+        """
+        indexes = indexes or self.indexes(key)
+        return min(self.rows[i][index] for i, index in enumerate(indexes))
+
+
+class SpaceSaving:
+    """Space-saving summary of the heaviest keys of a weighted stream.
+
+    At most ``capacity`` keys are monitored. A new key replaces the lightest
+    monitored one and inherits its count as possible overestimate, so every
+    key heavier than total / capacity is guaranteed to be monitored.
+    """
+
+    __slots__ = ('capacity', 'counts', 'errors', '_heap', '_sequence')
+
+    def __init__(self, capacity: int = DEFAULT_TOP_K_CAPACITY):
+        """Initialize an empty summary.
+
+        Args:
+            capacity: Number of monitored keys
+        """
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        # (count, tie breaker, key) entries; stale entries are skipped lazily
+        self._heap: List[Tuple[int, int, Hashable]] = []
+        self._sequence = itertools.count()
+
+    def add(self, key: Hashable, amount: int = 1) -> None:
+        """Add weight to a key.
+
+        Args:
+            key: Key to count for
+            amount: Non-negative weight to add
+        """
+        counts = self.counts
+        if key in counts:
+            counts[key] += amount
+        elif len(counts) < self.capacity:
+            counts[key] = amount
+            self.errors[key] = 0
+        else:
+            floor = self._pop_min()
+            counts[key] = floor + amount
+            self.errors[key] = floor
+        heapq.heappush(self._heap, (counts[key], next(self._sequence), key))
+
+        if len(self._heap) > 4 * self.capacity:
+            # Drop stale entries so the heap stays proportional to the capacity
+            self._heap = [(count, next(self._sequence), k) for k, count in counts.items()]
+            heapq.heapify(self._heap)
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[Hashable, int]]:
+        """Get the heaviest monitored keys.
+
+        Args:
+            n: Number of keys, all monitored keys if not given
+
+        Returns:
+            (key, estimated count) pairs, heaviest first
+        """
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+    def _pop_min(self) -> int:
+        """Stop monitoring the lightest key and return its count."""
+        while True:
+            count, _, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == count:
+                del self.counts[key]
+                del self.errors[key]
+                return count
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from pipeline.utils.sketches import (
+    DistinctCounter, CountMinSketch, SpaceSaving,
+    DEFAULT_EXACT_LIMIT, DEFAULT_HLL_PRECISION, DEFAULT_CMS_WIDTH, DEFAULT_CMS_DEPTH, DEFAULT_TOP_K_CAPACITY
+)
+
+# Default bound on the number of keys tracked by a window counter
+DEFAULT_MAX_KEYS = 100000
+
+# Default number of buckets a window is divided into
+DEFAULT_BUCKETS_PER_WINDOW = 10
+
+# Default number of buckets of a distinct counting window, each holding a sketch
+DEFAULT_DISTINCT_BUCKETS_PER_WINDOW = 4
+
+
+class _Window:
+    """Time buckets of one key, oldest first."""
+
+    __slots__ = ('buckets', 'total')
+
+    def __init__(self):
+        self.buckets = deque()  # [bucket index, count] pairs
+        self.total = 0
+
+
+class SlidingWindowCounter:
+    """Per-key event counts over a sliding time window.
+
+    The window is split into fixed-size time buckets, so adding an event is
+    O(1) and the count of a key is the sum of its buckets still inside the
+    window. Keys whose buckets have all expired are evicted, and at most
+    ``max_keys`` keys are kept; when full, the least recently updated key is
+    dropped. Not thread-safe: a counter is owned by one detection thread.
+    """
+
+    def __init__(self, window_seconds: float, bucket_seconds: Optional[float] = None,
+                 max_keys: int = DEFAULT_MAX_KEYS):
+        """Initialize the counter.
+
+        Args:
+            window_seconds: Length of the sliding window
+            bucket_seconds: Bucket granularity, a tenth of the window by default
+            max_keys: Maximum number of tracked keys
+        """
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds or max(window_seconds / DEFAULT_BUCKETS_PER_WINDOW, 1.0)
+        self.bucket_count = max(int(round(window_seconds / self.bucket_seconds)), 1)
+        self.max_keys = max_keys
+        self._keys: 'OrderedDict[Hashable, _Window]' = OrderedDict()
+        self._latest_bucket = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: Hashable, timestamp: Optional[float] = None, amount: int = 1) -> int:
+        """Count events for a key.
+
+        Events older than the newest bucket of the key are counted in that
+        bucket; events that already fell out of the window are ignored.
+
+        Args:
+            key: Key to count for, e.g. a source IP
+            timestamp: Event time in epoch seconds, now if not given
+            amount: Number of events
+
+        Returns:
+            Count of the key over the window ending at the newest event
+        """
+        bucket = int((time.time() if timestamp is None else timestamp) // self.bucket_seconds)
+
+        window = self._keys.get(key)
+        if window is None:
+            window = self._keys[key] = _Window()
+            if len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+        else:
+            self._keys.move_to_end(key)
+
+        buckets = window.buckets
+        newest = buckets[-1][0] if buckets else bucket
+        if bucket > newest - self.bucket_count:
+            if buckets and buckets[-1][0] >= bucket:
+                buckets[-1][1] += amount
+            else:
+                buckets.append([bucket, amount])
+            window.total += amount
+        self._expire(window, max(bucket, newest))
+
+        if bucket > self._latest_bucket:
+            self._latest_bucket = bucket
+            self._evict_idle()
+        return window.total
+
+    def count(self, key: Hashable, timestamp: Optional[float] = None) -> int:
+        """Get the count of a key over the window ending at ``timestamp``.
+
+        Args:
+            key: Key to look up
+            timestamp: End of the window in epoch seconds, now if not given
+
+        Returns:
+            Number of events counted in the window
+        """
+        window = self._keys.get(key)
+        if window is None:
+            return 0
+        self._expire(window, int((time.time() if timestamp is None else timestamp) // self.bucket_seconds))
+        return window.total
+
+    def _expire(self, window: _Window, current_bucket: int) -> None:
+        """Drop the buckets of a window that fell out of the time window."""
+        buckets = window.buckets
+        while buckets and buckets[0][0] <= current_bucket - self.bucket_count:
+            window.total -= buckets.popleft()[1]
+
+    def _evict_idle(self) -> None:
+        """Evict keys that were not updated within the window.
+
+        Keys are ordered by last update, so only the expired prefix is visited.
+        """
+        horizon = self._latest_bucket - self.bucket_count
+        while self._keys:
+            key, window = next(iter(self._keys.items()))
+            if window.buckets and window.buckets[-1][0] > horizon:
+                break
+            del self._keys[key]
+
+
+class _DistinctWindow:
+    """Time buckets of distinct counters of one key, oldest first."""
+
+    __slots__ = ('buckets', 'estimate')
+
+    def __init__(self):
+        self.buckets = deque()  # [bucket index, DistinctCounter] pairs
+        self.estimate = 0
+
+
+class SlidingDistinctCounter:
+    """Per-key distinct item counts over a sliding time window.
+
+    Each key keeps one DistinctCounter per time bucket (exact for small sets,
+    HyperLogLog beyond), so memory per key is bounded however many items are
+    seen. The count over the window is the union of the live buckets and is
+    only recomputed when an added item changed a bucket. Idle keys are
+    evicted and at most ``max_keys`` keys are kept, dropping the least
+    recently updated one. Not thread-safe.
+    """
+
+    def __init__(self, window_seconds: float, bucket_seconds: Optional[float] = None,
+                 max_keys: int = DEFAULT_MAX_KEYS, exact_limit: int = DEFAULT_EXACT_LIMIT,
+                 precision: int = DEFAULT_HLL_PRECISION):
+        """Initialize the counter.
+
+        Args:
+            window_seconds: Length of the sliding window
+            bucket_seconds: Bucket granularity, a quarter of the window by default
+            max_keys: Maximum number of tracked keys
+            exact_limit: Distinct items per bucket counted exactly
+            precision: HyperLogLog precision used beyond the exact limit
+        """
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds or max(window_seconds / DEFAULT_DISTINCT_BUCKETS_PER_WINDOW, 1.0)
+        self.bucket_count = max(int(round(window_seconds / self.bucket_seconds)), 1)
+        self.max_keys = max_keys
+        self.exact_limit = exact_limit
+        self.precision = precision
+        self._keys: 'OrderedDict[Hashable, _DistinctWindow]' = OrderedDict()
+        self._latest_bucket = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: Hashable, item: Any, timestamp: Optional[float] = None) -> int:
+        """Record an item for a key.
+
+        Args:
+            key: Key to count for, e.g. a source IP
+            item: Item to count, e.g. a destination port
+            timestamp: Event time in epoch seconds, now if not given
+
+        Returns:
+            (Estimated) distinct items of the key over the window ending at the newest event
+        """
+        bucket = int((time.time() if timestamp is None else timestamp) // self.bucket_seconds)
+
+        window = self._keys.get(key)
+        if window is None:
+            window = self._keys[key] = _DistinctWindow()
+            if len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+        else:
+            self._keys.move_to_end(key)
+
+        buckets = window.buckets
+        newest = buckets[-1][0] if buckets else bucket
+        expired = self._expire(window, max(bucket, newest))
+        added = False
+        if bucket > newest - self.bucket_count:
+            if buckets and buckets[-1][0] >= bucket:
+                counter = buckets[-1][1]
+            else:
+                counter = DistinctCounter(self.exact_limit, self.precision)
+                buckets.append([bucket, counter])
+            added = counter.add(item)
+
+        if expired:
+            window.estimate = DistinctCounter.union_count(c for _, c in buckets)
+        elif added:
+            if all(c.exact for _, c in buckets):
+                # Still exact: the item is new to the window unless an older bucket has it
+                if not any(item in c.items for _, c in buckets if c is not counter):
+                    window.estimate += 1
+            else:
+                window.estimate = DistinctCounter.union_count(c for _, c in buckets)
+
+        if bucket > self._latest_bucket:
+            self._latest_bucket = bucket
+            self._evict_idle()
+        return window.estimate
+
+    def count(self, key: Hashable, timestamp: Optional[float] = None) -> int:
+        """Get the distinct items of a key over the window ending at ``timestamp``.
+
+        Args:
+            key: Key to look up
+            timestamp: End of the window in epoch seconds, now if not given
+
+        Returns:
+            (Estimated) number of distinct items
+        """
+        window = self._keys.get(key)
+        if window is None:
+            return 0
+        current = int((time.time() if timestamp is None else timestamp) // self.bucket_seconds)
+        if self._expire(window, current):
+            window.estimate = DistinctCounter.union_count(c for _, c in window.buckets)
+        return window.estimate
+
+    def _expire(self, window: _DistinctWindow, current_bucket: int) -> bool:
+        """Drop the buckets of a window that fell out of the time window.
+
+        Returns:
+            True if any bucket was dropped
+        """
+        buckets = window.buckets
+        expired = False
+        while buckets and buckets[0][0] <= current_bucket - self.bucket_count:
+            buckets.popleft()
+            expired = True
+        return expired
+
+    def _evict_idle(self) -> None:
+        """Evict keys that were not updated within the window."""
+        horizon = self._latest_bucket - self.bucket_count
+        while self._keys:
+            key, window = next(iter(self._keys.items()))
+            if window.buckets and window.buckets[-1][0] > horizon:
+                break
+            del self._keys[key]
+
+
+class SlidingVolumeCounter:
+    """Approximate per-key weighted totals (e.g. bytes) over a sliding window.
+
+    Time is split into epochs of ``window_seconds``; the current and the
+    previous epoch each keep a count-min sketch for totals and a space-saving
+    summary for the heaviest keys, so memory is fixed whatever the number of
+    keys. Totals cover between one and two windows. Not thread-safe.
+    """
+
+    def __init__(self, window_seconds: float, width: int = DEFAULT_CMS_WIDTH, depth: int = DEFAULT_CMS_DEPTH,
+                 top_k_capacity: int = DEFAULT_TOP_K_CAPACITY):
+        """Initialize the counter.
+
+        Args:
+            window_seconds: Length of an epoch
+            width: Count-min sketch width
+            depth: Count-min sketch depth
+            top_k_capacity: Keys monitored for the heavy hitter ranking
+        """
+        self.window_seconds = window_seconds
+        self.width = width
+        self.depth = depth
+        self.top_k_capacity = top_k_capacity
+        self._epoch = None
+        self._current = self._new_epoch()
+        self._previous = self._new_epoch()
+
+    def _new_epoch(self) -> Tuple[CountMinSketch, SpaceSaving]:
+        return CountMinSketch(self.width, self.depth), SpaceSaving(self.top_k_capacity)
+
+    def _advance(self, timestamp: Optional[float]) -> Optional[Tuple[CountMinSketch, SpaceSaving]]:
+        """Rotate the epochs up to ``timestamp`` and return the epoch it falls in.
+
+        Returns:
+            The (sketch, summary) pair of the epoch, None if it is too old
+        """
+        epoch = int((time.time() if timestamp is None else timestamp) // self.window_seconds)
+        if self._epoch is None:
+            self._epoch = epoch
+        if epoch > self._epoch:
+            self._previous = self._current if epoch == self._epoch + 1 else self._new_epoch()
+            self._current = self._new_epoch()
+            self._epoch = epoch
+        if epoch == self._epoch:
+            return self._current
+        if epoch == self._epoch - 1:
+            return self._previous
+        return None
+
+    def add(self, key: Hashable, amount: int, timestamp: Optional[float] = None) -> int:
+        """Add weight to a key.
+
+        Args:
+            key: Key to count for, e.g. a source IP
+            amount: Non-negative weight, e.g. bytes transferred
+            timestamp: Event time in epoch seconds, now if not given
+
+        Returns:
+            Estimated total of the key over the window
+        """
+        target = self._advance(timestamp)
+        # Every epoch has sketches of the same dimensions, so the key is hashed once
+        indexes = self._current[0].indexes(key)
+        if target is not None and amount > 0:
+            target[0].add(key, amount, indexes)
+            target[1].add(key, amount)
+        return self.estimate(key, indexes)
+
+    def estimate(self, key: Hashable, indexes: Optional[List[int]] = None) -> int:
+        """Get the estimated total of a key over the window.
+
+        Args:
+            key: Key to look up
+            indexes: Precomputed count-min sketch indexes of the key
+        """
+        indexes = indexes or self._current[0].indexes(key)
+        return self._current[0].estimate(key, indexes) + self._previous[0].estimate(key, indexes)
+
+    def top(self, n: int = 10) -> List[Tuple[Hashable, int]]:
+        """Get the heaviest keys over the window.
+
+        Args:
+            n: Number of keys
+
+        Returns:
+            (key, estimated total) pairs, heaviest first
+        """
+        candidates = set(self._current[1].counts) | set(self._previous[1].counts)
+        totals: Dict[Hashable, int] = {key: self.estimate(key) for key in candidates}
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:n]